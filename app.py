@@ -4,6 +4,7 @@ import logging
 
 from controllers.bot_controller import bot_bp
 from controllers.user_controller import user_bp
+from utils.json_provider import configurar_json
 
 # Configuração de logging
 logging.basicConfig(
@@ -15,6 +16,9 @@ logger = logging.getLogger(__name__)
 # Inicializa aplicação Flask
 app = Flask(__name__)
 
+# Respostas JSON serializadas com orjson (quando instalado)
+configurar_json(app)
+
 # Configuração CORS (permite requisições do frontend)
 CORS(app, resources={
     r"/api/*": {
@@ -115,6 +119,7 @@ if __name__ == "__main__":
     logger.info("Iniciando Bot Worker API...")
     logger.info("Acesse http://localhost:5000 para informações da API")
     logger.info("Documentação disponível em http://localhost:5000/docs")
+    logger.info("Servidor de desenvolvimento; em produção use: gunicorn -c gunicorn.conf.py app:app")
     
     app.run(
         host="0.0.0.0",
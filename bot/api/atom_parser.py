@@ -0,0 +1,64 @@
+"""
+Leitura em streaming de feeds Atom (API do arXiv).
+Lê só até os primeiros resumos necessários, com limite de bytes, sem carregar a resposta inteira.
+"""
+
+import logging
+from typing import List
+from xml.etree import ElementTree
+
+logger = logging.getLogger(__name__)
+
+# Tags do feed Atom
+_ATOM_NS = "{http://www.w3.org/2005/Atom}"
+_ATOM_ENTRY = _ATOM_NS + "entry"
+_ATOM_SUMMARY = _ATOM_NS + "summary"
+
+# Máximo de bytes lidos do feed (os primeiros resumos cabem com folga)
+LIMITE_BYTES_ATOM = 64 * 1024
+
+
+class _LeitorLimitado:
+    """Envolve um stream e devolve EOF depois de `limite` bytes."""
+
+    def __init__(self, stream, limite: int):
+        self._stream = stream
+        self._restante = limite
+
+    def read(self, tamanho: int = -1) -> bytes:
+        if self._restante <= 0:
+            return b""
+        if tamanho < 0 or tamanho > self._restante:
+            tamanho = self._restante
+        dados = self._stream.read(tamanho)
+        self._restante -= len(dados)
+        return dados
+
+
+def extrair_resumos_atom(stream, quantidade: int = 2, limite_bytes: int = LIMITE_BYTES_ATOM) -> List[str]:
+    """
+    Extrai os textos dos primeiros `quantidade` elementos <summary> de um feed Atom.
+
+    Args:
+        stream: Objeto com read() (ex.: response.raw de uma requisição com stream=True)
+        quantidade: Número de resumos desejados
+        limite_bytes: Máximo de bytes lidos do stream
+
+    Returns:
+        Lista de resumos com espaços normalizados (pode ter menos que `quantidade`)
+    """
+    resumos = []
+    try:
+        for _, elem in ElementTree.iterparse(_LeitorLimitado(stream, limite_bytes), events=("end",)):
+            if elem.tag == _ATOM_SUMMARY:
+                # Normaliza as quebras de linha/indentação do feed
+                resumos.append(" ".join((elem.text or "").split()))
+                if len(resumos) >= quantidade:
+                    break
+            elif elem.tag == _ATOM_ENTRY:
+                elem.clear()
+    except ElementTree.ParseError:
+        # Limite de bytes atingido no meio do XML: usa os resumos já lidos
+        logger.info(f"Feed Atom: leitura truncada em {limite_bytes} bytes")
+
+    return resumos
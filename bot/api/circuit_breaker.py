@@ -0,0 +1,53 @@
+"""
+Disjuntor (circuit breaker) por fonte de busca.
+Depois de falhas consecutivas (429, 5xx ou timeout), a fonte é ignorada por um
+período de espera crescente, em vez de consumir o timeout inteiro a cada pergunta.
+"""
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# 501 não entra: o Wolfram Alpha o usa para "pergunta não entendida"
+STATUS_FALHA = {429, 500, 502, 503, 504}
+
+
+class Disjuntor:
+    """Controla quais fontes estão temporariamente desativadas."""
+
+    def __init__(self, limite_falhas: int = 3, espera_base: float = 60, espera_max: float = 600):
+        self.limite_falhas = limite_falhas
+        self.espera_base = espera_base
+        self.espera_max = espera_max
+        self._estado = {}  # fonte -> (falhas_consecutivas, aberto_ate)
+        self._lock = threading.Lock()
+
+    def aberto(self, fonte: str) -> bool:
+        """True se a fonte deve ser ignorada agora."""
+        _, aberto_ate = self._estado.get(fonte, (0, 0.0))
+        return time.monotonic() < aberto_ate
+
+    def registrar_sucesso(self, fonte: str):
+        with self._lock:
+            self._estado.pop(fonte, None)
+
+    def registrar_falha(self, fonte: str):
+        with self._lock:
+            falhas, aberto_ate = self._estado.get(fonte, (0, 0.0))
+            falhas += 1
+
+            if falhas >= self.limite_falhas:
+                espera = min(self.espera_base * 2 ** (falhas - self.limite_falhas), self.espera_max)
+                aberto_ate = time.monotonic() + espera
+                logger.warning(f"Disjuntor aberto para {fonte}: {falhas} falhas seguidas, pausando {espera:.0f}s")
+
+            self._estado[fonte] = (falhas, aberto_ate)
+
+    def registrar_resposta(self, fonte: str, status_code: int):
+        """Registra o status HTTP recebido da fonte."""
+        if status_code in STATUS_FALHA:
+            self.registrar_falha(fonte)
+        else:
+            self.registrar_sucesso(fonte)
@@ -0,0 +1,96 @@
+"""
+Sessão HTTP compartilhada pelos buscadores.
+Reaproveita conexões keep-alive entre chamadas (evita novo handshake TCP/TLS a cada busca).
+"""
+
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+USER_AGENT = "BotWorker/2.0 (+https://github.com/garotinhosDePrograma/bot-prototype)"
+
+# urllib3 só decodifica Brotli se o pacote estiver instalado
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "br, gzip, deflate"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+# orjson faz o parse direto dos bytes (sem decodificar para str antes)
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+    _json_loads = json.loads
+
+
+def criar_sessao(
+    pool_connections: int = 8,
+    pool_maxsize: int = 16,
+    retries: int = 2,
+    backoff_factor: float = 0.3
+) -> requests.Session:
+    """
+    Cria uma sessão com pool de conexões e retry para erros transitórios (502/503/504).
+
+    Args:
+        pool_connections: Número de hosts mantidos no pool
+        pool_maxsize: Conexões simultâneas por host
+        retries: Tentativas extras em caso de erro transitório
+        backoff_factor: Fator de espera entre tentativas
+
+    Returns:
+        requests.Session configurada
+    """
+    sessao = requests.Session()
+
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=[502, 503, 504],
+            allowed_methods=["GET"]
+        )
+    )
+    sessao.mount("http://", adapter)
+    sessao.mount("https://", adapter)
+
+    sessao.headers.update({
+        "User-Agent": USER_AGENT,
+        "Accept-Encoding": ACCEPT_ENCODING
+    })
+
+    return sessao
+
+
+class RespostaMuitoGrande(Exception):
+    """Corpo da resposta passou do limite de bytes permitido."""
+
+
+def ler_corpo_limitado(response: requests.Response, limite_bytes: int) -> bytes:
+    """
+    Lê o corpo da resposta em blocos, abortando se passar de `limite_bytes`.
+    Para limitar de fato a memória, a requisição deve ter sido feita com stream=True.
+    """
+    corpo = bytearray()
+    for bloco in response.iter_content(chunk_size=8192):
+        corpo.extend(bloco)
+        if len(corpo) > limite_bytes:
+            response.close()
+            raise RespostaMuitoGrande(f"Resposta maior que {limite_bytes} bytes: {response.url}")
+    return bytes(corpo)
+
+
+def carregar_json(response: requests.Response, limite_bytes: int = None) -> Any:
+    """
+    Decodifica o corpo JSON da resposta, usando orjson quando disponível.
+    Com `limite_bytes`, o corpo é lido com ler_corpo_limitado.
+    """
+    if limite_bytes is not None:
+        return _json_loads(ler_corpo_limitado(response, limite_bytes))
+    return _json_loads(response.content)
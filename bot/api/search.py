@@ -2,48 +2,159 @@
 Módulo para busca em múltiplas APIs de conhecimento.
 """
 
+import atexit
 import logging
+import re
+import threading
+import time
 import requests
-from typing import Dict, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED, TimeoutError
+
+from bot.api.atom_parser import extrair_resumos_atom
+from bot.api.circuit_breaker import Disjuntor
+from bot.api.http_session import criar_sessao, carregar_json
+from bot.api.source_cache import cache_por_consulta
+from bot.utils.config import Config
+from bot.utils.production_config import MAX_WORKERS_BUSCA
+from bot.utils.semantic_cache import CacheSemantico
 
 logger = logging.getLogger(__name__)
 
+# Dependências opcionais do YouTube (ver requirements.txt)
+try:
+    from youtube_search import YoutubeSearch
+    from youtube_transcript_api import YouTubeTranscriptApi
+    YOUTUBE_AVAILABLE = True
+except ImportError:
+    YOUTUBE_AVAILABLE = False
+    logger.info("YouTube desabilitado (youtube-search-python/youtube-transcript-api não instalados)")
+
+# Palavras de pergunta removidas da query da Wikipedia
+_PALAVRAS_PERGUNTA_RE = re.compile(
+    r"\b(?:what is|who is|who was|when was|where is|how does|why is)\b",
+    re.IGNORECASE
+)
+_ESPACOS_RE = re.compile(r"\s+")
+
+# Caracteres fora de um nome de recurso do DBpedia
+_NAO_PALAVRA_RE = re.compile(r"[^\w]")
+
+# Máximo de bytes lidos das respostas JSON com stream=True
+LIMITE_BYTES_JSON = 256 * 1024
+
+# Instância única por processo (sessão, pool de threads e caches compartilhados)
+_buscador_instance = None
+_buscador_lock = threading.Lock()
+
 
 class BuscadorAPI:
     """Classe para buscar informações em múltiplas APIs."""
 
-    def __init__(self, wolfram_app_id: str = None, google_cx: str = None, google_api_key: str = None):
+    def __init__(
+        self,
+        wolfram_app_id: str = None,
+        google_cx: str = None,
+        google_api_key: str = None,
+        sessao: requests.Session = None
+    ):
         self.wolfram_app_id = wolfram_app_id
         self.google_cx = google_cx
         self.google_api_key = google_api_key
 
+        # Sessão compartilhada entre todas as buscas (keep-alive); pode vir de fora
+        # para que vários componentes usem o mesmo pool de conexões
+        self.session = sessao if sessao is not None else criar_sessao()
+
+        # Pool de threads persistente (evita criar/destruir threads a cada busca)
+        self._executor = ThreadPoolExecutor(
+            max_workers=MAX_WORKERS_BUSCA * 2,
+            thread_name_prefix="buscador_api"
+        )
+
+        # Fontes com falhas seguidas (quota, 5xx, timeout) são puladas por um tempo
+        self._disjuntor = Disjuntor()
+
+        # Cache exato + semântico na frente de buscar_melhor
+        self._cache_melhor = CacheSemantico(maxsize=4096, ttl=3600, limiar=0.92)
+
+    def close(self):
+        """Fecha as conexões abertas da sessão e encerra o pool de threads."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+
+    def _get(self, fonte: str, url: str, **kwargs) -> requests.Response:
+        """session.get que registra o resultado no disjuntor da fonte."""
+        try:
+            response = self.session.get(url, **kwargs)
+        except requests.RequestException:
+            self._disjuntor.registrar_falha(fonte)
+            raise
+
+        self._disjuntor.registrar_resposta(fonte, response.status_code)
+        return response
+
+    # APIs sem chave pré-conectadas por aquecer_conexoes (fonte -> URL). Wolfram e Google
+    # ficam de fora: uma requisição sem appid/key só gastaria cota e geraria erro
+    URLS_AQUECIMENTO = {
+        "duckduckgo": "https://api.duckduckgo.com/",
+        "wikipedia": "https://en.wikipedia.org/w/api.php"
+    }
+
+    def aquecer_conexoes(self):
+        """
+        Abre (em segundo plano) uma conexão keep-alive com as APIs sem chave.
+        A resolução DNS e o handshake TLS ficam fora da primeira pergunta; as buscas
+        seguintes reaproveitam as conexões do pool da sessão.
+        Chamado uma vez por get_buscador_api, não pelo construtor.
+        """
+        for fonte, url in self.URLS_AQUECIMENTO.items():
+            self._executor.submit(self._aquecer_conexao, fonte, url)
+
+    def _aquecer_conexao(self, fonte: str, url: str):
+        """HEAD na fonte; uma falha conta no disjuntor, como nas buscas."""
+        if self._disjuntor.aberto(fonte):
+            return
+
+        try:
+            response = self.session.head(url, timeout=3)
+        except requests.RequestException as e:
+            self._disjuntor.registrar_falha(fonte)
+            logger.warning(f"Não foi possível pré-conectar a {url}: {str(e)}")
+            return
+
+        self._disjuntor.registrar_resposta(fonte, response.status_code)
+
     def buscar_wolfram(self, pergunta_en: str) -> Optional[str]:
         """Busca resposta no Wolfram Alpha - tenta múltiplos endpoints."""
         if not self.wolfram_app_id:
             return None
 
-        # Tenta primeiro o endpoint simples
-        url_simple = f"http://api.wolframalpha.com/v1/result?i={requests.utils.quote(pergunta_en)}&appid={self.wolfram_app_id}"
-        try:
-            response = requests.get(url_simple, timeout=5)
-            if response.status_code == 200:
-                texto = response.text.strip()
-                logger.info(f"Wolfram Alpha (simple): {texto[:100]}...")
-                return texto
-        except Exception as e:
-            logger.error(f"Erro Wolfram Alpha (simple): {str(e)}")
+        # Tenta primeiro o endpoint simples; se falhar, o spoken (mais detalhado)
+        return (
+            self._buscar_wolfram_endpoint(pergunta_en, "simple")
+            or self._buscar_wolfram_endpoint(pergunta_en, "spoken")
+        )
+
+    def _buscar_wolfram_endpoint(self, pergunta_en: str, endpoint: str) -> Optional[str]:
+        """Consulta um único endpoint do Wolfram Alpha ("simple" ou "spoken")."""
+        if not self.wolfram_app_id:
+            return None
+
+        if self._disjuntor.aberto("wolfram"):
+            return None
 
-        # Se falhou, tenta o endpoint spoken (mais detalhado)
-        url_spoken = f"http://api.wolframalpha.com/v1/spoken?i={requests.utils.quote(pergunta_en)}&appid={self.wolfram_app_id}"
+        caminho = "result" if endpoint == "simple" else "spoken"
+        url = f"http://api.wolframalpha.com/v1/{caminho}"
+        params = {"i": pergunta_en, "appid": self.wolfram_app_id}
         try:
-            response = requests.get(url_spoken, timeout=5)
+            response = self._get("wolfram", url, params=params, timeout=5)
             if response.status_code == 200:
                 texto = response.text.strip()
-                logger.info(f"Wolfram Alpha (spoken): {texto[:100]}...")
+                logger.info(f"Wolfram Alpha ({endpoint}): {texto[:100]}...")
                 return texto
         except Exception as e:
-            logger.error(f"Erro Wolfram Alpha (spoken): {str(e)}")
+            logger.error(f"Erro Wolfram Alpha ({endpoint}): {str(e)}")
 
         return None
 
@@ -52,10 +163,14 @@ class BuscadorAPI:
         if not (self.google_cx and self.google_api_key):
             return None
 
-        url = f"https://www.googleapis.com/customsearch/v1?q={requests.utils.quote(pergunta_en)}&cx={self.google_cx}&key={self.google_api_key}&num=3"
+        if self._disjuntor.aberto("google"):
+            return None
+
+        url = "https://www.googleapis.com/customsearch/v1"
+        params = {"q": pergunta_en, "cx": self.google_cx, "key": self.google_api_key, "num": 3}
         try:
-            response = requests.get(url, timeout=5)
-            data = response.json()
+            response = self._get("google", url, params=params, timeout=5)
+            data = carregar_json(response)
             if "items" in data and len(data["items"]) > 0:
                 # Combina os snippets dos primeiros 3 resultados
                 snippets = []
@@ -75,10 +190,14 @@ class BuscadorAPI:
 
     def buscar_duckduckgo(self, pergunta_en: str) -> Optional[str]:
         """Busca resposta no DuckDuckGo."""
-        url = f"https://api.duckduckgo.com/?q={requests.utils.quote(pergunta_en)}&format=json"
+        if self._disjuntor.aberto("duckduckgo"):
+            return None
+
+        url = "https://api.duckduckgo.com/"
+        params = {"q": pergunta_en, "format": "json"}
         try:
-            response = requests.get(url, timeout=7)
-            data = response.json()
+            response = self._get("duckduckgo", url, params=params, timeout=7)
+            data = carregar_json(response)
 
             # Tenta AbstractText primeiro (mais confiável)
             if data.get("AbstractText") and len(data["AbstractText"]) > 50:
@@ -115,44 +234,21 @@ class BuscadorAPI:
 
     def buscar_wikipedia(self, pergunta_en: str) -> Optional[str]:
         """Busca resposta na Wikipedia usando busca de texto."""
-        # Remove palavras de pergunta para melhorar a busca
-        query_limpa = pergunta_en.lower()
-        palavras_remover = ["what is", "who is", "who was", "when was", "where is", "how does", "why is"]
-        for palavra in palavras_remover:
-            query_limpa = query_limpa.replace(palavra, "")
-        query_limpa = query_limpa.strip()
-
-        # Primeiro, faz busca para encontrar o artigo correto
-        search_url = f"https://en.wikipedia.org/w/api.php?action=query&list=search&srsearch={requests.utils.quote(query_limpa)}&format=json&srlimit=3"
+        # Remove palavras de pergunta para melhorar a busca (uma única passada)
+        query_limpa = _ESPACOS_RE.sub(" ", _PALAVRAS_PERGUNTA_RE.sub("", pergunta_en)).strip()
 
         try:
-            # Busca pelo artigo
-            response = requests.get(search_url, timeout=7)
-            if response.status_code != 200:
-                return None
+            # Busca e extrato dos artigos em uma única chamada
+            extratos = self._buscar_extratos_wikipedia(query_limpa, "en", limite=2, timeout=7)
 
-            data = response.json()
-
-            # Verifica se encontrou resultados
-            if not data.get('query', {}).get('search'):
+            if extratos is None:
                 logger.info("Wikipedia: nenhum resultado encontrado")
                 return None
 
-            # Tenta os primeiros 2 resultados
-            for resultado in data['query']['search'][:2]:
-                titulo = resultado['title']
-                logger.info(f"Wikipedia: tentando artigo '{titulo}'")
-
-                # Busca o conteúdo do artigo
-                content_url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{titulo.replace(' ', '_')}"
-                content_response = requests.get(content_url, timeout=5)
-
-                if content_response.status_code == 200:
-                    content_data = content_response.json()
-                    extract = content_data.get("extract", "")
-                    if extract and len(extract) > 100:
-                        logger.info(f"Wikipedia: {extract[:100]}...")
-                        return extract
+            for extract in extratos:
+                if len(extract) > 100:
+                    logger.info(f"Wikipedia: {extract[:100]}...")
+                    return extract
 
             logger.info("Wikipedia: nenhum conteúdo útil encontrado")
             return None
@@ -160,65 +256,264 @@ class BuscadorAPI:
             logger.error(f"Erro Wikipedia: {str(e)}")
             return None
 
-    def buscar_todas(self, pergunta_en: str, timeout: int = 15) -> Dict[str, Optional[str]]:
+    def _buscar_extratos_wikipedia(self, query: str, idioma: str, limite: int, timeout: int) -> Optional[list]:
         """
-        Busca em TODAS as APIs simultaneamente usando threads.
-        Retorna um dicionário com os resultados de cada fonte.
+        Busca artigos e seus extratos (introdução em texto puro) numa única
+        chamada à API do MediaWiki, usando generator=search.
+        Retorna os extratos na ordem de relevância da busca, ou None se nada foi encontrado.
         """
-        resultados = {
-            "wolfram": None,
-            "google": None,
-            "duckduckgo": None,
-            "wikipedia": None
+        params = {
+            "action": "query",
+            "generator": "search",
+            "gsrsearch": query,
+            "gsrlimit": limite,
+            "prop": "extracts",
+            "exintro": 1,
+            "explaintext": 1,
+            "exlimit": limite,
+            "format": "json",
+            "formatversion": 2
         }
 
-        # Dicionário de funções de busca
+        if self._disjuntor.aberto("wikipedia"):
+            return None
+
+        response = self._get("wikipedia", f"https://{idioma}.wikipedia.org/w/api.php", params=params, timeout=timeout)
+        if response.status_code != 200:
+            return None
+
+        pages = carregar_json(response).get("query", {}).get("pages")
+        if not pages:
+            return None
+
+        # O generator não garante ordem; "index" é a posição no ranking da busca
+        pages.sort(key=lambda page: page.get("index", 0))
+        return [page.get("extract", "") for page in pages]
+
+    # Ordem de preferência (do mais confiável ao menos)
+    ORDEM_PREFERENCIA = ["wolfram", "wikipedia", "google", "duckduckgo"]
+
+    # Fontes retornadas por buscar_todas
+    FONTES_TODAS = ("wolfram", "google", "duckduckgo", "wikipedia")
+
+    # Fonte a que pertence cada tarefa de _submeter_buscas
+    FONTE_DA_TAREFA = {
+        "wolfram_simple": "wolfram",
+        "wolfram_spoken": "wolfram",
+        "google": "google",
+        "duckduckgo": "duckduckgo",
+        "wikipedia": "wikipedia"
+    }
+
+    # Estágios do buscar_melhor: fontes rápidas e gratuitas primeiro;
+    # Google (cota paga) e DuckDuckGo só são consultados se o primeiro estágio não responder
+    ESTAGIOS_MELHOR = [
+        ("wolfram_simple", "wolfram_spoken", "wikipedia"),
+        ("google", "duckduckgo")
+    ]
+
+    def _submeter_buscas(self, pergunta_en: str, tarefas: tuple = None) -> dict:
+        """
+        Submete as buscas no pool de threads da instância (todas, ou só as `tarefas` indicadas).
+        Os dois endpoints do Wolfram viram tarefas separadas (sem fallback sequencial).
+        Retorna {future: nome_tarefa}.
+        """
         buscadores = {
-            "wolfram": self.buscar_wolfram,
+            "wolfram_simple": lambda q: self._buscar_wolfram_endpoint(q, "simple"),
+            "wolfram_spoken": lambda q: self._buscar_wolfram_endpoint(q, "spoken"),
             "google": self.buscar_google,
             "duckduckgo": self.buscar_duckduckgo,
             "wikipedia": self.buscar_wikipedia
         }
 
-        # Executa todas as buscas em paralelo
-        with ThreadPoolExecutor(max_workers=4) as executor:
-            # Submete todas as tarefas
-            futures = {
-                executor.submit(func, pergunta_en): nome 
-                for nome, func in buscadores.items()
-            }
+        if tarefas is not None:
+            buscadores = {nome: buscadores[nome] for nome in tarefas}
+
+        return {
+            self._executor.submit(func, pergunta_en): nome
+            for nome, func in buscadores.items()
+        }
+
+    @staticmethod
+    def _resultado_tarefa(future, nome_tarefa: str) -> Optional[str]:
+        """Extrai o resultado de uma tarefa concluída, tratando exceções."""
+        try:
+            return future.result()
+        except Exception as e:
+            logger.error(f"Erro em {nome_tarefa}: {str(e)}")
+            return None
+
+    def buscar_todas(
+        self,
+        pergunta_en: str,
+        timeout: int = 15,
+        fontes: Optional[List[str]] = None,
+        min_respostas: Optional[int] = None
+    ) -> Dict[str, Optional[str]]:
+        """
+        Busca em TODAS as APIs simultaneamente usando o pool de threads da instância.
+        O tempo total fica próximo da fonte mais lenta, não da soma das chamadas.
+
+        Args:
+            pergunta_en: Pergunta em inglês
+            timeout: Tempo máximo de espera (segundos)
+            fontes: Consulta apenas estas fontes (padrão: todas)
+            min_respostas: Retorna assim que este número de fontes tiver respondido,
+                sem esperar as demais (as pendentes ficam como None)
+
+        Returns:
+            Dicionário com os resultados de cada fonte
+        """
+        tarefas = None
+        if fontes is not None:
+            tarefas = tuple(t for t, f in self.FONTE_DA_TAREFA.items() if f in fontes)
+
+        parciais = {}
+        futures = self._submeter_buscas(pergunta_en, tarefas)
+        fontes_respondidas = set()
 
-            # Coleta resultados conforme completam
+        # Coleta resultados conforme completam
+        try:
             for future in as_completed(futures, timeout=timeout):
-                nome_fonte = futures[future]
-                try:
-                    resultado = future.result()
-                    resultados[nome_fonte] = resultado
-                    if resultado:
-                        logger.info(f"✓ {nome_fonte}: obteve resposta")
-                    else:
-                        logger.info(f"✗ {nome_fonte}: sem resposta")
-                except Exception as e:
-                    logger.error(f"Erro em {nome_fonte}: {str(e)}")
-                    resultados[nome_fonte] = None
+                nome_tarefa = futures[future]
+                parciais[nome_tarefa] = self._resultado_tarefa(future, nome_tarefa)
+
+                if parciais[nome_tarefa]:
+                    fontes_respondidas.add(self.FONTE_DA_TAREFA[nome_tarefa])
+                    if min_respostas and len(fontes_respondidas) >= min_respostas:
+                        logger.info(f"{len(fontes_respondidas)} fontes responderam, sem esperar as demais")
+                        break
+        except TimeoutError:
+            logger.warning(f"Timeout total atingido ({timeout}s)")
+        finally:
+            for future in futures:
+                future.cancel()
+
+        # Endpoint simples tem preferência sobre o spoken
+        parciais["wolfram"] = parciais.get("wolfram_simple") or parciais.get("wolfram_spoken")
+
+        resultados = {
+            nome_fonte: parciais.get(nome_fonte)
+            for nome_fonte in self.FONTES_TODAS
+            if fontes is None or nome_fonte in fontes
+        }
+
+        # Evita montar as mensagens quando o nível INFO está desligado
+        if logger.isEnabledFor(logging.INFO):
+            for nome_fonte, resultado in resultados.items():
+                if resultado:
+                    logger.info(f"✓ {nome_fonte}: obteve resposta")
+                else:
+                    logger.info(f"✗ {nome_fonte}: sem resposta")
 
         return resultados
 
-    def buscar_melhor(self, pergunta_en: str) -> tuple:
+    def buscar_melhor(self, pergunta_en: str, min_wait_ms: int = 2000) -> tuple:
         """
         Busca em todas as APIs e retorna a melhor resposta.
+        Perguntas repetidas ou parecidas são servidas pelo cache.
         Retorna (resposta, fonte).
         """
-        resultados = self.buscar_todas(pergunta_en)
-
-        # Ordem de preferência (do mais confiável ao menos)
-        ordem_preferencia = ["wolfram", "wikipedia", "google", "duckduckgo"]
+        return self._cache_melhor.obter_ou_calcular(
+            pergunta_en,
+            lambda: self._buscar_melhor_sem_cache(pergunta_en, min_wait_ms)
+        )
+
+    def _buscar_melhor_sem_cache(
+        self,
+        pergunta_en: str,
+        min_wait_ms: int = 2000,
+        timeout: int = 15,
+        timeout_estagio: float = 4
+    ) -> tuple:
+        """
+        Consulta as fontes em estágios (ESTAGIOS_MELHOR) e retorna assim que a fonte
+        de maior prioridade ainda possível responder, sem esperar as demais.
+        O próximo estágio só é disparado se o atual terminar sem resposta ou passar
+        de `timeout_estagio` segundos sem nenhuma resposta.
+        Se uma fonte de menor prioridade já respondeu, as de maior prioridade ainda
+        pendentes têm até `min_wait_ms` para vencê-la.
+        Tarefas que ainda não começaram são canceladas.
+        """
+        inicio = time.monotonic()
+        estagios = list(self.ESTAGIOS_MELHOR)
+        futures = {}
+        pendentes = set()
+        parciais = {}
+        primeira_resposta = None
+        limite_estagio = inicio
 
-        for fonte in ordem_preferencia:
-            if resultados.get(fonte):
-                return resultados[fonte], fonte
+        try:
+            while True:
+                agora = time.monotonic()
+
+                # Próximo estágio: só enquanto nenhuma fonte respondeu
+                if estagios and primeira_resposta is None and (not pendentes or agora >= limite_estagio):
+                    novas = self._submeter_buscas(pergunta_en, estagios.pop(0))
+                    futures.update(novas)
+                    pendentes |= set(novas)
+                    limite_estagio = agora + timeout_estagio
+
+                if not pendentes:
+                    break
+
+                espera = timeout - (agora - inicio)
+                if espera <= 0:
+                    logger.warning(f"Timeout total atingido ({timeout}s)")
+                    break
+
+                if primeira_resposta is not None:
+                    espera = min(espera, max(0.0, primeira_resposta + min_wait_ms / 1000 - agora))
+                elif estagios:
+                    espera = min(espera, max(0.0, limite_estagio - agora))
+
+                concluidos, pendentes = wait(pendentes, timeout=espera, return_when=FIRST_COMPLETED)
+
+                for future in concluidos:
+                    nome_tarefa = futures[future]
+                    parciais[nome_tarefa] = self._resultado_tarefa(future, nome_tarefa)
+                    if parciais[nome_tarefa] and primeira_resposta is None:
+                        primeira_resposta = time.monotonic()
+
+                carencia_expirada = (
+                    primeira_resposta is not None
+                    and time.monotonic() - primeira_resposta >= min_wait_ms / 1000
+                )
+
+                vencedor = self._escolher_vencedor(
+                    parciais,
+                    {futures[f] for f in pendentes},
+                    carencia_expirada
+                )
+                if vencedor:
+                    return vencedor
+        finally:
+            for future in pendentes:
+                future.cancel()
+
+        return self._escolher_vencedor(parciais, set(), True) or (None, None)
+
+    def _escolher_vencedor(self, parciais: dict, tarefas_pendentes: set, carencia_expirada: bool) -> Optional[tuple]:
+        """
+        Percorre a ordem de preferência e decide se já há uma resposta definitiva.
+        Retorna (resposta, fonte) ou None se ainda vale esperar.
+        """
+        for fonte in self.ORDEM_PREFERENCIA:
+            if fonte == "wolfram":
+                resposta = parciais.get("wolfram_simple") or parciais.get("wolfram_spoken")
+                pendente = bool({"wolfram_simple", "wolfram_spoken"} & tarefas_pendentes)
+            else:
+                resposta = parciais.get(fonte)
+                pendente = fonte in tarefas_pendentes
+
+            if resposta:
+                return resposta, fonte
+
+            if pendente and not carencia_expirada:
+                # Fonte mais prioritária ainda pode responder
+                return None
 
-        return None, None
+        return None
 
     def buscar_wikipedia_avancado(self, pergunta_en: str, lingua: str = "pt") -> Optional[str]:
         """
@@ -238,49 +533,17 @@ class BuscadorAPI:
         
         return None
     
+    @cache_por_consulta(ttl=600)
     def _buscar_wikipedia_idioma(self, query: str, idioma: str) -> Optional[str]:
         """Busca Wikipedia em idioma específico."""
         try:
-            api_url = f"https://{idioma}.wikipedia.org/w/api.php"
-            
-            # Busca artigos
-            search_params = {
-                "action": "query",
-                "list": "search",
-                "srsearch": query,
-                "format": "json",
-                "srlimit": 3
-            }
-            
-            response = requests.get(api_url, params=search_params, timeout=5)
-            data = response.json()
-            
-            if not data.get('query', {}).get('search'):
-                return None
-            
-            # Pega primeiro resultado
-            primeiro_resultado = data['query']['search'][0]
-            titulo = primeiro_resultado['title']
-            
-            # Busca conteúdo do artigo
-            content_params = {
-                "action": "query",
-                "prop": "extracts",
-                "exintro": True,
-                "explaintext": True,
-                "titles": titulo,
-                "format": "json"
-            }
-            
-            content_response = requests.get(api_url, params=content_params, timeout=5)
-            content_data = content_response.json()
-            
-            pages = content_data.get('query', {}).get('pages', {})
-            if pages:
-                page = list(pages.values())[0]
-                extract = page.get('extract', '')
-                
-                if extract and len(extract) > 100:
+            # Busca + extrato do primeiro resultado numa única chamada
+            extratos = self._buscar_extratos_wikipedia(query, idioma, limite=1, timeout=5)
+
+            if extratos:
+                extract = extratos[0]
+
+                if len(extract) > 100:
                     logger.info(f"Wikipedia ({idioma}): {extract[:100]}...")
                     return extract
             
@@ -289,38 +552,34 @@ class BuscadorAPI:
             logger.error(f"Erro Wikipedia ({idioma}): {str(e)}")
             return None
     
+    @cache_por_consulta(ttl=600)
     def buscar_arxiv(self, pergunta_en: str) -> Optional[str]:
         """
         Busca em artigos científicos do arXiv.
         Útil para perguntas acadêmicas/científicas.
         """
+        if self._disjuntor.aberto("arxiv"):
+            return None
+
         try:
-            import urllib.parse
-            
             # Monta query para arXiv
-            query = urllib.parse.quote(pergunta_en)
-            url = f"http://export.arxiv.org/api/query?search_query=all:{query}&start=0&max_results=3"
-            
-            response = requests.get(url, timeout=7)
-            
-            if response.status_code != 200:
-                return None
-            
-            # Parse XML simples (pode usar BeautifulSoup para melhor parsing)
-            content = response.text
-            
-            # Extrai summaries (resumos)
-            import re
-            summaries = re.findall(r'<summary>(.*?)</summary>', content, re.DOTALL)
+            url = "http://export.arxiv.org/api/query"
+            params = {"search_query": f"all:{pergunta_en}", "start": 0, "max_results": 3}
+
+            # Parse XML em streaming: lê só até o segundo <summary>
+            with self._get("arxiv", url, params=params, timeout=7, stream=True) as response:
+                if response.status_code != 200:
+                    return None
+
+                response.raw.decode_content = True
+                summaries = extrair_resumos_atom(response.raw, quantidade=2)
             
             if summaries:
                 # Pega primeiros 2-3 resumos
                 textos = []
                 for summary in summaries[:2]:
-                    # Remove whitespace extra
-                    summary_clean = ' '.join(summary.split())
-                    if len(summary_clean) > 100:
-                        textos.append(summary_clean)
+                    if len(summary) > 100:
+                        textos.append(summary)
                 
                 if textos:
                     resultado = ' '.join(textos[:2])
@@ -332,11 +591,15 @@ class BuscadorAPI:
             logger.error(f"Erro arXiv: {str(e)}")
             return None
     
+    @cache_por_consulta(ttl=600)
     def buscar_dbpedia(self, pergunta_en: str) -> Optional[str]:
         """
         Busca em DBpedia (base de conhecimento estruturado).
         Ótimo para fatos estruturados.
         """
+        if self._disjuntor.aberto("dbpedia"):
+            return None
+
         try:
             # Extrai entidade principal da pergunta
             # (simplificado - pode melhorar com NER)
@@ -346,49 +609,48 @@ class BuscadorAPI:
             if not palavras_relevantes:
                 return None
             
-            entidade = '_'.join(palavras_relevantes[:2])
-            
-            # Busca no DBpedia
-            url = f"http://dbpedia.org/data/{entidade}.json"
-            response = requests.get(url, timeout=5)
-            
-            if response.status_code != 200:
+            # Só caracteres válidos num IRI (remove pontuação como "?" e ",")
+            entidade = _NAO_PALAVRA_RE.sub("", '_'.join(palavras_relevantes[:2]))
+            if not entidade:
                 return None
-            
-            data = response.json()
-            
-            # Extrai abstracts
-            resource_uri = f"http://dbpedia.org/resource/{entidade}"
-            if resource_uri in data:
-                resource_data = data[resource_uri]
-                
-                # Procura por abstract
-                abstract_key = "http://dbpedia.org/ontology/abstract"
-                if abstract_key in resource_data:
-                    abstracts = resource_data[abstract_key]
-                    
-                    # Pega abstract em inglês
-                    for abstract in abstracts:
-                        if abstract.get('lang') == 'en':
-                            texto = abstract.get('value', '')
-                            if len(texto) > 100:
-                                logger.info(f"DBpedia: {texto[:100]}...")
-                                return texto
-            
+
+            # SPARQL pede só o abstract em inglês (KB), em vez do documento JSON-LD
+            # inteiro da entidade (que passa de MB nas entidades populares)
+            query = (
+                "PREFIX dbo: <http://dbpedia.org/ontology/> "
+                f"SELECT ?abs WHERE {{ <http://dbpedia.org/resource/{entidade}> dbo:abstract ?abs . "
+                'FILTER(lang(?abs) = "en") } LIMIT 1'
+            )
+            params = {"query": query, "format": "application/sparql-results+json"}
+
+            with self._get("dbpedia", "https://dbpedia.org/sparql", params=params, timeout=5, stream=True) as response:
+                if response.status_code != 200:
+                    return None
+
+                data = carregar_json(response, limite_bytes=LIMITE_BYTES_JSON)
+
+            bindings = data.get("results", {}).get("bindings", [])
+            if bindings:
+                texto = bindings[0].get("abs", {}).get("value", "")
+                if len(texto) > 100:
+                    logger.info(f"DBpedia: {texto[:100]}...")
+                    return texto
+
             return None
         except Exception as e:
             logger.error(f"Erro DBpedia: {str(e)}")
             return None
     
+    @cache_por_consulta(ttl=600)
     def buscar_youtube_transcript(self, pergunta_en: str) -> Optional[str]:
         """
         Busca vídeos educacionais no YouTube e tenta extrair transcrições.
         Útil para tutoriais e explicações.
         """
+        if not YOUTUBE_AVAILABLE:
+            return None
+
         try:
-            from youtube_search import YoutubeSearch
-            from youtube_transcript_api import YouTubeTranscriptApi
-            
             # Busca vídeos
             query = pergunta_en + " tutorial explanation"
             resultados = YoutubeSearch(query, max_results=3).to_dict()
@@ -410,10 +672,32 @@ class BuscadorAPI:
                     if len(texto_completo) > 100:
                         logger.info(f"YouTube: {texto_completo[:100]}...")
                         return texto_completo
-                except:
+                except Exception:
+                    # Vídeo sem transcrição disponível: tenta o próximo
                     continue
             
             return None
         except Exception as e:
             logger.error(f"Erro YouTube: {str(e)}")
             return None
+
+
+def get_buscador_api() -> BuscadorAPI:
+    """
+    Retorna o BuscadorAPI do processo, criando-o na primeira chamada.
+    Todas as requisições reaproveitam a mesma sessão HTTP (keep-alive) e os mesmos caches.
+    """
+    global _buscador_instance
+    if _buscador_instance is None:
+        with _buscador_lock:
+            if _buscador_instance is None:
+                _buscador_instance = BuscadorAPI(
+                    wolfram_app_id=Config.WOLFRAM_APP_ID,
+                    google_cx=Config.GOOGLE_CX,
+                    google_api_key=Config.GOOGLE_API_KEY
+                )
+                atexit.register(_buscador_instance.close)
+
+                # Resolve DNS e abre conexões em segundo plano, fora do caminho da primeira pergunta
+                _buscador_instance.aquecer_conexoes()
+    return _buscador_instance
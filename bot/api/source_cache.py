@@ -0,0 +1,141 @@
+"""
+Cache por consulta para fontes lentas ou com limite de requisições (arXiv, DBpedia, YouTube...).
+Entradas vencidas ainda são servidas por uma janela extra enquanto são atualizadas em segundo plano
+(stale-while-revalidate). Opcionalmente, as respostas também são gravadas em disco (diskcache),
+sobrevivendo a reinícios e sendo compartilhadas entre os processos do servidor.
+"""
+
+import functools
+import hashlib
+import logging
+import os
+import threading
+import time
+
+import diskcache
+from cachetools import LRUCache
+
+from bot.utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Tamanho máximo do cache em disco
+LIMITE_CACHE_DISCO = 200 * 1024 * 1024
+
+_cache_disco = None
+_cache_disco_lock = threading.Lock()
+
+
+def obter_cache_disco():
+    """Retorna o cache em disco do processo (criado na primeira chamada) ou None se indisponível."""
+    global _cache_disco
+    if _cache_disco is None:
+        with _cache_disco_lock:
+            if _cache_disco is None:
+                try:
+                    _cache_disco = diskcache.Cache(
+                        os.path.join(Config.CACHE_DIR, "fontes"),
+                        size_limit=LIMITE_CACHE_DISCO
+                    )
+                except Exception as e:
+                    logger.error(f"Erro ao abrir cache em disco: {str(e)}")
+                    _cache_disco = False
+    return _cache_disco or None
+
+
+def cache_por_consulta(
+    ttl: float = 600,
+    janela_stale: float = 1800,
+    maxsize: int = 2048,
+    ttl_disco: float = None
+):
+    """
+    Decorador para métodos `buscar_*(self, consulta, *args)`.
+
+    - Até `ttl` segundos: devolve o valor cacheado.
+    - Entre `ttl` e `ttl + janela_stale`: devolve o valor antigo e atualiza em segundo plano.
+    - Depois disso: consulta a fonte normalmente.
+
+    Com `ttl_disco`, a ordem de busca é memória -> disco -> fonte, e cada resposta
+    obtida da fonte também é gravada em disco por `ttl_disco` segundos.
+
+    Respostas vazias (None) não são cacheadas.
+    """
+    def decorador(metodo):
+        cache = LRUCache(maxsize=maxsize)  # chave -> (valor, instante)
+        atualizando = set()
+        lock = threading.Lock()
+
+        def chave_disco(chave):
+            return f"{metodo.__qualname__}:" + hashlib.sha1(repr(chave).encode("utf-8")).hexdigest()
+
+        def ler_disco(chave):
+            disco = obter_cache_disco() if ttl_disco else None
+            if disco is None:
+                return None
+            try:
+                return disco.get(chave_disco(chave))
+            except Exception as e:
+                logger.error(f"Erro ao ler cache em disco: {str(e)}")
+                return None
+
+        def gravar(chave, valor):
+            with lock:
+                cache[chave] = (valor, time.monotonic())
+
+            disco = obter_cache_disco() if ttl_disco else None
+            if disco is not None:
+                try:
+                    disco.set(chave_disco(chave), valor, expire=ttl_disco)
+                except Exception as e:
+                    logger.error(f"Erro ao gravar cache em disco: {str(e)}")
+
+        def atualizar(self, chave, consulta, args):
+            try:
+                valor = metodo(self, consulta, *args)
+                if valor is not None:
+                    gravar(chave, valor)
+            except Exception as e:
+                logger.error(f"Erro ao atualizar cache de {metodo.__name__}: {str(e)}")
+            finally:
+                with lock:
+                    atualizando.discard(chave)
+
+        @functools.wraps(metodo)
+        def wrapper(self, consulta, *args):
+            chave = (" ".join(consulta.split()), args)
+
+            with lock:
+                entrada = cache.get(chave)
+                if entrada is not None:
+                    valor, instante = entrada
+                    idade = time.monotonic() - instante
+
+                    if idade < ttl:
+                        return valor
+
+                    if idade < ttl + janela_stale:
+                        if chave not in atualizando:
+                            atualizando.add(chave)
+                            threading.Thread(
+                                target=atualizar,
+                                args=(self, chave, consulta, args),
+                                daemon=True
+                            ).start()
+                        return valor
+
+            valor = ler_disco(chave)
+            if valor is not None:
+                with lock:
+                    cache[chave] = (valor, time.monotonic())
+                return valor
+
+            valor = metodo(self, consulta, *args)
+            if valor is not None:
+                gravar(chave, valor)
+            return valor
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorador
@@ -1,22 +1,99 @@
 """
 Buscador Unificado - Integra TODAS as fontes de conhecimento
 Versão 2.0 - Com orquestração inteligente e paralelização
+
+Logs neste módulo usam formatação lazy (logger.info("... %s", valor)), não f-strings:
+a mensagem só é montada se o nível estiver habilitado.
 """
 
+import atexit
+import functools
 import logging
-import requests
+import re
+import threading
 from typing import Dict, Optional, List, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, TimeoutError
 import time
+from types import MappingProxyType
+
+from cachetools import TTLCache
+
+from bot.api.atom_parser import extrair_resumos_atom
+from bot.api.http_session import criar_sessao, carregar_json
+from bot.api.source_cache import cache_por_consulta
+from bot.utils.semantic_cache import normalizar_chave
 
 logger = logging.getLogger(__name__)
 
+# Dependências opcionais do YouTube (ver requirements.txt)
+try:
+    from youtube_search import YoutubeSearch
+    from youtube_transcript_api import (
+        YouTubeTranscriptApi,
+        CouldNotRetrieveTranscript,
+        FailedToCreateConsentCookie,
+        TooManyRequests,
+        YouTubeRequestFailed,
+    )
+    # Erros que valem para qualquer vídeo (limite de requisições, falha de rede/HTTP):
+    # não adianta tentar o próximo
+    _ERROS_YOUTUBE_GERAIS = (TooManyRequests, YouTubeRequestFailed, FailedToCreateConsentCookie)
+    YOUTUBE_AVAILABLE = True
+except ImportError:
+    YOUTUBE_AVAILABLE = False
+
+# Palavras de pergunta removidas da query da Wikipedia
+_PALAVRAS_PERGUNTA_RE = re.compile(r"\b(?:what is|who is|when was|where is|how does)\b", re.IGNORECASE)
+_ESPACOS_RE = re.compile(r"\s+")
+
+# Máximo de bytes lidos das respostas JSON (respostas normais ficam bem abaixo disso)
+LIMITE_BYTES_JSON = 256 * 1024
+
+# Caracteres fora de um nome de recurso do DBpedia
+_NAO_PALAVRA_RE = re.compile(r"[^\w]")
+
+
+@functools.lru_cache(maxsize=1024)
+def _limpar_query_wikipedia(pergunta_en: str) -> str:
+    """Remove palavras de pergunta numa única passada (preserva maiúsculas dos nomes próprios)."""
+    return _ESPACOS_RE.sub(" ", _PALAVRAS_PERGUNTA_RE.sub("", pergunta_en)).strip()
+
 
 class BuscadorUnificado:
     """
     Orquestra buscas em TODAS as fontes disponíveis de forma inteligente.
     """
 
+    # Fonte -> método de busca (registro imutável, compartilhado entre instâncias)
+    _METODOS_FONTE = MappingProxyType({
+        "wolfram": "buscar_wolfram",
+        "google": "buscar_google",
+        "duckduckgo": "buscar_duckduckgo",
+        "wikipedia": "buscar_wikipedia",
+        "arxiv": "buscar_arxiv",
+        "dbpedia": "buscar_dbpedia",
+        "youtube": "buscar_youtube_transcript",
+    })
+
+    FONTES = tuple(_METODOS_FONTE)
+
+    # Timeout (segundos) das requisições HTTP de cada fonte
+    TIMEOUTS = MappingProxyType({
+        "wolfram": 5,
+        "google": 5,
+        "duckduckgo": 7,
+        "wikipedia": 7,
+        "arxiv": 10,
+        "dbpedia": 5,
+        "youtube": 10,
+    })
+
+    # Folga (segundos) além do timeout_total ao aguardar uma busca idêntica em andamento
+    MARGEM_ESPERA_EM_ANDAMENTO = 5
+
+    # Segundos de espera pelo endpoint simples do Wolfram antes de consultar também o spoken
+    ATRASO_SPOKEN_WOLFRAM = 0.3
+
     def __init__(
         self, 
         wolfram_app_id: str = None, 
@@ -27,27 +104,42 @@ class BuscadorUnificado:
         self.google_cx = google_cx
         self.google_api_key = google_api_key
 
-        # Mapeia métodos de busca
-        self.fontes_disponiveis = {
-            "wolfram": self.buscar_wolfram,
-            "google": self.buscar_google,
-            "duckduckgo": self.buscar_duckduckgo,
-            "wikipedia": self.buscar_wikipedia,
-            "arxiv": self.buscar_arxiv,
-            "dbpedia": self.buscar_dbpedia,
-            "youtube": self.buscar_youtube_transcript,
+        # Fontes que não podem responder (sem API key ou dependência) nem são agendadas
+        self._fontes_habilitadas = {
+            "wolfram": bool(wolfram_app_id),
+            "google": bool(google_cx and google_api_key),
+            "youtube": YOUTUBE_AVAILABLE,
         }
 
-        # Configurações de timeout por fonte
-        self.timeouts = {
-            "wolfram": 5,
-            "google": 5,
-            "duckduckgo": 7,
-            "wikipedia": 7,
-            "arxiv": 10,
-            "dbpedia": 5,
-            "youtube": 10,
-        }
+        # Sessão HTTP compartilhada (keep-alive + pool de conexões por host)
+        self.session = criar_sessao(pool_connections=16, pool_maxsize=32, retries=1, backoff_factor=0.1)
+
+        # Cache das buscas orquestradas (pergunta + fontes)
+        self._cache_busca = TTLCache(maxsize=2048, ttl=3600)
+        self._cache_lock = threading.Lock()
+
+        # Buscas em andamento: chamadas idênticas simultâneas aguardam o mesmo Future
+        self._em_andamento = {}
+
+        # Pool de threads persistente, criado uma única vez (antes, cada pergunta
+        # criava e destruía um ThreadPoolExecutor); folga para perguntas simultâneas
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(16, len(self.FONTES) * 2),
+            thread_name_prefix="buscador_unificado"
+        )
+
+        # Pool separado para os endpoints do Wolfram: buscar_wolfram já roda no
+        # pool principal, e esperar por uma tarefa do mesmo pool pode esgotá-lo
+        self._executor_wolfram = ThreadPoolExecutor(max_workers=4, thread_name_prefix="buscador_wolfram")
+
+        # Encerra pool e conexões ao finalizar o processo
+        atexit.register(self.close)
+
+    def close(self):
+        """Encerra os pools de threads e fecha as conexões da sessão."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor_wolfram.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
 
     # ============================================
     # BUSCA ORQUESTRADA
@@ -75,148 +167,194 @@ class BuscadorUnificado:
         Returns:
             Dict com resultados de cada fonte
         """
+        # normalizar_chave mantém operadores e dígitos: "12*4" e "12/4" não dividem resultados
+        chave = (normalizar_chave(pergunta_en), tuple(fontes_priorizadas or ()), max_fontes)
+
+        with self._cache_lock:
+            resultados = self._cache_busca.get(chave)
+            if resultados is not None:
+                logger.info("Busca servida pelo cache")
+                return dict(resultados)
+
+            future = self._em_andamento.get(chave)
+            dono = future is None
+            if dono:
+                future = Future()
+                self._em_andamento[chave] = future
+
+        # Pergunta idêntica já sendo buscada: aproveita o resultado em vez de repetir a busca.
+        # A espera é limitada: se a busca dona travar, a thread do servidor não fica presa nela
+        if not dono:
+            logger.info("Aguardando busca idêntica em andamento")
+            try:
+                return dict(future.result(timeout=timeout_total + self.MARGEM_ESPERA_EM_ANDAMENTO))
+            except TimeoutError:
+                logger.warning("Busca idêntica em andamento não terminou em %ss", timeout_total)
+                return {}
+
+        try:
+            resultados = self._buscar_inteligente_sem_cache(
+                pergunta_en, fontes_priorizadas, max_fontes, timeout_total
+            )
+            if any(resultados.values()):
+                with self._cache_lock:
+                    self._cache_busca[chave] = resultados
+            future.set_result(resultados)
+            return dict(resultados)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._cache_lock:
+                self._em_andamento.pop(chave, None)
+
+    def _buscar_inteligente_sem_cache(
+        self,
+        pergunta_en: str,
+        fontes_priorizadas: Optional[List[str]],
+        max_fontes: int,
+        timeout_total: int
+    ) -> Dict[str, Optional[str]]:
+        """Executa a busca orquestrada (ver buscar_inteligente)."""
         start_time = time.time()
         resultados = {}
 
         # Se não tem priorização, usa todas
         if not fontes_priorizadas:
-            fontes_priorizadas = list(self.fontes_disponiveis.keys())
-
-        # Limita número de fontes
-        fontes_a_buscar = fontes_priorizadas[:max_fontes]
-
-        logger.info(f"Buscando em {len(fontes_a_buscar)} fontes: {fontes_a_buscar}")
-
-        # Executa buscas em paralelo
-        with ThreadPoolExecutor(max_workers=max_fontes) as executor:
-            # Submete tarefas
-            futures = {}
-            for fonte in fontes_a_buscar:
-                if fonte in self.fontes_disponiveis:
-                    metodo = self.fontes_disponiveis[fonte]
-                    timeout_fonte = self.timeouts.get(fonte, 10)
-
-                    future = executor.submit(
-                        self._buscar_com_timeout,
-                        metodo,
-                        pergunta_en,
-                        timeout_fonte
-                    )
-                    futures[future] = fonte
-
-            # Coleta resultados conforme completam
-            tempo_decorrido = 0
+            fontes_priorizadas = list(self.FONTES)
+
+        # Descarta fontes desconhecidas ou desabilitadas antes de limitar, para não gastar vagas
+        fontes_a_buscar = [
+            f for f in fontes_priorizadas
+            if f in self._METODOS_FONTE and self._fontes_habilitadas.get(f, True)
+        ][:max_fontes]
+
+        logger.info("Buscando em %d fontes: %s", len(fontes_a_buscar), fontes_a_buscar)
+
+        # Executa buscas em paralelo no pool persistente
+        futures = {}
+        for fonte in fontes_a_buscar:
+            # Exceções são tratadas na coleta; o timeout de cada fonte é o da própria requisição HTTP
+            future = self._executor.submit(getattr(self, self._METODOS_FONTE[fonte]), pergunta_en)
+            futures[future] = fonte
+
+        # Coleta resultados conforme completam
+        pendentes = set(futures)
+        respostas_boas = 0
+        try:
             for future in as_completed(futures, timeout=timeout_total):
-                tempo_decorrido = time.time() - start_time
-
-                if tempo_decorrido >= timeout_total:
-                    logger.warning(f"Timeout total atingido ({timeout_total}s)")
-                    break
-
+                pendentes.discard(future)
                 fonte = futures[future]
 
                 try:
-                    resultado = future.result(timeout=1)
+                    # Já concluído: result() não bloqueia
+                    resultado = future.result()
                     resultados[fonte] = resultado
 
                     if resultado:
-                        logger.info(f"✓ {fonte}: obteve resposta ({len(resultado)} chars)")
+                        logger.info("✓ %s: obteve resposta (%d chars)", fonte, len(resultado))
+                        if len(resultado) > 100:
+                            respostas_boas += 1
                     else:
-                        logger.info(f"✗ {fonte}: sem resposta")
+                        logger.info("✗ %s: sem resposta", fonte)
 
                     # Early stopping: se já tem 2 respostas boas, para
-                    respostas_boas = sum(
-                        1 for r in resultados.values() 
-                        if r and len(r) > 100
-                    )
-
                     if respostas_boas >= 2:
                         logger.info("Early stopping: 2 respostas boas encontradas")
                         break
 
-                except TimeoutError:
-                    logger.warning(f"⏱ {fonte}: timeout")
-                    resultados[fonte] = None
                 except Exception as e:
-                    logger.error(f"❌ {fonte}: erro - {str(e)}")
+                    logger.error("❌ %s: erro - %s", fonte, e)
                     resultados[fonte] = None
+        except TimeoutError:
+            logger.warning("Timeout total atingido (%ss)", timeout_total)
+        finally:
+            # Libera o pool: tarefas que ainda não começaram não são executadas
+            for future in pendentes:
+                future.cancel()
 
         tempo_total = time.time() - start_time
-        logger.info(f"Busca concluída em {tempo_total:.2f}s - {len(resultados)} fontes consultadas")
+        logger.info("Busca concluída em %.2fs - %d fontes consultadas", tempo_total, len(resultados))
 
         return resultados
 
-    def _buscar_com_timeout(self, metodo, pergunta, timeout):
-        """Wrapper para executar busca com timeout."""
-        try:
-            return metodo(pergunta)
-        except Exception as e:
-            logger.error(f"Erro em busca: {str(e)}")
-            return None
+    def _get_json(self, fonte: str, url: str, params: dict = None) -> Optional[dict]:
+        """
+        GET com o timeout da fonte, lendo no máximo LIMITE_BYTES_JSON do corpo.
+        Retorna o JSON decodificado ou None se o status não for 200.
+        """
+        with self.session.get(url, params=params, timeout=self.TIMEOUTS[fonte], stream=True) as response:
+            if response.status_code != 200:
+                return None
+            return carregar_json(response, limite_bytes=LIMITE_BYTES_JSON)
 
     # ============================================
     # FONTES DE BUSCA INDIVIDUAIS
     # ============================================
 
+    # Fontes determinísticas (Wolfram, arXiv, DBpedia) também ficam 24h em disco
+    @cache_por_consulta(ttl=1800, ttl_disco=86400)
     def buscar_wolfram(self, pergunta_en: str) -> Optional[str]:
         """Busca no Wolfram Alpha - melhor para cálculos e fatos."""
         if not self.wolfram_app_id:
             return None
 
-        # Tenta endpoint simples
-        url_simple = (
-            f"http://api.wolframalpha.com/v1/result"
-            f"?i={requests.utils.quote(pergunta_en)}"
-            f"&appid={self.wolfram_app_id}"
-        )
+        # Mesmos parâmetros para os dois endpoints (codificados uma vez pelo requests)
+        params = {"i": pergunta_en, "appid": self.wolfram_app_id}
 
+        # O endpoint simples tem preferência. Cada endpoint gasta cota, então o spoken só é
+        # consultado se o simples falhar ou ainda não tiver respondido em ATRASO_SPOKEN_WOLFRAM
+        future_simple = self._executor_wolfram.submit(self._consultar_wolfram, "simple", params)
         try:
-            response = requests.get(url_simple, timeout=5)
-            if response.status_code == 200:
-                texto = response.text.strip()
-                if len(texto) > 10 and "did not understand" not in texto.lower():
-                    logger.info(f"Wolfram (simple): {texto[:80]}...")
+            texto = future_simple.result(timeout=self.ATRASO_SPOKEN_WOLFRAM)
+        except TimeoutError:
+            # Simples lento: dispara o spoken em paralelo e fica com a primeira resposta útil
+            future_spoken = self._executor_wolfram.submit(self._consultar_wolfram, "spoken", params)
+            for future in as_completed((future_simple, future_spoken)):
+                texto = future.result()
+                if texto:
+                    future_spoken.cancel()
                     return texto
-        except Exception as e:
-            logger.debug(f"Wolfram simple falhou: {str(e)}")
+            return None
 
-        # Tenta endpoint spoken
-        url_spoken = (
-            f"http://api.wolframalpha.com/v1/spoken"
-            f"?i={requests.utils.quote(pergunta_en)}"
-            f"&appid={self.wolfram_app_id}"
-        )
+        return texto or self._consultar_wolfram("spoken", params)
+
+    def _consultar_wolfram(self, endpoint: str, params: dict) -> Optional[str]:
+        """Consulta um endpoint do Wolfram Alpha ("simple" ou "spoken"); None se a resposta não servir."""
+        caminho = "result" if endpoint == "simple" else "spoken"
 
         try:
-            response = requests.get(url_spoken, timeout=5)
+            response = self.session.get(
+                f"http://api.wolframalpha.com/v1/{caminho}",
+                params=params,
+                timeout=self.TIMEOUTS["wolfram"]
+            )
             if response.status_code == 200:
                 texto = response.text.strip()
-                if len(texto) > 10:
-                    logger.info(f"Wolfram (spoken): {texto[:80]}...")
+                if len(texto) > 10 and (endpoint == "spoken" or "did not understand" not in texto.lower()):
+                    logger.info("Wolfram (%s): %.80s...", endpoint, texto)
                     return texto
         except Exception as e:
-            logger.debug(f"Wolfram spoken falhou: {str(e)}")
+            logger.debug("Wolfram %s falhou: %s", endpoint, e)
 
         return None
 
+    # Buscas web (Google, DuckDuckGo, YouTube): respostas mudam com o tempo ("current...",
+    # preços, notícias), então nada é servido com mais de 30 min (900s + 900s de stale)
+    # e nada vai para o disco
+    @cache_por_consulta(ttl=900, janela_stale=900)
     def buscar_google(self, pergunta_en: str) -> Optional[str]:
         """Google Custom Search - melhor para informações gerais."""
         if not (self.google_cx and self.google_api_key):
             return None
 
-        url = (
-            f"https://www.googleapis.com/customsearch/v1"
-            f"?q={requests.utils.quote(pergunta_en)}"
-            f"&cx={self.google_cx}"
-            f"&key={self.google_api_key}"
-            f"&num=3"
-        )
+        url = "https://www.googleapis.com/customsearch/v1"
+        params = {"q": pergunta_en, "cx": self.google_cx, "key": self.google_api_key, "num": 3}
 
         try:
-            response = requests.get(url, timeout=5)
-            data = response.json()
+            data = self._get_json("google", url, params)
 
-            if "items" in data:
+            if data and "items" in data:
                 snippets = [
                     item["snippet"] 
                     for item in data["items"][:3] 
@@ -225,30 +363,33 @@ class BuscadorUnificado:
 
                 if snippets:
                     texto = " ".join(snippets)
-                    logger.info(f"Google ({len(snippets)} resultados): {texto[:80]}...")
+                    logger.info("Google (%d resultados): %.80s...", len(snippets), texto)
                     return texto
 
         except Exception as e:
-            logger.error(f"Erro Google: {str(e)}")
+            logger.error("Erro Google: %s", e)
 
         return None
 
+    @cache_por_consulta(ttl=900, janela_stale=900)
     def buscar_duckduckgo(self, pergunta_en: str) -> Optional[str]:
         """DuckDuckGo Instant Answer - sem tracking."""
-        url = f"https://api.duckduckgo.com/?q={requests.utils.quote(pergunta_en)}&format=json"
+        url = "https://api.duckduckgo.com/"
+        params = {"q": pergunta_en, "format": "json"}
 
         try:
-            response = requests.get(url, timeout=7)
-            data = response.json()
+            data = self._get_json("duckduckgo", url, params)
+            if not data:
+                return None
 
             # AbstractText (mais confiável)
             if data.get("AbstractText") and len(data["AbstractText"]) > 50:
-                logger.info(f"DuckDuckGo (Abstract): {data['AbstractText'][:80]}...")
+                logger.info("DuckDuckGo (Abstract): %.80s...", data['AbstractText'])
                 return data["AbstractText"]
 
             # Definition
             if data.get("Definition") and len(data["Definition"]) > 50:
-                logger.info(f"DuckDuckGo (Definition): {data['Definition'][:80]}...")
+                logger.info("DuckDuckGo (Definition): %.80s...", data['Definition'])
                 return data["Definition"]
 
             # RelatedTopics
@@ -260,96 +401,86 @@ class BuscadorUnificado:
 
                 if textos:
                     texto_completo = " ".join(textos[:2])
-                    logger.info(f"DuckDuckGo (Topics): {texto_completo[:80]}...")
+                    logger.info("DuckDuckGo (Topics): %.80s...", texto_completo)
                     return texto_completo
 
         except Exception as e:
-            logger.error(f"Erro DuckDuckGo: {str(e)}")
+            logger.error("Erro DuckDuckGo: %s", e)
 
         return None
 
+    @cache_por_consulta(ttl=1800)
     def buscar_wikipedia(self, pergunta_en: str) -> Optional[str]:
         """Wikipedia - enciclopédia livre."""
         # Remove palavras de pergunta
-        query = pergunta_en.lower()
-        for palavra in ["what is", "who is", "when was", "where is", "how does"]:
-            query = query.replace(palavra, "")
-        query = query.strip()
-
-        # Busca artigos
-        search_url = (
-            f"https://en.wikipedia.org/w/api.php"
-            f"?action=query&list=search"
-            f"&srsearch={requests.utils.quote(query)}"
-            f"&format=json&srlimit=3"
-        )
+        query = _limpar_query_wikipedia(pergunta_en)
+
+        # Busca + extratos dos 2 primeiros artigos numa única chamada
+        params = {
+            "action": "query",
+            "generator": "search",
+            "gsrsearch": query,
+            "gsrlimit": 2,
+            "prop": "extracts",
+            "exintro": 1,
+            "explaintext": 1,
+            "exlimit": 2,
+            "format": "json",
+            "formatversion": 2
+        }
 
         try:
-            response = requests.get(search_url, timeout=7)
-            data = response.json()
+            data = self._get_json("wikipedia", "https://en.wikipedia.org/w/api.php", params)
 
-            if not data.get('query', {}).get('search'):
+            pages = (data or {}).get('query', {}).get('pages')
+            if not pages:
                 return None
 
-            # Tenta primeiros resultados
-            for resultado in data['query']['search'][:2]:
-                titulo = resultado['title']
-
-                # Busca conteúdo
-                content_url = (
-                    f"https://en.wikipedia.org/api/rest_v1/page/summary/"
-                    f"{titulo.replace(' ', '_')}"
-                )
-
-                content_response = requests.get(content_url, timeout=5)
-
-                if content_response.status_code == 200:
-                    content_data = content_response.json()
-                    extract = content_data.get("extract", "")
+            # "index" é a posição do artigo no ranking da busca
+            for page in sorted(pages, key=lambda p: p.get('index', 0)):
+                extract = page.get("extract", "")
 
-                    if len(extract) > 100:
-                        logger.info(f"Wikipedia: {extract[:80]}...")
-                        return extract
+                if len(extract) > 100:
+                    logger.info("Wikipedia: %.80s...", extract)
+                    return extract
 
         except Exception as e:
-            logger.error(f"Erro Wikipedia: {str(e)}")
+            logger.error("Erro Wikipedia: %s", e)
 
         return None
 
+    @cache_por_consulta(ttl=1800, ttl_disco=86400)
     def buscar_arxiv(self, pergunta_en: str) -> Optional[str]:
         """arXiv - artigos científicos."""
         try:
-            import urllib.parse
+            url = "http://export.arxiv.org/api/query"
+            params = {"search_query": f"all:{pergunta_en}", "start": 0, "max_results": 3}
 
-            query = urllib.parse.quote(pergunta_en)
-            url = f"http://export.arxiv.org/api/query?search_query=all:{query}&start=0&max_results=3"
-
-            response = requests.get(url, timeout=10)
-
-            if response.status_code != 200:
-                return None
+            # Parse XML em streaming: lê só até o segundo <summary>
+            with self.session.get(url, params=params, timeout=self.TIMEOUTS["arxiv"], stream=True) as response:
+                if response.status_code != 200:
+                    return None
 
-            # Parse XML
-            import re
-            summaries = re.findall(r'<summary>(.*?)</summary>', response.text, re.DOTALL)
+                response.raw.decode_content = True
+                summaries = extrair_resumos_atom(response.raw, quantidade=2)
 
             if summaries:
                 textos = []
                 for summary in summaries[:2]:
-                    summary_clean = ' '.join(summary.split())
-                    if len(summary_clean) > 100:
-                        textos.append(summary_clean)
+                    if len(summary) > 100:
+                        textos.append(summary)
 
                 if textos:
                     resultado = ' '.join(textos[:2])
-                    logger.info(f"arXiv: {resultado[:80]}...")
+                    logger.info("arXiv: %.80s...", resultado)
                     return resultado
 
         except Exception as e:
-            logger.error(f"Erro arXiv: {str(e)}")
+            logger.error("Erro arXiv: %s", e)
 
         return None
 
+    @cache_por_consulta(ttl=1800, ttl_disco=86400)
     def buscar_dbpedia(self, pergunta_en: str) -> Optional[str]:
         """DBpedia - dados estruturados."""
         try:
@@ -360,41 +491,44 @@ class BuscadorUnificado:
             if not palavras_relevantes:
                 return None
 
-            entidade = '_'.join(palavras_relevantes[:2])
+            # Só caracteres válidos num IRI (remove pontuação como "?" e ",")
+            entidade = _NAO_PALAVRA_RE.sub("", '_'.join(palavras_relevantes[:2]))
+            if not entidade:
+                return None
 
-            url = f"http://dbpedia.org/data/{entidade}.json"
-            response = requests.get(url, timeout=5)
+            # SPARQL pede só o abstract em inglês (KB), em vez do documento JSON inteiro da entidade (MB)
+            query = (
+                "PREFIX dbo: <http://dbpedia.org/ontology/> "
+                f"SELECT ?abs WHERE {{ <http://dbpedia.org/resource/{entidade}> dbo:abstract ?abs . "
+                'FILTER(lang(?abs) = "en") } LIMIT 1'
+            )
+            params = {"query": query, "format": "application/sparql-results+json"}
 
-            if response.status_code != 200:
+            data = self._get_json("dbpedia", "https://dbpedia.org/sparql", params)
+            if not data:
                 return None
 
-            data = response.json()
-            resource_uri = f"http://dbpedia.org/resource/{entidade}"
+            bindings = data.get("results", {}).get("bindings", [])
 
-            if resource_uri in data:
-                resource_data = data[resource_uri]
-                abstract_key = "http://dbpedia.org/ontology/abstract"
+            if bindings:
+                texto = bindings[0].get("abs", {}).get("value", "")
 
-                if abstract_key in resource_data:
-                    abstracts = resource_data[abstract_key]
-
-                    for abstract in abstracts:
-                        if abstract.get('lang') == 'en' and len(abstract.get('value', '')) > 100:
-                            texto = abstract['value']
-                            logger.info(f"DBpedia: {texto[:80]}...")
-                            return texto
+                if len(texto) > 100:
+                    logger.info("DBpedia: %.80s...", texto)
+                    return texto
 
         except Exception as e:
-            logger.error(f"Erro DBpedia: {str(e)}")
+            logger.error("Erro DBpedia: %s", e)
 
         return None
 
+    @cache_por_consulta(ttl=900, janela_stale=900)
     def buscar_youtube_transcript(self, pergunta_en: str) -> Optional[str]:
         """YouTube - transcrições de vídeos educacionais."""
-        try:
-            from youtube_search import YoutubeSearch
-            from youtube_transcript_api import YouTubeTranscriptApi
+        if not YOUTUBE_AVAILABLE:
+            return None
 
+        try:
             # Busca vídeos
             query = pergunta_en + " tutorial explanation"
             resultados = YoutubeSearch(query, max_results=3).to_dict()
@@ -416,14 +550,20 @@ class BuscadorUnificado:
                     texto = ' '.join([t['text'] for t in transcript[:20]])
 
                     if len(texto) > 100:
-                        logger.info(f"YouTube: {texto[:80]}...")
+                        logger.info("YouTube: %.80s...", texto)
                         return texto
 
-                except:
+                except _ERROS_YOUTUBE_GERAIS:
+                    # Limite de requisições ou falha de acesso ao YouTube: encerra a busca
+                    raise
+                except CouldNotRetrieveTranscript as e:
+                    # Só este vídeo não tem transcrição utilizável
+                    # (desativada, indisponível, sem inglês...): tenta o próximo
+                    logger.info("YouTube: sem transcrição para %s (%s)", video_id, type(e).__name__)
                     continue
 
         except Exception as e:
-            logger.error(f"Erro YouTube: {str(e)}")
+            logger.error("Erro YouTube: %s", e)
 
         return None
 
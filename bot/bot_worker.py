@@ -3,19 +3,30 @@ Bot Worker - Versão refatorada com integração ao banco de dados
 Busca em todas as APIs e combina respostas de forma inteligente
 """
 
+import atexit
 import logging
+import random
+import re
+import threading
 import time
-from random import choice
-from cachetools import TTLCache
-
-from bot.utils.config import Config
-from bot.api.search import BuscadorAPI
-from bot.utils.text_utils import normalizar_texto, detectar_idioma, traduzir
-from bot.utils.question_analyzer import AnalisadorPergunta
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed
+from typing import Optional
+from cachetools import LRUCache, TTLCache
+
+from bot.api.search import get_buscador_api
+from bot.utils.text_utils import (
+    normalizar_texto, detectar_idioma, detectar_idioma_rapido, esta_no_idioma, traduzir, traduzir_lote
+)
+from bot.utils.question_analyzer import AnalisadorPergunta, detectar_intencao_rapida
 from bot.utils.response_combiner import CombinadorRespostas
-from bot.utils.response_formatter import FormatadorResposta, RESPOSTAS_INTENCAO
+from bot.utils.response_formatter import FormatadorResposta, RESPOSTAS_DESCONHECIDA, RESPOSTAS_INTENCAO
 from bot.utils.advanced_analyzer import AnalisadorAvancado
 from bot.utils.search_strategy import EstrategiaBusca
+from bot.utils import cache as cache_compartilhado
+from bot.utils.conversation_writer import GravadorConversas, resumir_logs
+from bot.utils.semantic_cache import CacheSemantico, normalizar_chave
 from bot.ml.learning_system import SistemaAprendizado
 from bot.ml.feedback_system import SistemaFeedback
 from repositories.bot_repository import BotRepository
@@ -23,11 +34,36 @@ from repositories.bot_repository import BotRepository
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Cache de respostas (em memória)
-cache = TTLCache(maxsize=100, ttl=3600)
+# Busca nas APIs: basta este número de fontes com resposta para seguir adiante
+# (a latência fica limitada pela 2ª fonte mais rápida, não pela mais lenta)
+MIN_FONTES_RESPONDIDAS = 2
+TIMEOUT_BUSCA_APIS = 15
+
+# Validação da entrada: tamanho máximo e ao menos uma letra ou dígito
+# (\w sem o sublinhado, equivalente a str.isalnum em uma só busca)
+TAMANHO_MAXIMO_MENSAGEM = 500
+_ALNUM_RE = re.compile(r'[^\W_]')
+
+
+def _registrar(logs: list, etapa: str, start_time: float, **dados):
+    """Adiciona uma entrada de log com o tempo decorrido desde start_time (perf_counter)."""
+    logs.append({"etapa": etapa, "timestamp": time.perf_counter() - start_time, **dados})
 
-# Contexto da conversa
-contexto = []
+
+@contextmanager
+def _fase(logs: list, etapa: str, start_time: float):
+    """
+    Registra uma etapa como uma única entrada de log com início e duração.
+    O dicionário devolvido recebe os resultados da etapa; a entrada é
+    adicionada ao sair do bloco, inclusive em retorno antecipado.
+    """
+    inicio = time.perf_counter()
+    dados = {}
+    try:
+        yield dados
+    finally:
+        fim = time.perf_counter()
+        logs.append({"etapa": etapa, "timestamp": inicio - start_time, "duracao": fim - inicio, **dados})
 
 
 class BotWorker:
@@ -38,11 +74,8 @@ class BotWorker:
 
     def __init__(self):
         # Inicializa componentes
-        self.buscador = BuscadorAPI(
-            wolfram_app_id=Config.WOLFRAM_APP_ID,
-            google_cx=Config.GOOGLE_CX,
-            google_api_key=Config.GOOGLE_API_KEY
-        )
+        # Buscador compartilhado pelo processo (sessão HTTP e caches sobrevivem entre instâncias)
+        self.buscador = get_buscador_api()
         self.analisador = AnalisadorPergunta()
         self.combinador = CombinadorRespostas()
         self.formatador = FormatadorResposta()
@@ -54,10 +87,50 @@ class BotWorker:
         self.sistema_feedback = SistemaFeedback(self.repository)
 
         self.contador_conversas = 0
+        self._contador_lock = threading.Lock()
+
+        # Retreinamento periódico fora do caminho da resposta: um único worker,
+        # e no máximo um retreino em andamento (o lock é liberado ao terminar)
+        self._executor_treino = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bot_worker_treino")
+        self._treino_lock = threading.Lock()
+
+        # Gerador próprio para as respostas prontas (independente do estado do random global)
+        self._rng = random.Random()
+
+        # Cache de respostas (compartilhado entre usuários: as respostas vêm de fontes públicas).
+        # Busca exata e, em caso de miss, por similaridade: paráfrases da mesma pergunta
+        # reaproveitam a resposta sem passar pelas APIs e pela tradução
+        self._cache = CacheSemantico(maxsize=10000, ttl=3600, limiar=0.92)
+
+        # Plano de busca (fontes e queries) por pergunta: a estratégia é determinística
+        # dada a análise, que por sua vez só depende da pergunta
+        self._planos_busca = LRUCache(maxsize=2048)
+        self._planos_busca_lock = threading.Lock()
+
+        # Contexto da conversa por usuário (últimas 5 interações de cada um);
+        # expira após 30 min sem atividade do usuário
+        self._contexto = TTLCache(maxsize=10000, ttl=1800)
+        self._contexto_lock = threading.Lock()
+
+        # Pool para as etapas de rede por pergunta (busca das queries e tradução dos resultados em paralelo)
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="bot_worker")
+
+        # Conversas gravadas em lotes em segundo plano: a resposta não espera pelo INSERT
+        self._gravador = GravadorConversas(self.repository, nome="bot_worker_gravador")
+        atexit.register(self.close)
         
         logger.info("BotWorker inicializado com sucesso (versão com DB).")
 
-    def process_query(self, query: str, user_id: int = None) -> dict:
+    def close(self):
+        """
+        Grava as conversas pendentes e encerra o pool de threads do worker.
+        O buscador (e sua sessão HTTP) é do processo e é fechado por get_buscador_api.
+        """
+        self._gravador.close()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor_treino.shutdown(wait=False, cancel_futures=True)
+
+    def process_query(self, query: str, user_id: Optional[int] = None) -> dict:
         """
         Processa uma query do usuário e retorna resposta estruturada.
         Se user_id for fornecido, salva a conversa no banco de dados.
@@ -69,48 +142,27 @@ class BotWorker:
         Returns:
             Dicionário com status, resposta e metadados incluindo logs do processo
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
         logs_processo = []
 
         try:
-            logs_processo.append({"etapa": "inicio", "timestamp": time.time() - start_time, "detalhes": f"Query recebida: {query}"})
+            _registrar(logs_processo, "inicio", start_time, detalhes=f"Query recebida: {query}")
             logger.info(f"Processando query: {query} (user_id: {user_id})")
 
             # Valida entrada
             valid, message = self._validate_input(query)
             if not valid:
-                logs_processo.append({"etapa": "validacao", "timestamp": time.time() - start_time, "status": "erro", "detalhes": message})
-                
-                # Salva erro no banco se user_id fornecido
-                if user_id:
-                    self._save_conversation(
-                        user_id=user_id,
-                        pergunta=query,
-                        resposta=message,
-                        fonte="validacao",
-                        tempo_processamento=time.time() - start_time,
-                        status="error",
-                        logs_processo=logs_processo
-                    )
-                
-                return {
-                    "status": "error",
-                    "query": query,
-                    "message": message,
-                    "user_id": user_id,
-                    "response": "",
-                    "source": "validacao",
-                    "processing_time": round(time.time() - start_time, 3),
-                    "logs_processo": logs_processo
-                }
+                processing_time = time.perf_counter() - start_time
+                logs_processo.append({"etapa": "validacao", "timestamp": processing_time, "status": "erro", "detalhes": message})
+                return self._resposta_erro(query, user_id, "validacao", message, "", processing_time, logs_processo)
 
-            logs_processo.append({"etapa": "validacao", "timestamp": time.time() - start_time, "status": "ok"})
+            _registrar(logs_processo, "validacao", start_time, status="ok")
 
             # Obtém resposta
-            response, source, logs_busca = self._get_bot_response_with_logs(query, start_time)
+            response, source, logs_busca = self._get_bot_response_with_logs(query, start_time, user_id)
             logs_processo.extend(logs_busca)
 
-            processing_time = time.time() - start_time
+            processing_time = time.perf_counter() - start_time
             logs_processo.append({"etapa": "fim", "timestamp": processing_time, "detalhes": "Processamento concluído"})
 
             # Salva conversa no banco se user_id fornecido
@@ -137,37 +189,43 @@ class BotWorker:
 
         except Exception as e:
             logger.error(f"Erro ao processar query: {str(e)}", exc_info=True)
-            processing_time = time.time() - start_time
+            processing_time = time.perf_counter() - start_time
             logs_processo.append({"etapa": "erro", "timestamp": processing_time, "detalhes": str(e)})
-            
-            error_message = "Ocorreu um erro ao processar sua pergunta."
-            
-            # Salva erro no banco se user_id fornecido
-            if user_id:
-                self._save_conversation(
-                    user_id=user_id,
-                    pergunta=query,
-                    resposta=error_message,
-                    fonte="erro",
-                    tempo_processamento=processing_time,
-                    status="error",
-                    logs_processo=logs_processo
-                )
-            
-            return {
-                "status": "error",
-                "query": query,
-                "message": f"Erro interno: {str(e)}",
-                "response": error_message,
-                "source": "erro",
-                "user_id": user_id,
-                "processing_time": round(processing_time, 3),
-                "logs_processo": logs_processo
-            }
+            return self._resposta_erro(
+                query, user_id, "erro", f"Erro interno: {str(e)}",
+                "Ocorreu um erro ao processar sua pergunta.", processing_time, logs_processo
+            )
+
+    def _resposta_erro(self, query, user_id, fonte, message, response, processing_time, logs_processo):
+        """
+        Monta a resposta de erro de process_query e, se user_id for fornecido,
+        salva a conversa com status "error" (resposta salva: response ou, se vazia, message).
+        """
+        if user_id:
+            self._save_conversation(
+                user_id=user_id,
+                pergunta=query,
+                resposta=response or message,
+                fonte=fonte,
+                tempo_processamento=processing_time,
+                status="error",
+                logs_processo=logs_processo
+            )
+
+        return {
+            "status": "error",
+            "query": query,
+            "message": message,
+            "response": response,
+            "source": fonte,
+            "user_id": user_id,
+            "processing_time": round(processing_time, 3),
+            "logs_processo": logs_processo
+        }
 
     def _save_conversation(self, user_id, pergunta, resposta, fonte, tempo_processamento, status, logs_processo):
         """
-        Salva a conversa no banco de dados via repository.
+        Enfileira a conversa para ser salva no banco de dados em segundo plano.
         
         Args:
             user_id (int): ID do usuário
@@ -176,35 +234,22 @@ class BotWorker:
             fonte (str): Fonte(s) usada(s)
             tempo_processamento (float): Tempo em segundos
             status (str): Status da operação
-            logs_processo (list): Logs detalhados do processo
+            logs_processo (list): Logs detalhados do processo (resumidos no metadata)
         """
-        try:
-            # Prepara metadata
-            metadata = {
-                "logs_processo": logs_processo,
-                "cache_usado": tempo_processamento < 0.1
-            }
-            
-            # Salva no banco
-            conversation = self.repository.create_conversation(
-                user_id=user_id,
-                pergunta=pergunta,
-                resposta=resposta,
-                fonte=fonte,
-                tempo_processamento=tempo_processamento,
-                status=status,
-                metadata=metadata
-            )
-            
-            if conversation:
-                logger.info(f"Conversa salva no banco: ID={conversation.id}")
-            else:
-                logger.error("Falha ao salvar conversa no banco")
-                
-        except Exception as e:
-            logger.error(f"Erro ao salvar conversa: {str(e)}", exc_info=True)
+        # Metadata guarda só o resumo dos logs (a lista completa vai na resposta da API)
+        metadata = resumir_logs(logs_processo, tempo_processamento)
+
+        self._gravador.enfileirar({
+            "user_id": user_id,
+            "pergunta": pergunta,
+            "resposta": resposta,
+            "fonte": fonte,
+            "tempo_processamento": tempo_processamento,
+            "status": status,
+            "metadata": metadata
+        })
 
-    def get_user_history(self, user_id, limit=20, offset=0):
+    def get_user_history(self, user_id, limit=20, offset=0, cursor=None, include_total=False):
         """
         Busca histórico de conversas do usuário.
         
@@ -212,22 +257,36 @@ class BotWorker:
             user_id (int): ID do usuário
             limit (int): Número de conversas por página
             offset (int): Deslocamento para paginação
+            cursor (int, optional): next_cursor da página anterior; quando informado,
+                a paginação é por cursor (keyset) e offset é ignorado
+            include_total (bool): Se True, inclui o total de conversas (COUNT extra);
+                caso contrário pagination.total é None
             
         Returns:
             dict: Histórico com conversas e metadados de paginação
         """
         try:
-            conversations = self.repository.get_user_conversations(user_id, limit, offset)
-            total = self.repository.get_total_conversations_count(user_id)
+            # Total só quando pedido, em paralelo com a página
+            future_total = None
+            if include_total:
+                future_total = self._executor.submit(self.repository.get_total_conversations_count_cached, user_id)
+
+            # Uma linha a mais indica se há próxima página (dispensa o COUNT)
+            conversations = self.repository.get_user_conversations_summary(user_id, limit + 1, offset, cursor=cursor)
+            has_more = len(conversations) > limit
+            conversations = conversations[:limit]
+
+            total = future_total.result() if future_total is not None else None
             
             return {
                 "status": "success",
-                "conversations": [c.to_dict_summary() for c in conversations],
+                "conversations": conversations,
                 "pagination": {
                     "total": total,
                     "limit": limit,
                     "offset": offset,
-                    "has_more": (offset + limit) < total
+                    "has_more": has_more,
+                    "next_cursor": conversations[-1]["id"] if has_more and conversations else None
                 }
             }
         except Exception as e:
@@ -236,7 +295,7 @@ class BotWorker:
                 "status": "error",
                 "message": str(e),
                 "conversations": [],
-                "pagination": {"total": 0, "limit": limit, "offset": offset, "has_more": False}
+                "pagination": {"total": 0, "limit": limit, "offset": offset, "has_more": False, "next_cursor": None}
             }
 
     def get_conversation(self, conversation_id):
@@ -282,12 +341,12 @@ class BotWorker:
             dict: Resultados da busca
         """
         try:
-            conversations = self.repository.search_conversations(user_id, query, limit)
+            conversations = self.repository.search_conversations_summary(user_id, query, limit)
             
             return {
                 "status": "success",
                 "query": query,
-                "results": [c.to_dict_summary() for c in conversations],
+                "results": conversations,
                 "total": len(conversations)
             }
         except Exception as e:
@@ -383,174 +442,314 @@ class BotWorker:
 
     def _validate_input(self, mensagem: str) -> tuple:
         """Valida entrada do usuário."""
-        if len(mensagem) > 500:
+        if len(mensagem) > TAMANHO_MAXIMO_MENSAGEM:
             return False, "Mensagem muito longa! Tente algo mais curto."
-        if not any(c.isalnum() for c in mensagem):
+        if not _ALNUM_RE.search(mensagem):
             return False, "Por favor, envie uma mensagem válida."
         return True, ""
 
-    def _get_bot_response_with_logs(self, pergunta: str, start_time: float) -> tuple:
+    def _get_bot_response_with_logs(self, pergunta: str, start_time: float, user_id: Optional[int] = None) -> tuple:
         """
         VERSÃO MELHORADA com análise avançada e aprendizado.
         """
         logs = []
 
         try:
+            # 0. CONVERSA CASUAL ("oi", "tchau"...): resposta pronta, sem modelo nem busca
+            intencao = detectar_intencao_rapida(pergunta)
+            if intencao:
+                _registrar(logs, "resposta_direta", start_time, intencao=intencao, atalho=True)
+                return self._rng.choice(RESPOSTAS_INTENCAO[intencao]), intencao, logs
+
+            # Normalizada uma única vez (aprendizado e contexto usam a mesma forma)
+            pergunta_norm = normalizar_texto(pergunta)
+
             # 1. BUSCAR RESPOSTA APRENDIDA PRIMEIRO
-            logs.append({"etapa": "buscar_aprendida", "timestamp": time.time() - start_time, "inicio": True})
-            resposta_aprendida, qualidade_aprendida = self.sistema_aprendizado.buscar_resposta_aprendida(pergunta)
-            
-            if resposta_aprendida and qualidade_aprendida > 0.9:
-                logs.append({"etapa": "buscar_aprendida", "timestamp": time.time() - start_time, 
-                           "resultado": "encontrada", "qualidade": qualidade_aprendida})
-                logger.info(f"Usando resposta aprendida (qualidade: {qualidade_aprendida:.2f})")
-                return resposta_aprendida, "aprendizado", logs
-            
-            logs.append({"etapa": "buscar_aprendida", "timestamp": time.time() - start_time, "resultado": "nao_encontrada"})
+            with _fase(logs, "buscar_aprendida", start_time) as log:
+                resposta_aprendida, qualidade_aprendida = self.sistema_aprendizado.buscar_resposta_aprendida(pergunta_norm)
+
+                if resposta_aprendida and qualidade_aprendida > 0.9:
+                    log.update(resultado="encontrada", qualidade=qualidade_aprendida)
+                    logger.info(f"Usando resposta aprendida (qualidade: {qualidade_aprendida:.2f})")
+                    return resposta_aprendida, "aprendizado", logs
+
+                log["resultado"] = "nao_encontrada"
 
             # 2. ANÁLISE AVANÇADA DA PERGUNTA
-            logs.append({"etapa": "analise_avancada", "timestamp": time.time() - start_time, "inicio": True})
-            analise_completa = self.analisador_avancado.analisar_completo(pergunta)
-            logs.append({"etapa": "analise_avancada", "timestamp": time.time() - start_time, "resultado": analise_completa})
-            
+            with _fase(logs, "analise_avancada", start_time) as log:
+                analise_completa = self.analisador_avancado.analisar_completo(pergunta)
+                log["resultado"] = analise_completa
+
             # 3. DETECTAR INTENÇÃO (com ML se disponível)
-            logs.append({"etapa": "detectar_intencao_ml", "timestamp": time.time() - start_time, "inicio": True})
-            intencao = self.sistema_aprendizado.prever_intencao(pergunta)
-            logs.append({"etapa": "detectar_intencao_ml", "timestamp": time.time() - start_time, "resultado": intencao})
+            with _fase(logs, "detectar_intencao_ml", start_time) as log:
+                intencao = self.sistema_aprendizado.prever_intencao(pergunta)
+                log["resultado"] = intencao
 
             # Se não é pergunta de conhecimento, responde direto
             if intencao != "conhecimento":
-                resposta = choice(RESPOSTAS_INTENCAO[intencao])
-                logs.append({"etapa": "resposta_direta", "timestamp": time.time() - start_time, "intencao": intencao})
+                resposta = self._rng.choice(RESPOSTAS_INTENCAO[intencao])
+                _registrar(logs, "resposta_direta", start_time, intencao=intencao)
                 return resposta, intencao, logs
 
             # 4. ATUALIZAR CONTEXTO
-            self._atualizar_contexto(pergunta, intencao)
+            self._atualizar_contexto(user_id, pergunta_norm, intencao)
 
             # 5. VERIFICAR CACHE
-            pergunta_normalizada = normalizar_texto(pergunta)
-            if pergunta_normalizada in cache:
+            em_cache = self._cache.get(pergunta)
+            if em_cache is not None:
                 logger.info("Resposta obtida do cache")
-                logs.append({"etapa": "cache", "timestamp": time.time() - start_time, "resultado": "hit"})
-                resposta, fonte = cache[pergunta_normalizada]
+                _registrar(logs, "cache", start_time, resultado="hit")
+                resposta, fonte = em_cache
                 return resposta, fonte, logs
 
-            logs.append({"etapa": "cache", "timestamp": time.time() - start_time, "resultado": "miss"})
+            _registrar(logs, "cache", start_time, resultado="miss")
 
             # 6. DETECTAR TIPO DE PERGUNTA
-            logs.append({"etapa": "tipo_pergunta", "timestamp": time.time() - start_time, "inicio": True})
-            tipo_pergunta = self.analisador.detectar_tipo_pergunta(pergunta)
-            logs.append({"etapa": "tipo_pergunta", "timestamp": time.time() - start_time, "resultado": tipo_pergunta})
+            with _fase(logs, "tipo_pergunta", start_time) as log:
+                tipo_pergunta = self.analisador.detectar_tipo_pergunta(pergunta)
+                log["resultado"] = tipo_pergunta
 
             # 7. ESTRATÉGIA DE BUSCA INTELIGENTE
-            logs.append({"etapa": "estrategia_busca", "timestamp": time.time() - start_time, "inicio": True})
-            fontes_selecionadas = self.estrategia_busca.selecionar_fontes(analise_completa)
-            queries_multiplas = self.estrategia_busca.criar_queries_multiplas(pergunta, analise_completa)
-            logs.append({"etapa": "estrategia_busca", "timestamp": time.time() - start_time, 
-                       "fontes": fontes_selecionadas, "queries": queries_multiplas})
+            with _fase(logs, "estrategia_busca", start_time) as log:
+                fontes_selecionadas, queries_multiplas = self._planejar_busca(pergunta, analise_completa)
+                log.update(fontes=fontes_selecionadas, queries=queries_multiplas)
 
             # 8. TRADUÇÃO E BUSCA
-            idioma = detectar_idioma(pergunta)
-            logs.append({"etapa": "detectar_idioma", "timestamp": time.time() - start_time, "idioma": idioma})
+            idioma = detectar_idioma_rapido(pergunta)
+            if idioma:
+                _registrar(logs, "detectar_idioma_fast", start_time, idioma=idioma)
+            else:
+                idioma = detectar_idioma(pergunta)
+                _registrar(logs, "detectar_idioma", start_time, idioma=idioma)
+
+            # Cache compartilhado entre processos (Redis), consultado após o miss local.
+            # Mesma chave do cache local: pergunta normalizada com operadores e dígitos
+            chave_compartilhada = cache_compartilhado.montar_chave(tipo_pergunta, idioma, normalizar_chave(pergunta))
+            with _fase(logs, "cache_compartilhado", start_time) as log:
+                em_cache = cache_compartilhado.get(chave_compartilhada)
+                log["resultado"] = "hit" if em_cache is not None else "miss"
+
+            if em_cache is not None:
+                resposta, fonte = em_cache
+                self._cache.set(pergunta, (resposta, fonte))
+                return resposta, fonte, logs
 
-            # Busca com múltiplas queries se necessário
-            resultados_agregados = {}
-            
-            for query in queries_multiplas[:2]:  # Máximo 2 queries para não sobrecarregar
-                query_en = query if idioma == "en" else traduzir(query, origem=idioma, destino="en")
-                logs.append({"etapa": "traduzir_query", "timestamp": time.time() - start_time, "query_en": query_en})
-
-                # BUSCA NAS FONTES SELECIONADAS
-                logs.append({"etapa": "buscar_apis", "timestamp": time.time() - start_time, "inicio": True})
-                resultados = self.buscador.buscar_todas(query_en)
-                
-                # Filtra apenas fontes selecionadas
-                resultados_filtrados = {k: v for k, v in resultados.items() if k in fontes_selecionadas}
-                
-                # Mescla resultados
-                for fonte, resultado in resultados_filtrados.items():
-                    if resultado and fonte not in resultados_agregados:
-                        resultados_agregados[fonte] = resultado
-
-            logs.append({"etapa": "buscar_apis", "timestamp": time.time() - start_time, "resultados": resultados_agregados})
-
-            # 9. TRADUZ RESULTADOS
-            logs.append({"etapa": "traduzir_resultados", "timestamp": time.time() - start_time, "inicio": True})
-            resultados_pt = {}
-            for fonte, resultado in resultados_agregados.items():
-                if resultado:
-                    try:
-                        resultado_traduzido = traduzir(resultado, origem="en", destino="pt")
-                        resultados_pt[fonte] = resultado_traduzido
-                    except Exception as e:
-                        logger.error(f"Erro ao traduzir resultado de {fonte}: {str(e)}")
-                        resultados_pt[fonte] = resultado
+            # Busca com múltiplas queries se necessário (máximo 2, em paralelo)
+            with _fase(logs, "buscar_apis", start_time) as log:
+                futures = {
+                    self._executor.submit(self._traduzir_e_buscar, q, idioma, fontes_selecionadas): i
+                    for i, q in enumerate(queries_multiplas[:2])
+                }
+
+                # Cada query já retorna assim que MIN_FONTES_RESPONDIDAS fontes respondem;
+                # entre queries, para de esperar quando o conjunto mesclado chega lá
+                concluidas = {}
+                try:
+                    for future in as_completed(futures, timeout=TIMEOUT_BUSCA_APIS):
+                        try:
+                            concluidas[futures[future]] = future.result()
+                        except Exception as e:
+                            logger.error(f"Erro na busca da query {futures[future]}: {str(e)}")
+                            continue
+
+                        if len(self._mesclar_resultados(concluidas, fontes_selecionadas)) >= MIN_FONTES_RESPONDIDAS:
+                            break
+                except TimeoutError:
+                    logger.warning(f"Timeout da busca nas APIs ({TIMEOUT_BUSCA_APIS}s)")
+                finally:
+                    for future in futures:
+                        future.cancel()
+
+                resultados_agregados = self._mesclar_resultados(concluidas, fontes_selecionadas)
+
+                # Uma entrada por query concluída, com o tempo da sua própria busca
+                log.update(
+                    buscas=[
+                        {"query_en": concluidas[i][0], "duracao": concluidas[i][2]}
+                        for i in sorted(concluidas)
+                    ],
+                    resultados=resultados_agregados
+                )
+
+            # 9. TRADUZ RESULTADOS (pergunta em inglês recebe a resposta em inglês)
+            if idioma == "en":
+                resultados_pt = {f: r for f, r in resultados_agregados.items() if r}
+            else:
+                with _fase(logs, "traduzir_resultados", start_time) as log:
+                    resultados_pt = {f: r for f, r in resultados_agregados.items() if r}
+
+                    # Resultados que já vieram em português ficam como estão
+                    fontes_traduzir = [f for f, r in resultados_pt.items() if not esta_no_idioma(r, "pt")]
+                    log["ja_em_portugues"] = len(resultados_pt) - len(fontes_traduzir)
+
+                    if fontes_traduzir:
+                        # Todas as fontes numa única chamada ao tradutor
+                        traducoes = traduzir_lote(
+                            [resultados_pt[f] for f in fontes_traduzir],
+                            origem="en",
+                            destino="pt"
+                        )
+                        log["lote"] = traducoes is not None
+
+                        if traducoes is None:
+                            # Sem lote: uma chamada por fonte, todas em paralelo
+                            traducoes = self._executor.map(
+                                lambda f: self._traduzir_resultado(f, resultados_pt[f]),
+                                fontes_traduzir
+                            )
+                        resultados_pt.update(zip(fontes_traduzir, traducoes))
 
             # 10. COMBINA RESPOSTAS
-            logs.append({"etapa": "combinar_respostas", "timestamp": time.time() - start_time, "inicio": True})
-            resposta_combinada, fonte_principal = self.combinador.combinar_com_fonte_principal(
-                resultados_pt, 
-                pergunta, 
-                tipo_pergunta
-            )
+            with _fase(logs, "combinar_respostas", start_time):
+                resposta_combinada, fonte_principal = self.combinador.combinar_com_fonte_principal(
+                    resultados_pt, 
+                    pergunta, 
+                    tipo_pergunta
+                )
 
             if not resposta_combinada:
                 logger.info("Nenhuma resposta válida encontrada")
-                resposta = choice(RESPOSTAS_INTENCAO["desconhecida"])
+                resposta = self._rng.choice(RESPOSTAS_DESCONHECIDA)
                 fonte = "nenhuma"
-                logs.append({"etapa": "resposta_fallback", "timestamp": time.time() - start_time})
+                _registrar(logs, "resposta_fallback", start_time)
             else:
                 # 11. FORMATA RESPOSTA
-                logs.append({"etapa": "formatar_resposta", "timestamp": time.time() - start_time, "inicio": True})
-                resposta = self.formatador.formatar_final(resposta_combinada, tipo_pergunta)
-                fonte = fonte_principal
+                with _fase(logs, "formatar_resposta", start_time):
+                    resposta = self.formatador.formatar_final(resposta_combinada, tipo_pergunta)
+                    fonte = fonte_principal
 
                 # 12. AVALIA QUALIDADE DA RESPOSTA (ML)
-                qualidade = self.sistema_aprendizado.avaliar_qualidade_resposta(pergunta, resposta)
-                logs.append({"etapa": "avaliar_qualidade", "timestamp": time.time() - start_time, "qualidade": qualidade})
+                with _fase(logs, "avaliar_qualidade", start_time) as log:
+                    qualidade = self.sistema_aprendizado.avaliar_qualidade_resposta(pergunta, resposta)
+                    log["qualidade"] = qualidade
 
                 # 13. APRENDE PADRÃO SE BOA RESPOSTA
                 if qualidade > 0.7:
-                    self.sistema_aprendizado.aprender_padrao(pergunta, resposta, qualidade)
-                    logs.append({"etapa": "aprender_padrao", "timestamp": time.time() - start_time})
+                    with _fase(logs, "aprender_padrao", start_time):
+                        self.sistema_aprendizado.aprender_padrao(pergunta_norm, resposta, qualidade)
 
             # 14. ATUALIZA STATS DAS FONTES
-            tempo_busca = time.time() - start_time
+            tempo_busca = time.perf_counter() - start_time
             sucesso = resposta_combinada is not None
             if fonte_principal and fonte_principal != "nenhuma":
                 fontes_usadas = fonte_principal.split("+")
-                for f in fontes_usadas:
-                    self.sistema_aprendizado.atualizar_stats_fonte(f, tempo_busca, sucesso)
+                self.sistema_aprendizado.atualizar_stats_fontes(fontes_usadas, tempo_busca, sucesso)
 
             # Salva no cache
-            cache[pergunta_normalizada] = (resposta, fonte)
-            logs.append({"etapa": "salvar_cache", "timestamp": time.time() - start_time})
+            self._cache.set(pergunta, (resposta, fonte))
+            cache_compartilhado.set(chave_compartilhada, (resposta, fonte), ttl=3600)
+            _registrar(logs, "salvar_cache", start_time)
 
             # 15. RETREINAMENTO PERIÓDICO
-            self.contador_conversas += 1
-            if self.contador_conversas % 100 == 0:  # A cada 100 conversas
-                logger.info("Iniciando retreinamento periódico...")
-                self.sistema_aprendizado.retreinar_periodicamente()
+            with self._contador_lock:
+                self.contador_conversas += 1
+                retreinar = self.contador_conversas % 100 == 0  # A cada 100 conversas
+            if retreinar:
+                self._agendar_retreinamento()
 
             return resposta, fonte, logs
 
         except Exception as e:
             logger.error(f"Erro ao obter resposta: {str(e)}", exc_info=True)
-            logs.append({"etapa": "erro_geral", "timestamp": time.time() - start_time, "erro": str(e)})
+            _registrar(logs, "erro_geral", start_time, erro=str(e))
             return "Ocorreu um erro ao processar sua pergunta.", "erro", logs
 
-    def _atualizar_contexto(self, pergunta: str, intencao: str):
-        """Atualiza o contexto da conversa."""
-        global contexto
+    def _planejar_busca(self, pergunta: str, analise_completa: dict) -> tuple:
+        """
+        Retorna (fontes, queries) para a pergunta, como tuplas imutáveis.
+        Usa a mesma chave do cache de analisar_completo (espaços colapsados).
+        """
+        chave = " ".join(pergunta.split())
+        with self._planos_busca_lock:
+            plano = self._planos_busca.get(chave)
+        if plano is not None:
+            return plano
+
+        plano = (
+            tuple(self.estrategia_busca.selecionar_fontes(analise_completa)),
+            tuple(self.estrategia_busca.criar_queries_multiplas(pergunta, analise_completa))
+        )
+        with self._planos_busca_lock:
+            self._planos_busca[chave] = plano
+        return plano
+
+    def _agendar_retreinamento(self):
+        """Dispara o retreinamento em segundo plano, se não houver um em andamento."""
+        if not self._treino_lock.acquire(blocking=False):
+            logger.info("Retreinamento já em andamento, ignorando")
+            return
 
-        contexto.append({
-            "pergunta": normalizar_texto(pergunta),
-            "intencao": intencao
-        })
+        logger.info("Iniciando retreinamento periódico...")
+        try:
+            self._executor_treino.submit(self._retreinar)
+        except RuntimeError:
+            # Executor já encerrado (processo finalizando)
+            self._treino_lock.release()
+
+    def _retreinar(self):
+        try:
+            self.sistema_aprendizado.retreinar_periodicamente()
+        except Exception as e:
+            logger.error(f"Erro no retreinamento periódico: {str(e)}", exc_info=True)
+        finally:
+            self._treino_lock.release()
+
+    def _traduzir_e_buscar(self, query: str, idioma: str, fontes: list) -> tuple:
+        """
+        Traduz a query para inglês (se preciso) e busca nas fontes indicadas.
+        Retorna (query_en, resultados, duracao em segundos).
+        """
+        inicio = time.perf_counter()
+        query_en = query if idioma == "en" else traduzir(query, origem=idioma, destino="en")
+        resultados = self.buscador.buscar_todas(
+            query_en,
+            fontes=fontes,
+            min_respostas=MIN_FONTES_RESPONDIDAS
+        )
+        return query_en, resultados, time.perf_counter() - inicio
+
+    @staticmethod
+    def _mesclar_resultados(concluidas: dict, fontes_selecionadas: list) -> dict:
+        """
+        Mescla os resultados das queries concluídas ({indice: (query_en, resultados, duracao)}),
+        na ordem das queries (a primeira tem prioridade), só com as fontes selecionadas.
+        """
+        resultados_agregados = {}
+        for i in sorted(concluidas):
+            resultados = concluidas[i][1]
+            for fonte, resultado in resultados.items():
+                if resultado and fonte in fontes_selecionadas and fonte not in resultados_agregados:
+                    resultados_agregados[fonte] = resultado
+        return resultados_agregados
+
+    def _traduzir_resultado(self, fonte: str, resultado: str) -> str:
+        """Traduz o resultado de uma fonte para português; em caso de erro, mantém o original."""
+        try:
+            return traduzir(resultado, origem="en", destino="pt")
+        except Exception as e:
+            logger.error(f"Erro ao traduzir resultado de {fonte}: {str(e)}")
+            return resultado
 
-        # Mantém apenas últimas 5 interações
-        if len(contexto) > 5:
-            contexto.pop(0)
+    def _atualizar_contexto(self, user_id: Optional[int], pergunta_norm: str, intencao: str):
+        """
+        Atualiza o contexto da conversa do usuário (pergunta já normalizada).
+        Perguntas anônimas (user_id None) não têm contexto: uma entrada única para
+        todas elas misturaria as conversas de pessoas diferentes.
+        """
+        if user_id is None:
+            return
+
+        with self._contexto_lock:
+            contexto = self._contexto.get(user_id)
+            if contexto is None:
+                # Mantém apenas últimas 5 interações (deque descarta a mais antiga)
+                contexto = deque(maxlen=5)
+                self._contexto[user_id] = contexto
+
+            contexto.append({
+                "pergunta": pergunta_norm,
+                "intencao": intencao
+            })
     
     def registrar_feedback(self, conversation_id: int, tipo: str, detalhes: str = None):
         """Registra feedback do usuário."""
@@ -3,17 +3,23 @@ Bot Worker V2.0 - Com ML Avançado e Múltiplas Fontes
 Integração completa do sistema de aprendizado e busca unificada
 """
 
+import atexit
 import logging
+import random
+import re
+import threading
 import time
-from random import choice
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+from itertools import islice
 from cachetools import TTLCache
 
 from bot.utils.config import Config
-from bot.utils.text_utils import normalizar_texto, detectar_idioma, traduzir
-from bot.utils.question_analyzer import AnalisadorPergunta
+from bot.utils.production_config import CACHE_SIZE
+from bot.utils.text_utils import normalizar_texto, detectar_idioma, detectar_idioma_rapido, esta_no_idioma, traduzir, traduzir_lote
+from bot.utils.question_analyzer import AnalisadorPergunta, detectar_intencao_rapida
 from bot.utils.response_combiner import CombinadorRespostas
-from bot.utils.response_formatter import FormatadorResposta, RESPOSTAS_INTENCAO
-from bot.utils.advanced_analyzer import AnalisadorAvancado
+from bot.utils.response_formatter import FormatadorResposta, RESPOSTAS_DESCONHECIDA, RESPOSTAS_INTENCAO
+from bot.utils.conversation_writer import GravadorConversas, resumir_logs
 
 # NOVOS IMPORTS
 from bot.ml.advanced_learning_system import SistemaAprendizadoAvancado
@@ -25,11 +31,31 @@ from repositories.bot_repository import BotRepository
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Cache de respostas
-cache = TTLCache(maxsize=200, ttl=3600)  # Aumentado para 200
+# Validação da entrada: tamanho máximo e ao menos uma letra ou dígito
+# (\w sem o sublinhado, equivalente a str.isalnum em uma só busca)
+TAMANHO_MAXIMO_MENSAGEM = 500
+_ALNUM_RE = re.compile(r'[^\W_]')
+
+# Espera máxima por uma pergunta idêntica em andamento (busca: 20s, mais tradução)
+TIMEOUT_PERGUNTA_EM_ANDAMENTO = 25
+
+# Espera máxima pela tradução da pergunta feita em paralelo com a análise
+TIMEOUT_TRADUCAO_PERGUNTA = 10
+
+# Sentença "de verdade" na avaliação de qualidade: trecho entre pontos com mais
+# de 10 caracteres depois do strip (começa e termina em caractere não branco)
+_SENTENCA_RE = re.compile(r'[^.\s][^.]{9,}[^.\s]')
+
+
+def _registrar(logs: list, etapa: str, start_time: float, **dados):
+    """
+    Adiciona uma etapa ao log do processo, com o tempo decorrido desde start_time.
+    Com logs None (coleta desligada) não faz nada.
+    """
+    if logs is None:
+        return
+    logs.append({"etapa": etapa, "timestamp": time.perf_counter() - start_time, **dados})
 
-# Contexto da conversa
-contexto = []
 
 _bot_worker_instance = None
 
@@ -45,7 +71,6 @@ class BotWorkerV2:
     def __init__(self):
         # Componentes básicos
         self.analisador = AnalisadorPergunta()
-        self.analisador_avancado = AnalisadorAvancado()
         self.combinador = CombinadorRespostas()
         self.formatador = FormatadorResposta()
         self.repository = BotRepository()
@@ -61,62 +86,82 @@ class BotWorkerV2:
         self.sistema_feedback = SistemaFeedback(self.repository)
 
         self.contador_conversas = 0
+        self._contador_lock = threading.Lock()
+
+        # Retreinamento periódico fora do caminho da resposta: um único worker,
+        # e no máximo um retreino em andamento (o lock é liberado ao terminar)
+        self._executor_treino = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bot_worker_v2_treino")
+        self._treino_lock = threading.Lock()
+
+        # Conversas gravadas em lotes em segundo plano: a resposta não espera pelo INSERT
+        self._gravador = GravadorConversas(self.repository, nome="bot_worker_v2_gravador")
+
+        # Cache de respostas por pergunta normalizada (do worker, protegido por lock:
+        # o Gunicorn atende várias requisições em threads do mesmo processo)
+        self._cache = TTLCache(maxsize=CACHE_SIZE, ttl=3600)
+        self._cache_lock = threading.Lock()
+
+        # Perguntas de conhecimento em andamento: requisições idênticas simultâneas
+        # aguardam o mesmo Future (protegido pelo mesmo lock do cache)
+        self._em_andamento = {}
+
+        # RNG próprio do worker (não disputa o estado global do módulo random)
+        self._rng = random.Random()
+
+        # Pool para a tradução da pergunta, que corre em paralelo com análise,
+        # intenção e tópico (etapas locais que não dependem dela)
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="bot_worker_v2")
+        atexit.register(self.close)
 
         logger.info("=" * 60)
         logger.info("BOT WORKER V2.0 INICIALIZADO")
-        logger.info("Fontes disponíveis: " + ", ".join(self.buscador.fontes_disponiveis.keys()))
+        logger.info("Fontes disponíveis: " + ", ".join(self.buscador.FONTES))
         logger.info("ML: Ensemble + Topic Modeling + Ranqueamento")
         logger.info("=" * 60)
 
-    def process_query(self, query: str, user_id: int = None) -> dict:
+    def close(self):
+        """Grava as conversas pendentes e encerra os pools de threads do worker."""
+        self._gravador.close()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor_treino.shutdown(wait=False, cancel_futures=True)
+
+    def process_query(self, query: str, user_id: int = None, incluir_logs: bool = True) -> dict:
         """
         Processa query com ML avançado e múltiplas fontes.
+
+        Com incluir_logs=False e sem user_id os logs do processo não são coletados
+        (não vão na resposta nem são gravados) e logs_processo volta None.
         """
-        start_time = time.time()
-        logs_processo = []
+        start_time = time.perf_counter()
+        logs_processo = [] if incluir_logs or user_id else None
 
         try:
-            logs_processo.append({
-                "etapa": "inicio",
-                "timestamp": time.time() - start_time,
-                "detalhes": f"Query: {query}, Fontes: {len(self.buscador.fontes_disponiveis)}"
-            })
+            _registrar(
+                logs_processo, "inicio", start_time,
+                detalhes=f"Query: {query}, Fontes: {len(self.buscador.FONTES)}"
+            )
 
             logger.info(f"[V2] Processando: {query} (user_id: {user_id})")
 
             # Valida entrada
             valid, message = self._validate_input(query)
             if not valid:
-                logs_processo.append({
-                    "etapa": "validacao",
-                    "timestamp": time.time() - start_time,
-                    "status": "erro",
-                    "detalhes": message
-                })
-
-                if user_id:
-                    self._save_conversation(
-                        user_id, query, message, "validacao",
-                        time.time() - start_time, "error", logs_processo
-                    )
-
-                return {
-                    "status": "error",
-                    "query": query,
-                    "message": message,
-                    "response": "",
-                    "source": "validacao",
-                    "processing_time": round(time.time() - start_time, 3),
-                    "logs_processo": logs_processo
-                }
+                _registrar(logs_processo, "validacao", start_time, status="erro", detalhes=message)
+                return self._resposta_erro(
+                    query, user_id, "validacao", message, "",
+                    time.perf_counter() - start_time, logs_processo
+                )
 
-            logs_processo.append({"etapa": "validacao", "timestamp": time.time() - start_time, "status": "ok"})
+            _registrar(logs_processo, "validacao", start_time, status="ok")
 
             # Obtém resposta com ML avançado
-            response, source, logs_busca = self._get_bot_response_v2(query, start_time)
-            logs_processo.extend(logs_busca)
+            response, source, logs_busca = self._get_bot_response_v2(
+                query, start_time, coletar_logs=logs_processo is not None
+            )
+            if logs_processo is not None:
+                logs_processo.extend(logs_busca)
 
-            processing_time = time.time() - start_time
+            processing_time = time.perf_counter() - start_time
 
             # Salva conversa
             if user_id:
@@ -138,196 +183,293 @@ class BotWorkerV2:
 
         except Exception as e:
             logger.error(f"Erro: {str(e)}", exc_info=True)
-            processing_time = time.time() - start_time
-
-            error_message = "Erro ao processar pergunta."
-
-            if user_id:
-                self._save_conversation(
-                    user_id, query, error_message, "erro",
-                    processing_time, "error", logs_processo
-                )
+            return self._resposta_erro(
+                query, user_id, "erro", str(e), "Erro ao processar pergunta.",
+                time.perf_counter() - start_time, logs_processo
+            )
 
-            return {
-                "status": "error",
-                "query": query,
-                "message": str(e),
-                "response": error_message,
-                "source": "erro",
-                "processing_time": round(processing_time, 3),
-                "logs_processo": logs_processo
-            }
+    def _resposta_erro(self, query, user_id, fonte, message, response, processing_time, logs_processo):
+        """
+        Monta a resposta de erro de process_query e, se houver user_id, salva a
+        conversa com status "error" (resposta salva: response ou, se vazia, message).
+        """
+        if user_id:
+            self._save_conversation(
+                user_id, query, response or message, fonte,
+                processing_time, "error", logs_processo
+            )
 
-    def _get_bot_response_v2(self, pergunta: str, start_time: float) -> tuple:
+        return {
+            "status": "error",
+            "query": query,
+            "message": message,
+            "response": response,
+            "source": fonte,
+            "processing_time": round(processing_time, 3),
+            "logs_processo": logs_processo
+        }
+
+    def _get_bot_response_v2(self, pergunta: str, start_time: float, coletar_logs: bool = True) -> tuple:
         """
         VERSÃO 2.0 com ML avançado e busca inteligente.
+        Retorna (resposta, fonte, logs); logs é None se coletar_logs for False.
         """
-        logs = []
+        logs = [] if coletar_logs else None
 
         try:
+            # 0. CONVERSA CASUAL ("oi", "tchau"...): resposta pronta, sem modelo nem busca
+            intencao = detectar_intencao_rapida(pergunta)
+            if intencao:
+                _registrar(logs, "resposta_direta", start_time, intencao=intencao, atalho=True)
+                return self._rng.choice(RESPOSTAS_INTENCAO[intencao]), intencao, logs
+
+            # Normalizada uma única vez (aprendizado e cache usam a mesma forma)
+            pergunta_norm = normalizar_texto(pergunta)
+
             # 1. BUSCAR RESPOSTA APRENDIDA
-            logs.append({"etapa": "cache_ml", "timestamp": time.time() - start_time, "inicio": True})
+            _registrar(logs, "cache_ml", start_time, inicio=True)
 
-            resposta_aprendida, qualidade = self.sistema_ml.buscar_resposta_aprendida(pergunta)
+            resposta_aprendida, qualidade = self.sistema_ml.buscar_resposta_aprendida(pergunta_norm)
 
             if resposta_aprendida and qualidade > 0.9:
-                logs.append({
-                    "etapa": "cache_ml",
-                    "timestamp": time.time() - start_time,
-                    "hit": True,
-                    "qualidade": qualidade
-                })
+                _registrar(logs, "cache_ml", start_time, hit=True, qualidade=qualidade)
                 logger.info(f"✓ Resposta aprendida (Q={qualidade:.2f})")
                 return resposta_aprendida, "aprendizado_ml", logs
 
-            logs.append({"etapa": "cache_ml", "timestamp": time.time() - start_time, "hit": False})
+            _registrar(logs, "cache_ml", start_time, hit=False)
 
-            # 2. ANÁLISE COMPLETA
-            logs.append({"etapa": "analise_avancada", "timestamp": time.time() - start_time})
-            analise_completa = self.analisador_avancado.analisar_completo(pergunta)
-
-            # 3. DETECTAR INTENÇÃO COM ENSEMBLE
-            logs.append({"etapa": "intencao_ensemble", "timestamp": time.time() - start_time})
+            # 2. DETECTAR INTENÇÃO COM ENSEMBLE (antes da análise: conversa
+            # casual não precisa de análise, tradução nem tópico)
+            _registrar(logs, "intencao_ensemble", start_time)
             intencao, confianca = self.sistema_ml.prever_intencao_ensemble(pergunta)
-            logs.append({
-                "etapa": "intencao_ensemble",
-                "timestamp": time.time() - start_time,
-                "intencao": intencao,
-                "confianca": confianca
-            })
+            _registrar(logs, "intencao_ensemble", start_time, intencao=intencao, confianca=confianca)
 
             # Se não é conhecimento, responde direto
             if intencao != "conhecimento":
-                resposta = choice(RESPOSTAS_INTENCAO.get(intencao, RESPOSTAS_INTENCAO["desconhecida"]))
+                resposta = self._rng.choice(RESPOSTAS_INTENCAO.get(intencao, RESPOSTAS_DESCONHECIDA))
                 return resposta, intencao, logs
 
-            # 4. DETECTAR TÓPICO
-            logs.append({"etapa": "topic_modeling", "timestamp": time.time() - start_time})
-            topico = self.sistema_ml.detectar_topico(pergunta)
-            logs.append({"etapa": "topic_modeling", "timestamp": time.time() - start_time, "topico": topico})
-
-            # 5. CACHE TRADICIONAL
-            pergunta_norm = normalizar_texto(pergunta)
-            if pergunta_norm in cache:
+            # 3. CACHE TRADICIONAL (e perguntas idênticas em andamento): antes de
+            # análise, tópico e tradução, que só a requisição dona da pergunta faz
+            with self._cache_lock:
+                em_cache = self._cache.get(pergunta_norm)
+                if em_cache is None:
+                    future = self._em_andamento.get(pergunta_norm)
+                    dono = future is None
+                    if dono:
+                        future = Future()
+                        self._em_andamento[pergunta_norm] = future
+
+            if em_cache is not None:
                 logger.info("✓ Cache hit")
-                logs.append({"etapa": "cache_tradicional", "timestamp": time.time() - start_time, "hit": True})
-                resposta, fonte = cache[pergunta_norm]
+                _registrar(logs, "cache_tradicional", start_time, hit=True)
+                resposta, fonte = em_cache
                 return resposta, fonte, logs
 
-            logs.append({"etapa": "cache_tradicional", "timestamp": time.time() - start_time, "hit": False})
+            _registrar(logs, "cache_tradicional", start_time, hit=False)
 
-            # 6. TIPO DE PERGUNTA
-            tipo_pergunta = self.analisador.detectar_tipo_pergunta(pergunta)
-            logs.append({"etapa": "tipo_pergunta", "timestamp": time.time() - start_time, "tipo": tipo_pergunta})
+            if not dono:
+                # Outra requisição já está respondendo a mesma pergunta: aguarda o resultado
+                # em vez de repetir análise, buscas e traduções
+                logger.info("Aguardando pergunta idêntica em andamento")
+                resposta, fonte = future.result(timeout=TIMEOUT_PERGUNTA_EM_ANDAMENTO)
+                _registrar(logs, "pergunta_em_andamento", start_time, fonte=fonte)
+                return resposta, fonte, logs
 
-            # 7. RANQUEAMENTO INTELIGENTE DE FONTES
-            logs.append({"etapa": "ranquear_fontes", "timestamp": time.time() - start_time})
+            try:
+                # 8 (adiantada). TRADUÇÃO DA PERGUNTA em segundo plano: a chamada ao
+                # tradutor corre enquanto as etapas 5 a 7 rodam localmente
+                traducao = self._executor.submit(self._traduzir_pergunta, pergunta)
 
-            fontes_ranqueadas = self.sistema_ml.ranquear_fontes_inteligente(
-                pergunta,
-                list(self.buscador.fontes_disponiveis.keys())
-            )
+                # 5. DETECTAR TÓPICO
+                _registrar(logs, "topic_modeling", start_time)
+                topico = self.sistema_ml.detectar_topico(pergunta)
+                _registrar(logs, "topic_modeling", start_time, topico=topico)
 
-            fontes_selecionadas = [f for f, _ in fontes_ranqueadas[:5]]  # Top 5
+                resposta, fonte = self._responder_conhecimento(
+                    pergunta, pergunta_norm, topico, traducao, logs, start_time
+                )
+                future.set_result((resposta, fonte))
+            except Exception as e:
+                future.set_exception(e)
+                raise
+            finally:
+                with self._cache_lock:
+                    self._em_andamento.pop(pergunta_norm, None)
+
+            # 16. RETREINAMENTO PERIÓDICO (em segundo plano)
+            with self._contador_lock:
+                self.contador_conversas += 1
+                retreinar = self.contador_conversas % 50 == 0  # A cada 50 conversas
+            if retreinar:
+                self._agendar_retreinamento()
 
-            logs.append({
-                "etapa": "ranquear_fontes",
-                "timestamp": time.time() - start_time,
-                "ranking": fontes_ranqueadas[:5]
-            })
+            return resposta, fonte, logs
 
-            logger.info(f"Fontes selecionadas: {fontes_selecionadas}")
+        except Exception as e:
+            logger.error(f"Erro V2: {str(e)}", exc_info=True)
+            return "Erro ao processar pergunta.", "erro", logs
 
-            # 8. TRADUÇÃO
-            idioma = detectar_idioma(pergunta)
-            pergunta_en = pergunta if idioma == "en" else traduzir(pergunta, origem=idioma, destino="en")
+    def _agendar_retreinamento(self):
+        """Dispara o retreinamento em segundo plano, se não houver um em andamento."""
+        if not self._treino_lock.acquire(blocking=False):
+            logger.info("Retreinamento já em andamento, ignorando")
+            return
 
-            logs.append({"etapa": "traducao", "timestamp": time.time() - start_time, "idioma": idioma})
+        logger.info("⚙️ Retreinamento periódico...")
+        try:
+            self._executor_treino.submit(self._retreinar)
+        except RuntimeError:
+            # Executor já encerrado (processo finalizando)
+            self._treino_lock.release()
 
-            # 9. BUSCA INTELIGENTE E PARALELA
-            logs.append({"etapa": "busca_inteligente", "timestamp": time.time() - start_time, "inicio": True})
+    def _retreinar(self):
+        try:
+            self.sistema_ml.retreinar_tudo(incremental=True)
+        except Exception as e:
+            logger.error(f"Erro no retreinamento periódico: {str(e)}", exc_info=True)
+        finally:
+            self._treino_lock.release()
+
+    def _traduzir_pergunta(self, pergunta: str) -> tuple:
+        """Detecta o idioma da pergunta e a traduz para inglês. Retorna (idioma, pergunta_en)."""
+        # Marcas claras de português dispensam o langdetect (mesmo atalho do V1)
+        idioma = detectar_idioma_rapido(pergunta) or detectar_idioma(pergunta)
+        pergunta_en = pergunta if idioma == "en" else traduzir(pergunta, origem=idioma, destino="en")
+        return idioma, pergunta_en
+
+    def _responder_conhecimento(
+        self,
+        pergunta: str,
+        pergunta_norm: str,
+        topico,
+        traducao: Future,
+        logs: list,
+        start_time: float
+    ) -> tuple:
+        """
+        Etapas 6 a 15 de _get_bot_response_v2 (pergunta de conhecimento sem cache):
+        ranqueia fontes, busca, traduz, combina, avalia e guarda no cache.
+        `traducao` é o Future de _traduzir_pergunta, disparado antes da análise.
+        Retorna (resposta, fonte).
+        """
+        # 6. TIPO DE PERGUNTA
+        tipo_pergunta = self.analisador.detectar_tipo_pergunta(pergunta)
+        _registrar(logs, "tipo_pergunta", start_time, tipo=tipo_pergunta)
 
-            resultados = self.buscador.buscar_inteligente(
-                pergunta_en,
-                fontes_priorizadas=fontes_selecionadas,
-                max_fontes=5,
-                timeout_total=20
-            )
+        # 7. RANQUEAMENTO INTELIGENTE DE FONTES
+        _registrar(logs, "ranquear_fontes", start_time)
 
-            logs.append({
-                "etapa": "busca_inteligente",
-                "timestamp": time.time() - start_time,
-                "fontes_consultadas": len(resultados),
-                "fontes_com_resposta": sum(1 for r in resultados.values() if r)
-            })
-
-            # 10. TRADUZ RESULTADOS
-            resultados_pt = {}
-            for fonte, resultado in resultados.items():
-                if resultado:
-                    try:
-                        resultado_pt = traduzir(resultado, origem="en", destino="pt")
-                        resultados_pt[fonte] = resultado_pt
-                    except:
-                        resultados_pt[fonte] = resultado
-
-            # 11. COMBINA RESPOSTAS
-            logs.append({"etapa": "combinar", "timestamp": time.time() - start_time})
-
-            resposta_combinada, fonte_principal = self.combinador.combinar_com_fonte_principal(
-                resultados_pt,
-                pergunta,
-                tipo_pergunta
-            )
+        # FONTES já é uma tupla fixa do buscador: sem cópia por pergunta
+        fontes_ranqueadas = self.sistema_ml.ranquear_fontes_inteligente(pergunta, self.buscador.FONTES)
 
-            if not resposta_combinada:
-                resposta = choice(RESPOSTAS_INTENCAO["desconhecida"])
-                fonte = "nenhuma"
-                qualidade_final = 0.0
-            else:
-                # 12. FORMATA
-                resposta = self.formatador.formatar_final(resposta_combinada, tipo_pergunta)
-                fonte = fonte_principal
-
-                # 13. AVALIA QUALIDADE
-                qualidade_final = self._avaliar_qualidade_resposta_v2(pergunta, resposta)
-
-                logs.append({"etapa": "qualidade", "timestamp": time.time() - start_time, "score": qualidade_final})
-
-                # 14. APRENDE SE BOA
-                if qualidade_final > 0.7:
-                    self.sistema_ml.aprender_padrao(pergunta, resposta, qualidade_final)
-
-            # 15. ATUALIZA STATS AVANÇADAS
-            tempo_busca = time.time() - start_time
-
-            if fonte_principal and fonte_principal != "nenhuma":
-                fontes_usadas = fonte_principal.split("+")
-
-                for f in fontes_usadas:
-                    self.sistema_ml.atualizar_stats_fonte_avancadas(
-                        fonte=f,
-                        tempo=tempo_busca,
-                        sucesso=resposta_combinada is not None,
-                        qualidade=qualidade_final,
-                        tipo_pergunta=tipo_pergunta,
-                        topico=topico
-                    )
-
-            # Cache
-            cache[pergunta_norm] = (resposta, fonte)
-
-            # 16. RETREINAMENTO PERIÓDICO
-            self.contador_conversas += 1
-            if self.contador_conversas % 50 == 0:  # A cada 50 conversas
-                logger.info("⚙️ Retreinamento periódico...")
-                self.sistema_ml.retreinar_tudo()
+        fontes_selecionadas = [f for f, _ in fontes_ranqueadas[:5]]  # Top 5
 
-            return resposta, fonte, logs
+        _registrar(logs, "ranquear_fontes", start_time, ranking=fontes_ranqueadas[:5])
 
-        except Exception as e:
-            logger.error(f"Erro V2: {str(e)}", exc_info=True)
-            return "Erro ao processar pergunta.", "erro", logs
+        logger.info(f"Fontes selecionadas: {fontes_selecionadas}")
+
+        # 8. TRADUÇÃO (já em andamento desde o miss no cache)
+        try:
+            idioma, pergunta_en = traducao.result(timeout=TIMEOUT_TRADUCAO_PERGUNTA)
+        except TimeoutError:
+            # Tradutor lento: busca com a pergunta original, como quando a tradução falha
+            logger.warning("Tradução da pergunta demorou demais; buscando com o texto original")
+            idioma = detectar_idioma_rapido(pergunta) or detectar_idioma(pergunta)
+            pergunta_en = pergunta
+
+        _registrar(logs, "traducao", start_time, idioma=idioma)
+
+        # 9. BUSCA INTELIGENTE E PARALELA
+        _registrar(logs, "busca_inteligente", start_time, inicio=True)
+
+        resultados = self.buscador.buscar_inteligente(
+            pergunta_en,
+            fontes_priorizadas=fontes_selecionadas,
+            max_fontes=5,
+            timeout_total=20
+        )
+
+        _registrar(
+            logs, "busca_inteligente", start_time,
+            fontes_consultadas=len(resultados),
+            fontes_com_resposta=sum(1 for r in resultados.values() if r)
+        )
+
+        # 10. TRADUZ RESULTADOS (pergunta em inglês recebe a resposta em inglês;
+        # resultados que já vieram em português ficam como estão)
+        resultados_pt = {fonte: resultado for fonte, resultado in resultados.items() if resultado}
+        if idioma != "en":
+            fontes_traduzir = [f for f, r in resultados_pt.items() if not esta_no_idioma(r, "pt")]
+
+            if fontes_traduzir:
+                # Todas as fontes numa única chamada ao tradutor
+                traducoes = traduzir_lote(
+                    [resultados_pt[f] for f in fontes_traduzir],
+                    origem="en",
+                    destino="pt"
+                )
+                _registrar(
+                    logs, "traduzir_resultados", start_time,
+                    fontes=len(fontes_traduzir),
+                    lote=traducoes is not None
+                )
+
+                if traducoes is None:
+                    # Sem lote: uma chamada por fonte (traduzir devolve o original se falhar)
+                    traducoes = [
+                        traduzir(resultados_pt[f], origem="en", destino="pt") for f in fontes_traduzir
+                    ]
+                resultados_pt.update(zip(fontes_traduzir, traducoes))
+
+        # 11. COMBINA RESPOSTAS
+        _registrar(logs, "combinar", start_time)
+
+        resposta_combinada, fonte_principal = self.combinador.combinar_com_fonte_principal(
+            resultados_pt,
+            pergunta,
+            tipo_pergunta
+        )
+
+        if not resposta_combinada:
+            resposta = self._rng.choice(RESPOSTAS_DESCONHECIDA)
+            fonte = "nenhuma"
+            qualidade_final = 0.0
+        else:
+            # 12. FORMATA
+            resposta = self.formatador.formatar_final(resposta_combinada, tipo_pergunta)
+            fonte = fonte_principal
+
+            # 13. AVALIA QUALIDADE
+            qualidade_final = self._avaliar_qualidade_resposta_v2(pergunta_norm, resposta)
+
+            _registrar(logs, "qualidade", start_time, score=qualidade_final)
+
+            # 14. APRENDE SE BOA
+            if qualidade_final > 0.7:
+                self.sistema_ml.aprender_padrao(pergunta_norm, resposta, qualidade_final)
+
+        # 15. ATUALIZA STATS AVANÇADAS
+        tempo_busca = time.perf_counter() - start_time
+
+        if fonte_principal and fonte_principal != "nenhuma":
+            fontes_usadas = fonte_principal.split("+")
+
+            for f in fontes_usadas:
+                self.sistema_ml.atualizar_stats_fonte_avancadas(
+                    fonte=f,
+                    tempo=tempo_busca,
+                    sucesso=resposta_combinada is not None,
+                    qualidade=qualidade_final,
+                    tipo_pergunta=tipo_pergunta,
+                    topico=topico
+                )
+
+        # Cache
+        with self._cache_lock:
+            self._cache[pergunta_norm] = (resposta, fonte)
+
+        return resposta, fonte
 
     def _avaliar_qualidade_resposta_v2(self, pergunta: str, resposta: str) -> float:
         """Avalia qualidade usando múltiplos critérios."""
@@ -340,64 +482,68 @@ class BotWorkerV2:
             score += 0.1
 
         # Estrutura (múltiplas sentenças)
-        num_sentencas = len([s for s in resposta.split('.') if len(s.strip()) > 10])
+        # Uma passada só, parando na segunda sentença (acima disso a nota não muda)
+        num_sentencas = sum(1 for _ in islice(_SENTENCA_RE.finditer(resposta), 2))
         if num_sentencas >= 2:
             score += 0.3
         elif num_sentencas >= 1:
             score += 0.1
 
         # Relevância (palavras da pergunta na resposta)
+        # intersection com a lista direto: só o conjunto (pequeno) da pergunta é montado
         palavras_pergunta = set(normalizar_texto(pergunta).split())
-        palavras_resposta = set(normalizar_texto(resposta).split())
+        palavras_comuns = palavras_pergunta.intersection(normalizar_texto(resposta).split())
 
-        overlap = len(palavras_pergunta & palavras_resposta) / max(len(palavras_pergunta), 1)
+        overlap = len(palavras_comuns) / max(len(palavras_pergunta), 1)
         score += overlap * 0.2
 
         # Não é mensagem de erro
-        if "desculpe" not in resposta.lower() and "não sei" not in resposta.lower():
+        resposta_minuscula = resposta.lower()
+        if "desculpe" not in resposta_minuscula and "não sei" not in resposta_minuscula:
             score += 0.2
 
         return min(score, 1.0)
 
     def _validate_input(self, mensagem: str) -> tuple:
         """Valida entrada."""
-        if len(mensagem) > 500:
+        if len(mensagem) > TAMANHO_MAXIMO_MENSAGEM:
             return False, "Mensagem muito longa"
-        if not any(c.isalnum() for c in mensagem):
+        if not _ALNUM_RE.search(mensagem):
             return False, "Mensagem inválida"
         return True, ""
 
     def _save_conversation(self, user_id, pergunta, resposta, fonte, tempo, status, logs):
-        """Salva conversa no banco."""
-        try:
-            metadata = {"logs_processo": logs}
-
-            self.repository.create_conversation(
-                user_id=user_id,
-                pergunta=pergunta,
-                resposta=resposta,
-                fonte=fonte,
-                tempo_processamento=tempo,
-                status=status,
-                metadata=metadata
-            )
-        except Exception as e:
-            logger.error(f"Erro ao salvar: {str(e)}")
+        """Agenda a gravação da conversa no banco (em lote, fora do caminho da resposta)."""
+        self._gravador.enfileirar({
+            "user_id": user_id,
+            "pergunta": pergunta,
+            "resposta": resposta,
+            "fonte": fonte,
+            "tempo_processamento": tempo,
+            "status": status,
+            "metadata": resumir_logs(logs, tempo)
+        })
 
     # Métodos do sistema anterior (compatibilidade)
-    def get_user_history(self, user_id, limit=20, offset=0):
+    def get_user_history(self, user_id, limit=20, offset=0, cursor=None, include_total=False):
         try:
-            conversations = self.repository.get_user_conversations(user_id, limit, offset)
-            total = self.repository.get_total_conversations_count(user_id)
+            # Uma linha a mais indica se há próxima página (dispensa o COUNT)
+            conversations = self.repository.get_user_conversations_summary(user_id, limit + 1, offset, cursor=cursor)
+            has_more = len(conversations) > limit
+            conversations = conversations[:limit]
+
+            # Total só quando pedido
+            total = self.repository.get_total_conversations_count_cached(user_id) if include_total else None
 
             return {
                 "status": "success",
-                "conversations": [c.to_dict_summary() for c in conversations],
+                "conversations": conversations,
                 "pagination": {
                     "total": total,
                     "limit": limit,
                     "offset": offset,
-                    "has_more": (offset + limit) < total
+                    "has_more": has_more,
+                    "next_cursor": conversations[-1]["id"] if has_more and conversations else None
                 }
             }
         except Exception as e:
@@ -410,7 +556,8 @@ class BotWorkerV2:
                     "total": 0,
                     "limit": limit,
                     "offset": offset,
-                    "has_more": False
+                    "has_more": False,
+                    "next_cursor": None
                 }
             }
 
@@ -419,8 +566,8 @@ class BotWorkerV2:
         return {"status": "success", "conversation": conv.to_dict()} if conv else {"status": "error"}
 
     def search_conversations(self, user_id, query, limit=20):
-        convs = self.repository.search_conversations(user_id, query, limit)
-        return {"status": "success", "results": [c.to_dict_summary() for c in convs]}
+        convs = self.repository.search_conversations_summary(user_id, query, limit)
+        return {"status": "success", "results": convs}
 
     def delete_conversation(self, conversation_id, user_id):
         deleted = self.repository.delete_conversation(conversation_id, user_id)
@@ -3,16 +3,18 @@ Sistema de Aprendizado Avançado com Deep Learning e Ensemble Methods
 Versão 2.0 - Com múltiplas fontes e aprendizado profundo
 """
 
+import copy
 import logging
 import json
 import pickle
 import numpy as np
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Sequence, Tuple, Optional
 from datetime import datetime, timedelta
 from collections import defaultdict, Counter
 from pathlib import Path
 
 from bot.utils.production_config import MODO_PRODUCAO, DEEP_LEARNING_AVAILABLE
+from bot.utils.text_utils import normalizar_texto
 
 # Machine Learning - Clássico
 from sklearn.feature_extraction.text import TfidfVectorizer, CountVectorizer
@@ -43,6 +45,10 @@ else:
     DEEP_LEARNING_AVAILABLE = False
     logger.info("Deep Learning desabilitado (modo produção)")
 
+# Atualizações incrementais do LDA antes de um treino completo, que refaz o
+# vocabulário (palavras novas só entram no modelo com o treino completo)
+ATUALIZACOES_LDA_POR_TREINO_COMPLETO = 10
+
 class SistemaAprendizadoAvancado:
     """
     Sistema de aprendizado de máquina avançado com múltiplos modelos.
@@ -68,6 +74,8 @@ class SistemaAprendizadoAvancado:
         # Modelo de ranqueamento de fontes
         self.modelo_ranqueamento_fontes = None
         self.vectorizer_fontes = None
+        # (modelo, fontes, colunas de predict_proba), refeito quando o modelo ou as fontes mudam
+        self._colunas_fontes_cache = None
 
         # Modelo de recomendação de fontes (novo)
         self.modelo_recomendacao = None
@@ -75,15 +83,16 @@ class SistemaAprendizadoAvancado:
         # Topic modeling para clustering de perguntas
         self.lda_model = None
         self.lda_vectorizer = None
+        self._atualizacoes_lda = 0
 
         # NLP
         try:
             from bot.utils.production_config import SPACY_PIPELINE_DISABLED
             self.nlp = spacy.load("pt_core_news_sm", disable=SPACY_PIPELINE_DISABLED)
             logger.info(f"spaCy carregado (disabled: {SPACY_PIPELINE_DISABLED})")
-        except:
+        except Exception as e:
             self.nlp = None
-            logger.warning("spaCy não disponível")
+            logger.warning(f"spaCy não disponível: {str(e)}")
 
         # Estatísticas detalhadas de fontes
         self.stats_fontes = defaultdict(lambda: {
@@ -414,43 +423,41 @@ class SistemaAprendizadoAvancado:
 
         return " ".join(features)
 
-    def ranquear_fontes_inteligente(self, pergunta: str, fontes_disponiveis: List[str]) -> List[Tuple[str, float]]:
+    def ranquear_fontes_inteligente(self, pergunta: str, fontes_disponiveis: Sequence[str]) -> List[Tuple[str, float]]:
         """
         Ranqueia fontes por probabilidade de sucesso.
         Retorna lista de (fonte, score) ordenada.
         """
-        if not self.modelo_ranqueamento_fontes:
+        # Referências locais: um retreino em outra thread não troca o modelo no meio do ranqueamento
+        modelo = self.modelo_ranqueamento_fontes
+        vectorizer = self.vectorizer_fontes
+        if not modelo:
             # Fallback: ranqueamento baseado em estatísticas
             return self._ranquear_fontes_estatisticas(fontes_disponiveis)
 
         try:
             features = self._extrair_features_pergunta(pergunta)
-            X = self.vectorizer_fontes.transform([features])
-
-            # Probabilidades para cada fonte
-            classes = self.modelo_ranqueamento_fontes.classes_
-            probas = self.modelo_ranqueamento_fontes.predict_proba(X)[0]
-
-            # Combina com estatísticas históricas
-            ranking = []
-            for fonte in fontes_disponiveis:
-                if fonte in classes:
-                    idx = np.where(classes == fonte)[0][0]
-                    score_ml = probas[idx]
-                else:
-                    score_ml = 0.1
-
-                # Score histórico
-                stats = self.stats_fontes[fonte]
-                score_hist = stats.get("taxa_sucesso", 0.5)
-
-                # Score combinado (70% ML, 30% histórico)
-                score_final = (score_ml * 0.7) + (score_hist * 0.3)
+            X = vectorizer.transform([features])
+
+            # Probabilidades para cada fonte (0.1 para fontes que o modelo não conhece)
+            fontes = tuple(fontes_disponiveis)
+            colunas = self._colunas_fontes(modelo, fontes)
+            probas = modelo.predict_proba(X)[0]
+            scores_ml = np.where(colunas >= 0, probas[colunas], 0.1)
+
+            # Score histórico
+            scores_hist = np.fromiter(
+                (self.stats_fontes[fonte].get("taxa_sucesso", 0.5) for fonte in fontes),
+                dtype=float,
+                count=len(fontes)
+            )
 
-                ranking.append((fonte, score_final))
+            # Score combinado (70% ML, 30% histórico)
+            scores = scores_ml * 0.7 + scores_hist * 0.3
 
-            # Ordena por score
-            ranking.sort(key=lambda x: x[1], reverse=True)
+            # Ordena por score (decrescente; empates mantêm a ordem das fontes)
+            ordem = np.argsort(-scores, kind="stable")
+            ranking = [(fontes[i], float(scores[i])) for i in ordem]
 
             logger.info(f"Ranking de fontes: {ranking[:3]}")
             return ranking
@@ -459,7 +466,20 @@ class SistemaAprendizadoAvancado:
             logger.error(f"Erro ao ranquear fontes: {str(e)}")
             return self._ranquear_fontes_estatisticas(fontes_disponiveis)
 
-    def _ranquear_fontes_estatisticas(self, fontes: List[str]) -> List[Tuple[str, float]]:
+    def _colunas_fontes(self, modelo, fontes: Tuple[str, ...]) -> np.ndarray:
+        """
+        Coluna de predict_proba de cada fonte (-1 se não está em modelo.classes_).
+        Calculado uma vez por modelo treinado/carregado e lista de fontes.
+        """
+        cache = self._colunas_fontes_cache
+        if cache is None or cache[0] is not modelo or cache[1] != fontes:
+            indice = {classe: i for i, classe in enumerate(modelo.classes_)}
+            colunas = np.array([indice.get(fonte, -1) for fonte in fontes], dtype=np.intp)
+            cache = (modelo, fontes, colunas)
+            self._colunas_fontes_cache = cache
+        return cache[2]
+
+    def _ranquear_fontes_estatisticas(self, fontes: Sequence[str]) -> List[Tuple[str, float]]:
         """Ranqueamento baseado apenas em estatísticas."""
         ranking = []
         for fonte in fontes:
@@ -506,6 +526,7 @@ class SistemaAprendizadoAvancado:
             n_jobs=-1
         )
         self.lda_model.fit(X)
+        self._atualizacoes_lda = 0
 
         # Mostra tópicos
         self._mostrar_topicos()
@@ -514,6 +535,43 @@ class SistemaAprendizadoAvancado:
         self.salvar_modelos()
         return True
 
+    def atualizar_topic_model(self, n_conversas=50):
+        """
+        Atualiza o LDA só com as conversas mais recentes (partial_fit), sem
+        refazer o treino com as últimas 5000. O vocabulário continua o do último
+        treino completo, que é refeito a cada ATUALIZACOES_LDA_POR_TREINO_COMPLETO
+        atualizações (ou se ainda não houver modelo).
+        """
+        lda_model = self.lda_model
+        lda_vectorizer = self.lda_vectorizer
+
+        if (
+            not lda_model
+            or not lda_vectorizer
+            or self._atualizacoes_lda >= ATUALIZACOES_LDA_POR_TREINO_COMPLETO
+        ):
+            return self.treinar_topic_model()
+
+        conversas = self.repository.get_all_conversations_for_training(limit=n_conversas)
+        if not conversas:
+            return False
+
+        X = lda_vectorizer.transform([c.pergunta for c in conversas])
+
+        # Atualiza uma cópia e troca no fim: detectar_topico segue usando
+        # o modelo anterior enquanto a atualização roda
+        novo_modelo = copy.deepcopy(lda_model)
+        novo_modelo.partial_fit(X)
+        self.lda_model = novo_modelo
+        self._atualizacoes_lda += 1
+
+        logger.info(
+            f"LDA atualizado com {len(conversas)} conversas recentes "
+            f"({self._atualizacoes_lda}/{ATUALIZACOES_LDA_POR_TREINO_COMPLETO} até o treino completo)"
+        )
+        self.salvar_modelos()
+        return True
+
     def _mostrar_topicos(self, n_palavras=10):
         """Mostra palavras principais de cada tópico."""
         if not self.lda_model or not self.lda_vectorizer:
@@ -536,7 +594,8 @@ class SistemaAprendizadoAvancado:
             distribuicao = self.lda_model.transform(X)[0]
             topico = distribuicao.argmax()
             return topico
-        except:
+        except Exception as e:
+            logger.error(f"Erro ao detectar tópico: {str(e)}")
             return -1
 
     # ============================================
@@ -698,7 +757,6 @@ class SistemaAprendizadoAvancado:
             return
         
         # Normaliza pergunta para detectar padrões
-        from bot.utils.text_utils import normalizar_texto
         pergunta_norm = normalizar_texto(pergunta)
         
         # Armazena padrão
@@ -722,7 +780,6 @@ class SistemaAprendizadoAvancado:
         """
         Busca se já tem resposta aprendida para pergunta similar.
         """
-        from bot.utils.text_utils import normalizar_texto
         from sklearn.feature_extraction.text import TfidfVectorizer
         from sklearn.metrics.pairwise import cosine_similarity
 
@@ -763,14 +820,22 @@ class SistemaAprendizadoAvancado:
         
         return None, 0.0
 
-    def retreinar_tudo(self):
-        """Retreina todos os modelos."""
+    def retreinar_tudo(self, incremental: bool = False):
+        """
+        Retreina todos os modelos.
+        Com incremental=True (retreino periódico do worker) o LDA é só atualizado
+        com as conversas recentes; os classificadores não têm partial_fit e são
+        retreinados por completo.
+        """
         logger.info("=" * 60)
-        logger.info("RETREINAMENTO COMPLETO")
+        logger.info("RETREINAMENTO " + ("INCREMENTAL" if incremental else "COMPLETO"))
         logger.info("=" * 60)
         self.treinar_detector_intencao_ensemble()
         self.treinar_ranqueador_fontes()
-        self.treinar_topic_model()
+        if incremental:
+            self.atualizar_topic_model()
+        else:
+            self.treinar_topic_model()
 
         logger.info("=" * 60)
         logger.info("RETREINAMENTO CONCLUÍDO")
@@ -5,14 +5,18 @@ Sistema de aprendizado contínuo baseado em feedback e histórico.
 import logging
 import json
 import pickle
+import threading
 from typing import Dict, List, Tuple
 from datetime import datetime, timedelta
 from collections import defaultdict
 import numpy as np
+from cachetools import LRUCache
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.model_selection import train_test_split
 
+from bot.utils.text_utils import normalizar_texto
+
 logger = logging.getLogger(__name__)
 
 class SistemaAprendizado:
@@ -26,8 +30,13 @@ class SistemaAprendizado:
         self.vectorizer_intencao = None
         self.modelo_qualidade = None
         self.vectorizer_qualidade = None
+
+        # Intenções já previstas pelo modelo atual (trocado a cada treino/carga)
+        self._cache_intencao = LRUCache(maxsize=4096)
+        self._cache_intencao_lock = threading.Lock()
         
-        # Estatísticas de fontes
+        # Estatísticas de fontes (atualizadas por várias threads de requisição)
+        self._stats_lock = threading.Lock()
         self.stats_fontes = defaultdict(lambda: {
             "total_usos": 0,
             "sucessos": 0,
@@ -72,11 +81,14 @@ class SistemaAprendizado:
             y.append(intencao)
         
         # Treina modelo
-        self.vectorizer_intencao = TfidfVectorizer(max_features=500)
-        X_vec = self.vectorizer_intencao.fit_transform(X)
+        vectorizer = TfidfVectorizer(max_features=500)
+        X_vec = vectorizer.fit_transform(X)
         
-        self.modelo_intencao = MultinomialNB()
-        self.modelo_intencao.fit(X_vec, y)
+        modelo = MultinomialNB()
+        modelo.fit(X_vec, y)
+
+        self.vectorizer_intencao, self.modelo_intencao = vectorizer, modelo
+        self._limpar_cache_intencao()
         
         logger.info(f"Modelo de intenção treinado com {len(X)} exemplos")
         
@@ -154,19 +166,35 @@ class SistemaAprendizado:
     def prever_intencao(self, pergunta: str) -> str:
         """
         Prevê intenção usando modelo treinado.
+        Uma única inferência (predict_proba) por pergunta nova; repetidas vêm do cache.
         """
-        if self.modelo_intencao is None:
+        vectorizer, modelo = self.vectorizer_intencao, self.modelo_intencao
+        if modelo is None:
             return "conhecimento"
+
+        with self._cache_intencao_lock:
+            intencao = self._cache_intencao.get(pergunta)
+        if intencao is not None:
+            return intencao
         
         try:
-            X = self.vectorizer_intencao.transform([pergunta])
-            intencao = self.modelo_intencao.predict(X)[0]
-            proba = self.modelo_intencao.predict_proba(X)[0]
+            X = vectorizer.transform([pergunta])
+            proba = modelo.predict_proba(X)[0]
+            idx = proba.argmax()
+            intencao = modelo.classes_[idx]
             
-            logger.info(f"Intenção prevista: {intencao} (confiança: {max(proba):.2f})")
+            logger.info(f"Intenção prevista: {intencao} (confiança: {proba[idx]:.2f})")
+
+            with self._cache_intencao_lock:
+                self._cache_intencao[pergunta] = intencao
             return intencao
         except:
             return "conhecimento"
+
+    def _limpar_cache_intencao(self):
+        """Descarta as intenções previstas pelo modelo anterior."""
+        with self._cache_intencao_lock:
+            self._cache_intencao = LRUCache(maxsize=4096)
     
     def avaliar_qualidade_resposta(self, pergunta: str, resposta: str) -> float:
         """
@@ -185,10 +213,23 @@ class SistemaAprendizado:
         except:
             return 0.5
     
+    def atualizar_stats_fontes(self, fontes: List[str], tempo: float, sucesso: bool, qualidade: float = None):
+        """
+        Atualiza as estatísticas de todas as fontes usadas numa resposta
+        com uma única aquisição do lock.
+        """
+        with self._stats_lock:
+            for fonte in fontes:
+                self._atualizar_stats_fonte(fonte, tempo, sucesso, qualidade)
+
     def atualizar_stats_fonte(self, fonte: str, tempo: float, sucesso: bool, qualidade: float = None):
         """
         Atualiza estatísticas de desempenho de cada fonte.
         """
+        with self._stats_lock:
+            self._atualizar_stats_fonte(fonte, tempo, sucesso, qualidade)
+
+    def _atualizar_stats_fonte(self, fonte: str, tempo: float, sucesso: bool, qualidade: float = None):
         stats = self.stats_fontes[fonte]
         
         stats["total_usos"] += 1
@@ -213,7 +254,7 @@ class SistemaAprendizado:
         # Calcula score para cada fonte
         scores = {}
         
-        for fonte, stats in self.stats_fontes.items():
+        for fonte, stats in self._copiar_stats_fontes().items():
             if stats["total_usos"] == 0:
                 scores[fonte] = 0.5
                 continue
@@ -243,7 +284,6 @@ class SistemaAprendizado:
             return
         
         # Normaliza pergunta para detectar padrões
-        from bot.utils.text_utils import normalizar_texto
         pergunta_norm = normalizar_texto(pergunta)
         
         # Armazena padrão
@@ -267,7 +307,6 @@ class SistemaAprendizado:
         """
         Busca se já tem resposta aprendida para pergunta similar.
         """
-        from bot.utils.text_utils import normalizar_texto
         from sklearn.feature_extraction.text import TfidfVectorizer
         from sklearn.metrics.pairwise import cosine_similarity
         
@@ -308,6 +347,11 @@ class SistemaAprendizado:
         
         return None, 0.0
     
+    def _copiar_stats_fontes(self) -> Dict:
+        """Cópia das estatísticas de fontes, consistente com as atualizações concorrentes."""
+        with self._stats_lock:
+            return {fonte: dict(stats) for fonte, stats in self.stats_fontes.items()}
+
     def salvar_modelos(self):
         """Salva modelos treinados em disco."""
         try:
@@ -316,7 +360,7 @@ class SistemaAprendizado:
                 "vectorizer_intencao": self.vectorizer_intencao,
                 "modelo_qualidade": self.modelo_qualidade,
                 "vectorizer_qualidade": self.vectorizer_qualidade,
-                "stats_fontes": dict(self.stats_fontes),
+                "stats_fontes": self._copiar_stats_fontes(),
                 "padroes": self.padroes_pergunta_resposta
             }
             
@@ -337,6 +381,7 @@ class SistemaAprendizado:
             self.vectorizer_intencao = modelos.get("vectorizer_intencao")
             self.modelo_qualidade = modelos.get("modelo_qualidade")
             self.vectorizer_qualidade = modelos.get("vectorizer_qualidade")
+            self._limpar_cache_intencao()
             self.stats_fontes = defaultdict(lambda: {
                 "total_usos": 0, "sucessos": 0, "falhas": 0,
                 "tempo_medio": 0, "score_qualidade": 0.5
@@ -2,8 +2,10 @@
 Análise avançada de perguntas com extração de entidades e contexto semântico.
 """
 
+import copy
 import logging
 import spacy
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 import re
 
@@ -27,12 +29,19 @@ class AnalisadorAvancado:
             "historico": re.compile(r'quando|história|origem|descoberto|inventado|criado', re.IGNORECASE),
             "localizacao": re.compile(r'onde|localização|fica|localizado|encontrar', re.IGNORECASE),
         }
+
+        # Cache por instância: as análises dependem do modelo spaCy desta instância
+        self._analisar_completo_cache = lru_cache(maxsize=4096)(self._analisar_completo)
     
-    def extrair_entidades(self, pergunta: str) -> Dict[str, List[str]]:
+    def _doc(self, pergunta: str, doc=None):
+        """Documento spaCy da pergunta; reaproveita `doc` se já foi processado."""
+        return doc if doc is not None else self.nlp(pergunta)
+
+    def extrair_entidades(self, pergunta: str, doc=None) -> Dict[str, List[str]]:
         """
         Extrai entidades nomeadas (pessoas, lugares, organizações, etc).
         """
-        doc = self.nlp(pergunta)
+        doc = self._doc(pergunta, doc)
         
         entidades = {
             "PERSON": [],  # Pessoas
@@ -60,11 +69,11 @@ class AnalisadorAvancado:
         
         return "geral"
     
-    def extrair_numeros_e_unidades(self, pergunta: str) -> Dict:
+    def extrair_numeros_e_unidades(self, pergunta: str, doc=None) -> Dict:
         """
         Extrai números e unidades de medida para cálculos/conversões.
         """
-        doc = self.nlp(pergunta)
+        doc = self._doc(pergunta, doc)
         
         numeros = []
         unidades = []
@@ -84,7 +93,8 @@ class AnalisadorAvancado:
             if token.like_num or token.pos_ == "NUM":
                 try:
                     numeros.append(float(token.text.replace(",", ".")))
-                except:
+                except ValueError:
+                    # Número por extenso ("dois", "mil")
                     pass
             
             # Detecta unidades
@@ -98,11 +108,11 @@ class AnalisadorAvancado:
             "tem_conversao": len(unidades) >= 1
         }
     
-    def analisar_complexidade(self, pergunta: str) -> Dict:
+    def analisar_complexidade(self, pergunta: str, doc=None) -> Dict:
         """
         Analisa complexidade da pergunta para decidir estratégia de busca.
         """
-        doc = self.nlp(pergunta)
+        doc = self._doc(pergunta, doc)
         
         # Métricas de complexidade
         num_palavras = len([t for t in doc if not t.is_punct])
@@ -132,13 +142,13 @@ class AnalisadorAvancado:
             }
         }
     
-    def decompor_pergunta_complexa(self, pergunta: str) -> List[str]:
+    def decompor_pergunta_complexa(self, pergunta: str, doc=None) -> List[str]:
         """
         Decompõe pergunta complexa em sub-perguntas mais simples.
         Exemplo: "Quem inventou a internet e quando?" -> 
                  ["Quem inventou a internet?", "Quando a internet foi inventada?"]
         """
-        doc = self.nlp(pergunta)
+        doc = self._doc(pergunta, doc)
         
         subperguntas = []
         
@@ -211,12 +221,19 @@ class AnalisadorAvancado:
     def analisar_completo(self, pergunta: str) -> Dict:
         """
         Análise completa combinando todos os métodos.
+        Resultados são cacheados pela pergunta com espaços colapsados;
+        cada chamada recebe uma cópia para não alterar a entrada do cache.
         """
+        return copy.deepcopy(self._analisar_completo_cache(" ".join(pergunta.split())))
+
+    def _analisar_completo(self, pergunta: str) -> Dict:
+        # Um único processamento spaCy compartilhado pelas etapas
+        doc = self.nlp(pergunta)
         return {
-            "entidades": self.extrair_entidades(pergunta),
+            "entidades": self.extrair_entidades(pergunta, doc),
             "tipo_especializado": self.detectar_tipo_especializado(pergunta),
-            "numeros_unidades": self.extrair_numeros_e_unidades(pergunta),
-            "complexidade": self.analisar_complexidade(pergunta),
-            "subperguntas": self.decompor_pergunta_complexa(pergunta),
+            "numeros_unidades": self.extrair_numeros_e_unidades(pergunta, doc),
+            "complexidade": self.analisar_complexidade(pergunta, doc),
+            "subperguntas": self.decompor_pergunta_complexa(pergunta, doc),
             "contexto_temporal": self.identificar_contexto_temporal(pergunta),
         }
@@ -0,0 +1,91 @@
+"""
+Cache de respostas compartilhado entre os processos do servidor (Redis).
+Fica atrás do cache em memória de cada processo: memória -> Redis -> APIs.
+Sem REDIS_URL configurada (ou sem o pacote redis), get/set simplesmente não fazem nada.
+"""
+
+import hashlib
+import logging
+import threading
+from typing import Any, Optional
+
+from bot.utils.config import Config
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# orjson serializa/desserializa direto em bytes, como o Redis espera
+try:
+    import orjson
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    import json
+    _dumps = lambda valor: json.dumps(valor).encode("utf-8")
+    _loads = json.loads
+
+logger = logging.getLogger(__name__)
+
+# A versão no prefixo muda junto com a normalização das perguntas: chaves
+# antigas (v1 juntava "2+2" e "2*2") deixam de ser lidas e expiram pelo TTL
+PREFIXO_CHAVE = "bot:resposta:v2:"
+
+# Redis é só um atalho: se demorar, vale mais consultar as APIs
+TIMEOUT_REDIS = 0.2
+
+_cliente = None
+_cliente_lock = threading.Lock()
+
+
+def obter_cliente():
+    """Retorna o cliente Redis do processo (criado na primeira chamada) ou None se indisponível."""
+    global _cliente
+    if _cliente is None:
+        with _cliente_lock:
+            if _cliente is None:
+                if redis is None or not Config.REDIS_URL:
+                    _cliente = False
+                else:
+                    try:
+                        pool = redis.ConnectionPool.from_url(
+                            Config.REDIS_URL,
+                            socket_timeout=TIMEOUT_REDIS,
+                            socket_connect_timeout=TIMEOUT_REDIS,
+                            max_connections=16
+                        )
+                        _cliente = redis.Redis(connection_pool=pool)
+                    except Exception as e:
+                        logger.error(f"Erro ao conectar no Redis: {str(e)}")
+                        _cliente = False
+    return _cliente or None
+
+
+def montar_chave(*partes: str) -> str:
+    """Chave curta e de tamanho fixo a partir das partes (ex.: tipo, idioma, pergunta normalizada)."""
+    return PREFIXO_CHAVE + hashlib.sha1("\x1f".join(map(str, partes)).encode("utf-8")).hexdigest()
+
+
+def get(chave: str) -> Optional[Any]:
+    """Retorna o valor guardado para a chave ou None (miss, Redis indisponível ou erro)."""
+    cliente = obter_cliente()
+    if cliente is None:
+        return None
+    try:
+        dados = cliente.get(chave)
+        return _loads(dados) if dados is not None else None
+    except Exception as e:
+        logger.warning(f"Erro ao ler cache no Redis: {str(e)}")
+        return None
+
+
+def set(chave: str, valor: Any, ttl: int = 3600):
+    """Guarda o valor (serializável em JSON) por `ttl` segundos."""
+    cliente = obter_cliente()
+    if cliente is None:
+        return
+    try:
+        cliente.set(chave, _dumps(valor), ex=ttl)
+    except Exception as e:
+        logger.warning(f"Erro ao gravar cache no Redis: {str(e)}")
@@ -1,9 +1,16 @@
 from dotenv import load_dotenv
 import os
+import tempfile
 
 load_dotenv()
 
 class Config:
     WOLFRAM_APP_ID = os.getenv("WOLFRAM_APP_ID")
     GOOGLE_CX = os.getenv("GOOGLE_CX")
-    GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
\ No newline at end of file
+    GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+
+    # Diretório do cache persistente de buscas (compartilhado entre processos do Gunicorn)
+    CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(tempfile.gettempdir(), "bot_cache"))
+
+    # Cache de respostas compartilhado entre processos (opcional; ex.: redis://localhost:6379/0)
+    REDIS_URL = os.getenv("REDIS_URL")
@@ -0,0 +1,158 @@
+"""
+Gravação das conversas em segundo plano.
+A resposta ao usuário não espera pelo INSERT: as conversas vão para uma fila
+e uma thread as grava em lotes, numa única transação por lote.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_LOTE_GRAVACAO = 100
+INTERVALO_LOTE_GRAVACAO = 0.2
+
+# Limite da fila: com o banco fora do ar, a memória não cresce sem fim
+TAMANHO_MAXIMO_FILA = 1000
+
+
+def resumir_logs(logs_processo: list, tempo_processamento: float) -> dict:
+    """
+    Resume os logs do processo para o campo metadata da conversa.
+
+    A lista completa (devolvida ao cliente em logs_processo) não é gravada:
+    ficam só a ordem das etapas, o tempo gasto em cada uma (em ms) e se a
+    resposta veio de algum cache.
+
+    Etapas com "duracao" usam esse valor; nas demais, conta o tempo desde o
+    fim da entrada anterior. Etapas repetidas têm os tempos somados.
+    """
+    etapas = []
+    duracoes_ms = {}
+    cache_usado = False
+    fim_anterior = 0.0
+
+    for log in logs_processo:
+        etapa = log.get("etapa")
+        inicio = log.get("timestamp", fim_anterior)
+        duracao = log.get("duracao")
+        if duracao is None:
+            duracao = max(inicio - fim_anterior, 0.0)
+            fim_anterior = inicio
+        else:
+            fim_anterior = inicio + duracao
+
+        if etapa not in duracoes_ms:
+            etapas.append(etapa)
+            duracoes_ms[etapa] = 0.0
+        duracoes_ms[etapa] += duracao * 1000
+
+        if etapa and "cache" in etapa and (log.get("resultado") == "hit" or log.get("hit") is True):
+            cache_usado = True
+
+    resumo = {
+        "etapas": etapas,
+        "duracoes_ms": {etapa: round(ms, 1) for etapa, ms in duracoes_ms.items()},
+        "tempo_total_ms": round(tempo_processamento * 1000, 1),
+        "cache_usado": cache_usado
+    }
+
+    # Mensagem de erro, se houve, ajuda a investigar sem os logs completos
+    erros = [log["erro"] for log in logs_processo if "erro" in log]
+    if erros:
+        resumo["erro"] = erros[-1]
+
+    return resumo
+
+
+class GravadorConversas:
+    """
+    Fila de conversas gravadas em lotes via `repository.create_conversations_bulk`.
+
+    Um lote é gravado quando junta `tamanho_lote` conversas ou quando passam
+    `intervalo` segundos desde a primeira conversa do lote. No encerramento do
+    processo (atexit) o que estiver na fila é gravado antes de sair.
+
+    A fila guarda no máximo `tamanho_fila` conversas; com ela cheia (banco lento
+    ou fora do ar) a conversa é descartada com um aviso, sem travar a requisição.
+    """
+
+    def __init__(
+        self,
+        repository,
+        tamanho_lote: int = TAMANHO_LOTE_GRAVACAO,
+        intervalo: float = INTERVALO_LOTE_GRAVACAO,
+        tamanho_fila: int = TAMANHO_MAXIMO_FILA,
+        nome: str = "gravador_conversas"
+    ):
+        self.repository = repository
+        self.tamanho_lote = tamanho_lote
+        self.intervalo = intervalo
+
+        self._fila = queue.Queue(maxsize=tamanho_fila)
+        self._thread = threading.Thread(target=self._loop, name=nome, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def enfileirar(self, conversa: dict):
+        """Agenda a gravação da conversa (mesmas chaves aceitas por create_conversation)."""
+        try:
+            self._fila.put_nowait(conversa)
+        except queue.Full:
+            logger.warning(f"Fila de gravação cheia ({self._fila.maxsize}); conversa descartada")
+
+    def close(self, timeout: float = 5.0):
+        """Grava as conversas pendentes e encerra a thread (pode ser chamado mais de uma vez)."""
+        if self._thread.is_alive():
+            # Aguarda vaga na fila cheia, mas não além do timeout
+            try:
+                self._fila.put(None, timeout=timeout)
+            except queue.Full:
+                logger.warning("Fila de gravação cheia no encerramento; conversas pendentes perdidas")
+                return
+            self._thread.join(timeout)
+
+    def _loop(self):
+        """
+        Consome a fila, gravando em lotes de até `tamanho_lote` conversas
+        (ou o que chegar em `intervalo` segundos).
+        Um item None encerra o loop depois de gravar o lote atual.
+        """
+        encerrar = False
+        while not encerrar:
+            item = self._fila.get()
+            if item is None:
+                break
+
+            lote = [item]
+            prazo = time.monotonic() + self.intervalo
+            while len(lote) < self.tamanho_lote:
+                restante = prazo - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    item = self._fila.get(timeout=restante)
+                except queue.Empty:
+                    break
+                if item is None:
+                    encerrar = True
+                    break
+                lote.append(item)
+
+            self._gravar_lote(lote)
+
+    def _gravar_lote(self, lote):
+        """Grava um lote de conversas via repository."""
+        try:
+            inseridas = self.repository.create_conversations_bulk(lote)
+
+            if inseridas:
+                logger.info(f"{inseridas} conversa(s) salva(s) no banco")
+            else:
+                logger.error(f"Falha ao salvar {len(lote)} conversa(s) no banco")
+
+        except Exception as e:
+            logger.error(f"Erro ao salvar conversas: {str(e)}", exc_info=True)
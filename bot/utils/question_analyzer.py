@@ -3,6 +3,9 @@ Análise e processamento de perguntas usando NLP.
 """
 
 import logging
+import re
+from functools import lru_cache
+from typing import Optional
 import spacy
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
@@ -21,6 +24,54 @@ INTENCOES = {
     "despedida": ["tchau", "adeus", "até logo", "sair"]
 }
 
+# Mensagem que é só um dos exemplos acima ("Oi!", "bom dia", "tchau"), sem mais nada:
+# um grupo nomeado por intenção, pontuação/espaços nas pontas ignorados
+_INTENCAO_RAPIDA_RE = re.compile(
+    r"^\W*(?:" + "|".join(
+        f"(?P<{intencao}>" + "|".join(re.escape(e).replace(r"\ ", r"\s+") for e in exemplos) + ")"
+        for intencao, exemplos in INTENCOES.items()
+    ) + r")\W*$",
+    re.IGNORECASE
+)
+
+# Lema interrogativo -> tipo de pergunta (consulta em O(1) por token)
+_TIPO_POR_LEMA = {
+    "qual": "qual", "quais": "qual",
+    "quem": "quem",
+    "onde": "onde",
+    "quando": "quando",
+    "como": "como",
+    "por": "porque", "porque": "porque",
+    "quanto": "quanto", "quantos": "quanto", "quantas": "quanto",
+}
+
+# Lemas mantidos na query mesmo sem ser substantivo/verbo/adjetivo
+_LEMAS_INTERROGATIVOS = frozenset(["por", "como", "o que", "qual", "quem", "onde", "quando", "quanto"])
+_LEMAS_INTERROGATIVOS_EXPLICATIVA = frozenset(["como", "por", "que", "qual", "quem", "onde", "quando", "quanto"])
+_POS_PALAVRA_CHAVE = frozenset(["NOUN", "PROPN", "VERB", "ADJ"])
+_POS_EXPLICATIVA = frozenset(["NOUN", "PROPN", "VERB", "ADJ", "ADV"])
+
+
+@lru_cache(maxsize=4096)
+def _detectar_tipo_pergunta(pergunta: str) -> str:
+    """Implementação cacheada de detectar_tipo_pergunta (recebe a pergunta já normalizada)."""
+    for token in nlp(pergunta):
+        tipo = _TIPO_POR_LEMA.get(token.lemma_)
+        if tipo:
+            return tipo
+
+    return "geral"
+
+
+def detectar_intencao_rapida(mensagem: str) -> Optional[str]:
+    """
+    Reconhece conversa casual (saudação, despedida...) sem passar pelo modelo,
+    quando a mensagem é exatamente uma das frases de INTENCOES.
+    Retorna a intenção ou None (a mensagem segue o fluxo normal).
+    """
+    match = _INTENCAO_RAPIDA_RE.match(mensagem)
+    return match.lastgroup if match else None
+
 
 class AnalisadorPergunta:
     """Classe para analisar e processar perguntas."""
@@ -43,7 +94,8 @@ class AnalisadorPergunta:
                 if sim > max_sim and sim > 0.5:
                     max_sim = sim
                     intencao = key
-            except:
+            except ValueError:
+                # Vocabulário vazio (mensagem só com stop words/símbolos)
                 continue
 
         logger.info(f"Intenção detectada: {intencao} (similaridade: {max_sim:.2f})")
@@ -54,25 +106,7 @@ class AnalisadorPergunta:
         Detecta o tipo de pergunta (qual, quem, como, por que, etc).
         Retorna o tipo detectado.
         """
-        doc = self.nlp(pergunta.lower())
-
-        for token in doc:
-            if token.lemma_ in ["qual", "quais"]:
-                return "qual"
-            elif token.lemma_ in ["quem"]:
-                return "quem"
-            elif token.lemma_ in ["onde"]:
-                return "onde"
-            elif token.lemma_ in ["quando"]:
-                return "quando"
-            elif token.lemma_ in ["como", "de que forma", "de que maneira"]:
-                return "como"
-            elif token.lemma_ in ["por", "por que", "porque"]:
-                return "porque"
-            elif token.lemma_ in ["quanto", "quantos", "quantas"]:
-                return "quanto"
-
-        return "geral"
+        return _detectar_tipo_pergunta(" ".join(pergunta.lower().split()))
 
     def extrair_palavras_chave(self, texto: str, max_palavras: int = 10) -> list:
         """
@@ -81,13 +115,11 @@ class AnalisadorPergunta:
         doc = self.nlp(texto.lower())
         palavras_chave = []
 
-        # Palavras interrogativas são sempre importantes
-        interrogativas = ["por", "como", "o que", "qual", "quem", "onde", "quando", "quanto"]
-
         for token in doc:
-            if token.lemma_ in interrogativas:
+            # Palavras interrogativas são sempre importantes
+            if token.lemma_ in _LEMAS_INTERROGATIVOS:
                 palavras_chave.append(token.text)
-            elif token.pos_ in ["NOUN", "PROPN", "VERB", "ADJ"] and not token.is_stop:
+            elif token.pos_ in _POS_PALAVRA_CHAVE and not token.is_stop:
                 palavras_chave.append(token.text)
 
         # Se não encontrou palavras-chave, retorna o texto original limitado
@@ -118,8 +150,7 @@ class AnalisadorPergunta:
 
             for token in doc:
                 # Mantém interrogativas, substantivos, verbos, adjetivos e nomes próprios
-                if (token.pos_ in ["NOUN", "PROPN", "VERB", "ADJ", "ADV"] or 
-                    token.lemma_ in ["como", "por", "que", "qual", "quem", "onde", "quando", "quanto"]):
+                if token.pos_ in _POS_EXPLICATIVA or token.lemma_ in _LEMAS_INTERROGATIVOS_EXPLICATIVA:
                     palavras_importantes.append(token.text)
 
             # Se perdeu muito, usa palavras originais
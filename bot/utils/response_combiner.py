@@ -85,7 +85,8 @@ class CombinadorRespostas:
                     if similaridade >= limiar_similaridade:
                         e_duplicata = True
                         break
-                except:
+                except ValueError:
+                    # Vocabulário vazio (sentenças só com stop words/símbolos)
                     continue
 
             if not e_duplicata:
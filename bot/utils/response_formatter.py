@@ -7,16 +7,19 @@ from bot.utils.text_utils import limpar_texto
 
 logger = logging.getLogger(__name__)
 
-# Respostas para diferentes intenções
+# Respostas para diferentes intenções (tuplas: imutáveis e compartilhadas entre threads)
 RESPOSTAS_INTENCAO = {
-    "saudacao": ["Oi! Tudo certo por aí?", "Olá, como posso ajudar hoje?", "E aí, pronto para conversar?"],
-    "status": ["Estou de boa, e você?", "Tudo ótimo por aqui! Como posso ajudar?"],
-    "nome": ["Sou um bot simples, criado por um dev curioso!", "Não tenho um nome chique, só me chama de Bot!"],
-    "funcao": ["Eu respondo perguntas, busco curiosidades e converso sobre quase tudo!"],
-    "despedida": ["Tchau! Até a próxima!", "Valeu, até logo!"],
-    "desconhecida": ["Ops, não sei responder isso ainda. Tenta outra pergunta?", "Hmm, essa é nova pra mim!"]
+    "saudacao": ("Oi! Tudo certo por aí?", "Olá, como posso ajudar hoje?", "E aí, pronto para conversar?"),
+    "status": ("Estou de boa, e você?", "Tudo ótimo por aqui! Como posso ajudar?"),
+    "nome": ("Sou um bot simples, criado por um dev curioso!", "Não tenho um nome chique, só me chama de Bot!"),
+    "funcao": ("Eu respondo perguntas, busco curiosidades e converso sobre quase tudo!",),
+    "despedida": ("Tchau! Até a próxima!", "Valeu, até logo!"),
+    "desconhecida": ("Ops, não sei responder isso ainda. Tenta outra pergunta?", "Hmm, essa é nova pra mim!")
 }
 
+# Fallback usado quando nenhuma fonte responde (evita o lookup no dicionário)
+RESPOSTAS_DESCONHECIDA = RESPOSTAS_INTENCAO["desconhecida"]
+
 
 class FormatadorResposta:
     """Classe para formatar respostas de acordo com o contexto."""
@@ -83,11 +83,13 @@ class EstrategiaBusca:
         if len(subperguntas) > 1:
             queries.extend(subperguntas)
         
-        # Remove duplicatas mantendo ordem
-        queries_unicas = []
+        # Remove duplicatas mantendo ordem (ignorando maiúsculas e espaços extras)
+        unicas = {}
         for q in queries:
-            if q not in queries_unicas:
-                queries_unicas.append(q)
+            chave = " ".join(q.lower().split())
+            if chave and chave not in unicas:
+                unicas[chave] = q.strip()
+        queries_unicas = list(unicas.values())
         
-        logger.info(f"Queries geradas: {queries_unicas}")
+        logger.info(f"Queries geradas: {queries_unicas} ({len(queries) - len(queries_unicas)} duplicadas removidas)")
         return queries_unicas[:5]  # Máximo 5 queries
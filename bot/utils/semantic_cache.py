@@ -0,0 +1,161 @@
+"""
+Cache de respostas em dois níveis: exato (TTL) e semântico (similaridade de cosseno).
+Perguntas repetidas ou parafraseadas são respondidas sem consultar as APIs externas.
+"""
+
+import logging
+import re
+import threading
+import unicodedata
+from collections import deque
+from functools import lru_cache
+from typing import Any, Callable, Optional
+
+from cachetools import TTLCache
+from scipy.sparse import vstack
+from sklearn.feature_extraction.text import HashingVectorizer
+
+logger = logging.getLogger(__name__)
+
+# Só a pontuação final é descartada: operadores, sinais e separadores decimais
+# mudam a resposta ("2+2" x "2*2", "-5 + 3" x "5 + 3", "2.5" x "25")
+_PONTUACAO_FINAL_RE = re.compile(r"[\s?!.]+$")
+_ESPACOS_RE = re.compile(r"\s+")
+_ESPACOS_OPERADOR_RE = re.compile(r"\s*([+*/^=<>%])\s*")
+
+# Perguntas com números ou operadores só usam a busca exata: dois cálculos
+# diferentes podem ter vetores quase iguais ("12*4" x "12*5")
+# (hífen só conta como operador fora de palavras: "x - y", mas não "guarda-chuva")
+_NUMERICO_RE = re.compile(r"\d|[+*/^=<>%]|(?<![a-z])-|-(?![a-z])")
+
+
+@lru_cache(maxsize=4096)
+def normalizar_chave(texto: str) -> str:
+    """
+    Normaliza texto para chave de cache: minúsculas, sem acentos, sem pontuação
+    final e com espaços colapsados. Operadores e dígitos são mantidos.
+    """
+    texto = unicodedata.normalize('NFKD', texto.lower()).encode('ASCII', 'ignore').decode('ASCII')
+    texto = _PONTUACAO_FINAL_RE.sub("", texto)
+    texto = _ESPACOS_OPERADOR_RE.sub(r"\1", texto)
+    return _ESPACOS_RE.sub(" ", texto).strip()
+
+
+def _usa_busca_semantica(chave: str) -> bool:
+    """Chaves com números ou operadores ficam fora do cache semântico."""
+    return not _NUMERICO_RE.search(chave)
+
+
+class CacheSemantico:
+    """
+    Cache com busca exata (TTLCache) e, em caso de miss, busca por similaridade.
+
+    Os vetores são gerados por um HashingVectorizer (sem vocabulário a treinar),
+    normalizados em L2, então a similaridade de cosseno é um único produto
+    matriz-vetor contra todas as chaves guardadas.
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: int = 3600, limiar: float = 0.92, max_vetores: int = 1024):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._vetores = deque(maxlen=max_vetores)  # (chave, vetor)
+        self._limiar = limiar
+        self._lock = threading.RLock()
+        self._locks_chave = {}
+
+        self._vectorizer = HashingVectorizer(
+            n_features=2 ** 14,
+            ngram_range=(1, 2),
+            alternate_sign=False,
+            norm="l2",
+            # Inclui tokens de um caractere (o padrão do sklearn os descarta)
+            token_pattern=r"(?u)\b\w+\b"
+        )
+
+    def get(self, texto: str) -> Optional[Any]:
+        """Retorna o valor cacheado para o texto (exato ou similar) ou None."""
+        chave = normalizar_chave(texto)
+        if not chave:
+            return None
+
+        with self._lock:
+            valor = self._cache.get(chave)
+            if valor is not None:
+                return valor
+
+            if not _usa_busca_semantica(chave):
+                return None
+
+            return self._buscar_similar(chave)
+
+    def set(self, texto: str, valor: Any):
+        """Armazena o valor para o texto."""
+        chave = normalizar_chave(texto)
+        if not chave:
+            return
+
+        semantica = _usa_busca_semantica(chave)
+        vetor = self._vectorizer.transform([chave]) if semantica else None
+
+        with self._lock:
+            if semantica and chave not in self._cache:
+                self._vetores.append((chave, vetor))
+            self._cache[chave] = valor
+
+    def obter_ou_calcular(self, texto: str, calcular: Callable[[], Any]) -> Any:
+        """
+        Retorna o valor cacheado ou executa `calcular` uma única vez por chave.
+        Chamadas concorrentes para a mesma pergunta aguardam o primeiro cálculo
+        em vez de disparar novas buscas externas.
+        Resultados vazios (None ou (None, None)) não são cacheados.
+        """
+        valor = self.get(texto)
+        if valor is not None:
+            return valor
+
+        chave = normalizar_chave(texto)
+
+        with self._lock:
+            lock_chave = self._locks_chave.setdefault(chave, threading.Lock())
+
+        with lock_chave:
+            try:
+                # Outra thread pode ter calculado enquanto esperávamos
+                valor = self.get(texto)
+                if valor is not None:
+                    return valor
+
+                valor = calcular()
+                if self._valor_util(valor):
+                    self.set(texto, valor)
+                return valor
+            finally:
+                with self._lock:
+                    self._locks_chave.pop(chave, None)
+
+    def _buscar_similar(self, chave: str) -> Optional[Any]:
+        """Busca a chave mais similar ainda válida no cache (chamar com lock)."""
+        if not self._vetores:
+            return None
+
+        chaves = [c for c, _ in self._vetores]
+        matriz = vstack([v for _, v in self._vetores])
+        vetor = self._vectorizer.transform([chave])
+
+        similaridades = (matriz @ vetor.T).toarray().ravel()
+        idx = similaridades.argmax()
+
+        if similaridades[idx] < self._limiar:
+            return None
+
+        valor = self._cache.get(chaves[idx])
+        if valor is not None:
+            logger.info(f"Cache semântico: hit (similaridade {similaridades[idx]:.2f})")
+        return valor
+
+    @staticmethod
+    def _valor_util(valor: Any) -> bool:
+        if valor is None:
+            return False
+        if isinstance(valor, tuple):
+            return any(v is not None for v in valor)
+        return True
@@ -5,12 +5,46 @@ Utilitários para processamento de texto.
 import logging
 import unicodedata
 import re
+from functools import lru_cache
+from typing import List, Optional
 from langdetect import detect
 from deep_translator import GoogleTranslator
 
 logger = logging.getLogger(__name__)
 
-
+# Marcas exclusivas do português (ã/õ e palavras sem equivalente idêntico em espanhol).
+# "que", "de", "como", acentos agudos e "ç" (francês) ficam de fora.
+_MARCADORES_PT_RE = re.compile(
+    r'[ãõ]|\b(?:não|você|vocês|são|é|quem|qual|quais|onde|porque|então|também|isso|esse|essa|muito)\b',
+    re.IGNORECASE
+)
+
+# Tradução em lote: partes separadas por linha em branco, dentro do limite
+# de caracteres por requisição do tradutor (5000)
+_SEPARADOR_LOTE = "\n\n"
+_SEPARADOR_LOTE_RE = re.compile(r'\n\s*\n')
+LIMITE_CARACTERES_LOTE = 4500
+
+# Texto só com números e operadores ("2+2", "(3 * 4) / 2") não precisa de tradução
+_SIMBOLICO_RE = re.compile(r'[\d\s+\-*/().,=^%]+')
+
+# Limpeza dos textos das fontes (compilados uma vez: rodam para cada resultado de busca)
+_URL_RE = re.compile(r'https?://\S+|www\.\S+')
+_CARACTERES_ESPECIAIS_RE = re.compile(r'[^\w\s\.,!?;:()\-áàâãéèêíïóôõöúçñÁÀÂÃÉÈÊÍÏÓÔÕÖÚÇÑ]')
+_DATAS_RE = (
+    re.compile(r'\d{1,2}\s+de\s+\w+\s+de\s+\d{4}'),
+    re.compile(r'\d{1,2}\s+de\s+\w+,?\s+\d{4}'),
+    re.compile(r'[A-Z][a-z]{2}\s+\d{1,2},\s+\d{4}'),
+    # Padrões como "Oct 28, 2020 ..."
+    re.compile(r'[A-Z][a-z]{2}\s+\d{1,2},\s+\d{4}\s*\.{3}'),
+)
+_RETICENCIAS_RE = re.compile(r'\.{2,}')
+_ESPACOS_RE = re.compile(r'\s+')
+_CONTROLE_RE = re.compile(r'[\x00-\x1f\x7f-\x9f]')
+_FIM_SENTENCA_RE = re.compile(r'(?<=[.!?])\s+(?=[A-Z])')
+
+
+@lru_cache(maxsize=4096)
 def normalizar_texto(texto: str) -> str:
     """Normaliza texto removendo acentos e convertendo para minúsculas."""
     texto = texto.lower()
@@ -18,11 +52,45 @@ def normalizar_texto(texto: str) -> str:
     return texto
 
 
+def detectar_idioma_rapido(texto: str) -> Optional[str]:
+    """
+    Atalho para detectar_idioma: retorna "pt" se o texto tem marcas inequívocas
+    de português, ou None quando é preciso rodar o detector completo.
+    """
+    return "pt" if _MARCADORES_PT_RE.search(texto) else None
+
+
 def detectar_idioma(texto: str) -> str:
     """
     Detecta o idioma do texto.
     Assume português para textos curtos ou com nomes próprios.
+    Espaços extras são colapsados antes da consulta ao cache.
+    """
+    return _detectar_idioma(" ".join(texto.split()))
+
+
+def esta_no_idioma(texto: str, idioma: str) -> bool:
     """
+    Verifica se o texto já está no idioma (pelos primeiros 200 caracteres),
+    para pular traduções que não mudariam nada.
+    Diferente de detectar_idioma, textos curtos não contam como português:
+    na dúvida retorna False e o texto é traduzido.
+    """
+    return _idioma_amostra(" ".join(texto[:200].split())) == idioma
+
+
+@lru_cache(maxsize=4096)
+def _idioma_amostra(amostra: str) -> Optional[str]:
+    if len(amostra.split()) <= 3:
+        return None
+    try:
+        return detect(amostra)
+    except Exception:
+        return None
+
+
+@lru_cache(maxsize=4096)
+def _detectar_idioma(texto: str) -> str:
     try:
         # Para textos muito curtos, assume português
         if len(texto.split()) <= 3:
@@ -38,7 +106,9 @@ def detectar_idioma(texto: str) -> str:
                 return "pt"
 
         return idioma
-    except:
+    except Exception as e:
+        # langdetect falha em textos sem letras (só números/símbolos): assume português
+        logger.warning(f"Erro ao detectar idioma: {str(e)}")
         return "pt"
 
 
@@ -47,7 +117,7 @@ def traduzir(texto: str, origem: str = "auto", destino: str = "pt") -> str:
     Traduz texto entre idiomas com melhorias para evitar perda de sentido.
     """
     try:
-        if not texto or origem == destino:
+        if not texto or origem == destino or _SIMBOLICO_RE.fullmatch(texto):
             return texto
 
         # Remove espaços extras antes de traduzir
@@ -61,44 +131,76 @@ def traduzir(texto: str, origem: str = "auto", destino: str = "pt") -> str:
 
         logger.info(f"Tradução ({origem}->{destino}): '{texto[:50]}...' -> '{traducao[:50]}...'")
 
-        # Capitaliza primeira letra
-        traducao = traducao.strip()
-        if traducao:
-            return traducao[0].upper() + traducao[1:] if len(traducao) > 1 else traducao.upper()
-
-        return texto
+        return _capitalizar(traducao.strip()) or texto
     except Exception as e:
         logger.error(f"Erro ao traduzir: {str(e)}")
         return texto
 
 
+def traduzir_lote(textos: List[str], origem: str = "auto", destino: str = "pt") -> Optional[List[str]]:
+    """
+    Traduz vários textos com uma única chamada ao tradutor.
+
+    Os textos (com espaços colapsados, sem quebras de linha internas) são unidos
+    por uma linha em branco e separados de volta na tradução. Retorna None se
+    não for possível traduzir em lote (texto grande demais, erro do tradutor ou
+    número de partes diferente na volta); o chamador traduz individualmente.
+    """
+    partes = [" ".join(t.split()) for t in textos]
+    if origem == destino or not partes:
+        return partes
+    if len(partes) == 1:
+        return [traduzir(partes[0], origem=origem, destino=destino)]
+    if not all(partes):
+        return None
+
+    texto = _SEPARADOR_LOTE.join(partes)
+    if len(texto) > LIMITE_CARACTERES_LOTE:
+        return None
+
+    try:
+        traducao = GoogleTranslator(source=origem, target=destino).translate(texto)
+    except Exception as e:
+        logger.error(f"Erro ao traduzir lote: {str(e)}")
+        return None
+
+    traducoes = _SEPARADOR_LOTE_RE.split(traducao.strip()) if traducao else []
+    if len(traducoes) != len(partes):
+        logger.warning(f"Tradução em lote devolveu {len(traducoes)} partes (esperadas {len(partes)})")
+        return None
+
+    logger.info(f"Tradução em lote ({origem}->{destino}): {len(partes)} textos em uma chamada")
+    return [_capitalizar(t.strip()) or p for t, p in zip(traducoes, partes)]
+
+
+def _capitalizar(texto: str) -> str:
+    """Capitaliza a primeira letra."""
+    return texto[:1].upper() + texto[1:]
+
+
 def limpar_texto(texto: str) -> str:
     """Remove formatação ruim, espaços extras, datas, URLs e emojis."""
     if not texto:
         return ""
 
     # Remove URLs
-    texto = re.sub(r'https?://\S+|www\.\S+', '', texto)
+    texto = _URL_RE.sub('', texto)
 
     # Remove emojis e caracteres especiais Unicode
-    texto = re.sub(r'[^\w\s\.,!?;:()\-áàâãéèêíïóôõöúçñÁÀÂÃÉÈÊÍÏÓÔÕÖÚÇÑ]', '', texto)
+    texto = _CARACTERES_ESPECIAIS_RE.sub('', texto)
 
     # Remove datas no formato "DD de MMM de YYYY" ou variações
-    texto = re.sub(r'\d{1,2}\s+de\s+\w+\s+de\s+\d{4}', '', texto)
-    texto = re.sub(r'\d{1,2}\s+de\s+\w+,?\s+\d{4}', '', texto)
-    texto = re.sub(r'[A-Z][a-z]{2}\s+\d{1,2},\s+\d{4}', '', texto)
-
-    # Remove padrões como "Oct 28, 2020 ..."
-    texto = re.sub(r'[A-Z][a-z]{2}\s+\d{1,2},\s+\d{4}\s*\.{3}', '', texto)
+    for data_re in _DATAS_RE:
+        texto = data_re.sub('', texto)
 
     # Remove múltiplas reticências
-    texto = re.sub(r'\.{2,}', '.', texto)
+    texto = _RETICENCIAS_RE.sub('.', texto)
 
     # Remove múltiplos espaços e quebras de linha
-    texto = re.sub(r'\s+', ' ', texto).strip()
+    texto = _ESPACOS_RE.sub(' ', texto).strip()
 
     # Remove caracteres de controle ASCII
-    texto = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', texto)
+    texto = _CONTROLE_RE.sub('', texto)
 
     return texto
 
@@ -115,7 +217,7 @@ def extrair_sentencas(texto: str, max_sentencas: int = None) -> list:
 
     # Separa em sentenças de forma mais robusta
     # Considera . ! ? seguidos de espaço e letra maiúscula
-    sentencas = re.split(r'(?<=[.!?])\s+(?=[A-Z])', texto)
+    sentencas = _FIM_SENTENCA_RE.split(texto)
 
     # Filtra sentenças muito curtas (menos de 10 caracteres)
     sentencas = [s.strip() for s in sentencas if len(s.strip()) > 10]
@@ -19,7 +19,8 @@ def question():
     Request Body:
         {
             "pergunta": "Qual a capital da França?",
-            "user_id": 1  // opcional, mas necessário para salvar no DB
+            "user_id": 1,  // opcional, mas necessário para salvar no DB
+            "logs": false  // opcional (default: true); false omite logs_processo da resposta
         }
     
     Response:
@@ -29,7 +30,8 @@ def question():
             "response": "Paris é a capital...",
             "source": "google",
             "processing_time": 1.234,
-            "user_id": 1
+            "user_id": 1,
+            "logs_processo": [...]
         }
     """
     try:
@@ -46,7 +48,13 @@ def question():
             return jsonify({"error": "Campo 'pergunta' é obrigatório"}), 400
         
         # Processa a pergunta
-        resultado = bot_worker.process_query(pergunta, user_id)
+        incluir_logs = data.get("logs", True) is not False
+        resultado = bot_worker.process_query(pergunta, user_id, incluir_logs=incluir_logs)
+
+        # Com user_id os logs ainda são resumidos no histórico; só não vão na resposta
+        # (são a maior parte do JSON: análise completa, queries, resultados por fonte)
+        if not incluir_logs:
+            resultado.pop("logs_processo", None)
         
         # Retorna resposta completa
         return jsonify(resultado), 200 if resultado['status'] == 'success' else 400
@@ -68,6 +76,10 @@ def get_history():
         - user_id (int, obrigatório): ID do usuário
         - limit (int, opcional): Conversas por página (default: 20)
         - offset (int, opcional): Deslocamento para paginação (default: 0)
+        - cursor (int, opcional): next_cursor da página anterior; pagina por cursor
+          (mais eficiente em históricos longos) e ignora offset
+        - include_total (bool, opcional): "true" para incluir o total de conversas
+          (consulta extra; sem ele pagination.total é null)
     
     Response:
         {
@@ -86,7 +98,8 @@ def get_history():
                 "total": 50,
                 "limit": 20,
                 "offset": 0,
-                "has_more": true
+                "has_more": true,
+                "next_cursor": 1
             }
         }
     """
@@ -96,6 +109,8 @@ def get_history():
         user_id = request.args.get('user_id', type=int)
         limit = request.args.get('limit', default=20, type=int)
         offset = request.args.get('offset', default=0, type=int)
+        cursor = request.args.get('cursor', type=int)
+        include_total = request.args.get('include_total', default='false').lower() == 'true'
         
         if not user_id:
             return jsonify({"error": "Parâmetro 'user_id' é obrigatório"}), 400
@@ -108,7 +123,7 @@ def get_history():
         if offset < 0:
             offset = 0
         
-        resultado = bot_worker.get_user_history(user_id, limit, offset)
+        resultado = bot_worker.get_user_history(user_id, limit, offset, cursor, include_total)
         
         return jsonify(resultado), 200
         
@@ -798,7 +813,7 @@ def get_fonte_ranking():
         pergunta = data["pergunta"]
 
         # Pega todas as fontes disponíveis
-        fontes = list(bot_worker.buscador.fontes_disponiveis.keys())
+        fontes = list(bot_worker.buscador.FONTES)
 
         # Ranqueia
         ranking = bot_worker.sistema_ml.ranquear_fontes_inteligente(pergunta, fontes)
@@ -0,0 +1,32 @@
+"""
+Configuração do Gunicorn para produção.
+
+Uso: gunicorn -c gunicorn.conf.py app:app
+
+As rotas do bot passam a maior parte do tempo esperando APIs externas (I/O),
+então cada processo atende várias requisições em paralelo com threads (gthread).
+O número de processos fica baixo porque cada um carrega os modelos de ML na memória.
+"""
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+# Processos: padrão conservador para caber em < 512 MB RAM (WEB_CONCURRENCY sobrescreve)
+workers = int(os.getenv("WEB_CONCURRENCY", min(2, multiprocessing.cpu_count() * 2 + 1)))
+
+# Threads por processo (requisições simultâneas aguardando I/O)
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+
+# Keep-alive evita novo handshake a cada requisição do frontend
+keepalive = 30
+
+# Carregar/treinar modelos pode demorar na primeira requisição
+timeout = 120
+graceful_timeout = 30
+
+accesslog = "-"
+errorlog = "-"
+loglevel = "info"
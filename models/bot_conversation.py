@@ -18,7 +18,7 @@ class BotConversation:
         fonte (str): Fonte(s) de dados usada(s) (ex: 'wolfram', 'google+duckduckgo')
         tempo_processamento (float): Tempo em segundos para processar
         status (str): Status da operação ('success' ou 'error')
-        metadata (dict): Dados adicionais (logs_processo, tipo_pergunta, etc)
+        metadata (dict): Dados adicionais (resumo das etapas do processo, feedback, etc)
         created_at (datetime): Data/hora da conversa
     """
     
@@ -78,15 +78,33 @@ class BotConversation:
         Returns:
             dict: Versão resumida do model
         """
+        return BotConversation.resumo_de_linha(vars(self))
+
+    @staticmethod
+    def resumo_de_linha(data):
+        """
+        Monta a versão resumida direto de uma linha do banco (dict), sem criar
+        a instância nem desserializar metadata. Usado pelas consultas de listagem.
+
+        Args:
+            data (dict): Linha com id, user_id, pergunta, resposta, fonte,
+                tempo_processamento, status e created_at
+
+        Returns:
+            dict: Mesmo formato de to_dict_summary
+        """
+        resposta = data.get('resposta')
+        created_at = data.get('created_at')
+
         return {
-            "id": self.id,
-            "user_id": self.user_id,
-            "pergunta": self.pergunta,
-            "resposta_preview": self.resposta[:100] + "..." if len(self.resposta) > 100 else self.resposta,
-            "fonte": self.fonte,
-            "tempo_processamento": self.tempo_processamento,
-            "status": self.status,
-            "created_at": self.created_at.isoformat() if isinstance(self.created_at, datetime) else self.created_at
+            "id": data.get('id'),
+            "user_id": data.get('user_id'),
+            "pergunta": data.get('pergunta'),
+            "resposta_preview": resposta[:100] + "..." if len(resposta) > 100 else resposta,
+            "fonte": data.get('fonte'),
+            "tempo_processamento": data.get('tempo_processamento'),
+            "status": data.get('status', 'success'),
+            "created_at": created_at.isoformat() if isinstance(created_at, datetime) else created_at
         }
     
     @staticmethod
@@ -3,10 +3,51 @@ from utils.db import get_db_cursor
 from mysql.connector import Error
 import json
 import logging
+import threading
+from cachetools import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# orjson serializa bem mais rápido que o json da stdlib. Tipos que ele não conhece
+# (ex.: escalares numpy nos logs) caem para json.dumps, que converte o resto em str:
+# um valor estranho não pode derrubar um lote inteiro de gravações
+def _dumps_metadata_json(metadata):
+    return json.dumps(metadata, default=str)
+
+
+try:
+    import orjson
+
+    def _dumps_metadata(metadata):
+        try:
+            return orjson.dumps(metadata).decode("utf-8")
+        except TypeError:
+            return _dumps_metadata_json(metadata)
+except ImportError:
+    _dumps_metadata = _dumps_metadata_json
+
+
+# Colunas das listagens (to_dict_summary): a resposta já vem cortada do banco
+# (101 caracteres bastam para saber se o preview precisa de "...") e metadata fica de fora
+_COLUNAS_RESUMO = (
+    "id, user_id, pergunta, LEFT(resposta, 101) AS resposta, "
+    "fonte, tempo_processamento, status, created_at"
+)
+
+# Todas as colunas menos metadata (para quem não lê o JSON, evita trafegar e desserializar)
+_COLUNAS_SEM_METADATA = "id, user_id, pergunta, resposta, fonte, tempo_processamento, status, created_at"
+
+
 class BotRepository:
+    def __init__(self):
+        # Totais de conversas por usuário (evita um COUNT(*) a cada página do histórico)
+        self._cache_total = TTLCache(maxsize=4096, ttl=60)
+        self._cache_total_lock = threading.Lock()
+
+    def _invalidar_total(self, user_id):
+        with self._cache_total_lock:
+            self._cache_total.pop(user_id, None)
+
     def create_conversation(
         self, 
         user_id, 
@@ -34,7 +75,7 @@ class BotRepository:
         """
         try:
             # Converte metadata para JSON string
-            metadata_json = json.dumps(metadata) if metadata else None
+            metadata_json = _dumps_metadata(metadata) if metadata else None
 
             with get_db_cursor() as cur:
                 cur.execute("""
@@ -54,6 +95,7 @@ class BotRepository:
                 conversation_id = cur.lastrowid
 
                 logger.info(f"Conversa criada: ID={conversation_id}, user_id={user_id}")
+                self._invalidar_total(user_id)
 
                 # Retorna a conversa criada
                 return BotConversation(
@@ -71,6 +113,52 @@ class BotRepository:
             logger.error(f"Erro ao criar conversa: {e}")
             return None
 
+    def create_conversations_bulk(self, conversations):
+        """
+        Insere várias conversas em uma única transação.
+
+        Args:
+            conversations (list[dict]): Conversas com as mesmas chaves
+                aceitas por create_conversation
+
+        Returns:
+            int: Número de conversas inseridas (0 se falhar)
+        """
+        if not conversations:
+            return 0
+
+        try:
+            valores = [
+                (
+                    c["user_id"],
+                    c["pergunta"],
+                    c["resposta"],
+                    c.get("fonte"),
+                    c.get("tempo_processamento"),
+                    c.get("status", "success"),
+                    _dumps_metadata(c["metadata"]) if c.get("metadata") else None
+                )
+                for c in conversations
+            ]
+
+            with get_db_cursor() as cur:
+                # O conector MySQL agrupa o executemany em um único INSERT multi-linhas
+                cur.executemany("""
+                    INSERT INTO bot_conversations
+                    (user_id, pergunta, resposta, fonte, tempo_processamento, status, metadata)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                """, valores)
+
+                logger.info(f"{len(valores)} conversas criadas em lote")
+
+            for user_id in {c["user_id"] for c in conversations}:
+                self._invalidar_total(user_id)
+            return len(valores)
+
+        except Error as e:
+            logger.error(f"Erro ao criar conversas em lote: {e}")
+            return 0
+
     def get_conversation_by_id(self, conversation_id):
         """
         Busca uma conversa específica por ID.
@@ -156,6 +244,63 @@ class BotRepository:
             logger.error(f"Erro ao contar conversas do usuário {user_id}: {e}")
             return 0
 
+    def get_user_conversations_summary(self, user_id, limit=20, offset=0, cursor=None):
+        """
+        Versão resumida de get_user_conversations para listagens: busca só as colunas
+        do resumo (resposta cortada no banco, sem metadata) e devolve dicts prontos.
+
+        Com cursor, pagina por keyset (id < cursor): cada página é uma busca direta
+        no índice, sem percorrer as linhas anteriores como o OFFSET faz.
+        Os dois modos ordenam por id DESC: conversas gravadas no mesmo lote têm
+        o mesmo created_at, e só o id dá uma ordem estável para o cursor seguir.
+
+        Args:
+            user_id (int): ID do usuário
+            limit (int): Número máximo de resultados
+            offset (int): Deslocamento para paginação (ignorado se houver cursor)
+            cursor (int, optional): ID da última conversa da página anterior
+
+        Returns:
+            list[dict]: Conversas no formato de BotConversation.to_dict_summary
+        """
+        try:
+            with get_db_cursor() as cur:
+                if cursor is None:
+                    cur.execute(f"""
+                        SELECT {_COLUNAS_RESUMO} FROM bot_conversations 
+                        WHERE user_id = %s 
+                        ORDER BY id DESC
+                        LIMIT %s OFFSET %s
+                    """, (user_id, limit, offset))
+                else:
+                    cur.execute(f"""
+                        SELECT {_COLUNAS_RESUMO} FROM bot_conversations 
+                        WHERE user_id = %s AND id < %s
+                        ORDER BY id DESC
+                        LIMIT %s
+                    """, (user_id, cursor, limit))
+
+                return [BotConversation.resumo_de_linha(row) for row in cur.fetchall()]
+
+        except Error as e:
+            logger.error(f"Erro ao buscar conversas do usuário {user_id}: {e}")
+            return []
+
+    def get_total_conversations_count_cached(self, user_id):
+        """
+        Igual a get_total_conversations_count, mas guarda o total por 60s.
+        O cache é invalidado quando este repositório cria ou deleta conversas do usuário.
+        """
+        with self._cache_total_lock:
+            total = self._cache_total.get(user_id)
+        if total is not None:
+            return total
+
+        total = self.get_total_conversations_count(user_id)
+        with self._cache_total_lock:
+            self._cache_total[user_id] = total
+        return total
+
     def search_conversations(self, user_id, query, limit=20):
         """
         Busca conversas por palavra-chave na pergunta ou resposta.
@@ -191,6 +336,35 @@ class BotRepository:
             logger.error(f"Erro ao buscar conversas: {e}")
             return []
 
+    def search_conversations_summary(self, user_id, query, limit=20):
+        """
+        Versão resumida de search_conversations para listagens
+        (só as colunas do resumo, sem metadata).
+
+        Returns:
+            list[dict]: Conversas no formato de BotConversation.to_dict_summary
+        """
+        try:
+            with get_db_cursor() as cur:
+                search_term = f"%{query}%"
+
+                cur.execute(f"""
+                    SELECT {_COLUNAS_RESUMO} FROM bot_conversations 
+                    WHERE user_id = %s 
+                    AND (pergunta LIKE %s OR resposta LIKE %s)
+                    ORDER BY created_at DESC, id DESC
+                    LIMIT %s
+                """, (user_id, search_term, search_term, limit))
+
+                conversations = [BotConversation.resumo_de_linha(row) for row in cur.fetchall()]
+
+                logger.info(f"Busca '{query}': {len(conversations)} resultados para usuário {user_id}")
+                return conversations
+
+        except Error as e:
+            logger.error(f"Erro ao buscar conversas: {e}")
+            return []
+
     def delete_conversation(self, conversation_id, user_id):
         """
         Deleta uma conversa específica.
@@ -215,6 +389,7 @@ class BotRepository:
 
                 if deleted:
                     logger.info(f"Conversa {conversation_id} deletada pelo usuário {user_id}")
+                    self._invalidar_total(user_id)
                 else:
                     logger.warning(f"Tentativa de deletar conversa {conversation_id} falhou (usuário {user_id})")
 
@@ -244,6 +419,7 @@ class BotRepository:
                 deleted_count = cur.rowcount
 
                 logger.info(f"{deleted_count} conversas deletadas do usuário {user_id}")
+                self._invalidar_total(user_id)
                 return deleted_count
 
         except Error as e:
@@ -365,7 +541,7 @@ class BotRepository:
             bool: True se atualizado com sucesso, False caso contrário
         """
         try:
-            metadata_json = json.dumps(metadata) if metadata else None
+            metadata_json = _dumps_metadata(metadata) if metadata else None
 
             with get_db_cursor() as cur:
                 cur.execute("""
@@ -519,6 +695,8 @@ class BotRepository:
     def get_conversations_with_metadata(self, limit=1000):
         """
         Busca conversas que têm metadata (usado para treinar avaliador de qualidade).
+        O treino só usa pergunta, resposta, fonte e tempo: a coluna metadata
+        filtra a consulta mas não é carregada (metadata das instâncias fica vazio).
 
         Args:
             limit (int): Número máximo de conversas
@@ -528,10 +706,10 @@ class BotRepository:
         """
         try:
             with get_db_cursor() as cur:
-                cur.execute("""
-                    SELECT * FROM bot_conversations 
+                cur.execute(f"""
+                    SELECT {_COLUNAS_SEM_METADATA} FROM bot_conversations 
                     WHERE metadata IS NOT NULL 
-                    AND metadata != '{}'
+                    AND metadata != '{{}}'
                     ORDER BY created_at DESC
                     LIMIT %s
                 """, (limit,))
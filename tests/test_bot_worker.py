@@ -0,0 +1,123 @@
+"""
+Testes do BotWorker (V1): cache de respostas compartilhado entre usuários e contexto por usuário.
+"""
+
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+from cachetools import LRUCache, TTLCache
+
+import bot.bot_worker as modulo_worker
+from bot.bot_worker import BotWorker
+from bot.utils.semantic_cache import CacheSemantico
+
+RESPOSTAS_CALCULO = {
+    "quanto é 2+2": "4",
+    "quanto é 2*2": "4 (multiplicação)",
+    "quanto é 2-2": "0",
+    "quanto é 2/2": "1",
+    "what is 12*4": "48",
+    "what is 12/4": "3",
+}
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    """
+    BotWorker sem __init__ (que conecta em APIs e carrega modelos): só o que o
+    caminho da pergunta de conhecimento usa, com a busca nas APIs simulada.
+    """
+    w = BotWorker.__new__(BotWorker)
+    w._rng = random.Random(0)
+    w._cache = CacheSemantico(maxsize=100, ttl=3600, limiar=0.92)
+    w._contexto = TTLCache(maxsize=100, ttl=1800)
+    w._contexto_lock = threading.Lock()
+    w._planos_busca = LRUCache(maxsize=100)
+    w._planos_busca_lock = threading.Lock()
+    w._executor = ThreadPoolExecutor(max_workers=2)
+    w._contador_lock = threading.Lock()
+    w.contador_conversas = 0
+
+    w.sistema_aprendizado = MagicMock()
+    w.sistema_aprendizado.buscar_resposta_aprendida.return_value = (None, 0.0)
+    w.sistema_aprendizado.prever_intencao.return_value = "conhecimento"
+    w.sistema_aprendizado.avaliar_qualidade_resposta.return_value = 0.5
+
+    w.analisador = MagicMock()
+    w.analisador.detectar_tipo_pergunta.return_value = "calculo"
+    w.analisador_avancado = MagicMock()
+    w.analisador_avancado.analisar_completo.return_value = {}
+    w.estrategia_busca = MagicMock()
+    w.estrategia_busca.selecionar_fontes.return_value = ["wolfram"]
+    w.estrategia_busca.criar_queries_multiplas.side_effect = lambda pergunta, analise: [pergunta]
+
+    w.combinador = MagicMock()
+    w.combinador.combinar_com_fonte_principal.side_effect = (
+        lambda resultados, pergunta, tipo: (resultados.get("wolfram"), "wolfram")
+    )
+    w.formatador = MagicMock()
+    w.formatador.formatar_final.side_effect = lambda resposta, tipo: resposta
+
+    w.buscas = []
+
+    def buscar(query, idioma, fontes):
+        w.buscas.append(query)
+        return query, {"wolfram": RESPOSTAS_CALCULO[query]}, 0.0
+
+    monkeypatch.setattr(w, "_traduzir_e_buscar", buscar)
+    monkeypatch.setattr(modulo_worker, "traduzir_lote", lambda textos, origem, destino: list(textos))
+
+    yield w
+    w._executor.shutdown(wait=False)
+
+
+def _responder(worker, pergunta, user_id=None):
+    resposta, fonte, _ = worker._get_bot_response_with_logs(pergunta, 0.0, user_id)
+    return resposta
+
+
+def test_calculos_diferentes_nao_compartilham_resposta(worker):
+    for pergunta, esperada in RESPOSTAS_CALCULO.items():
+        assert _responder(worker, pergunta) == esperada
+
+    # Cada cálculo passou pela busca: nenhum foi respondido com o cache de outro
+    assert worker.buscas == list(RESPOSTAS_CALCULO)
+
+
+def test_mesma_pergunta_usa_o_cache(worker):
+    assert _responder(worker, "quanto é 2+2") == "4"
+    assert _responder(worker, "Quanto é 2 + 2?") == "4"
+    assert worker.buscas == ["quanto é 2+2"]
+
+
+def test_chave_do_cache_compartilhado_distingue_calculos(worker, monkeypatch):
+    chaves = {}
+    monkeypatch.setattr(
+        modulo_worker.cache_compartilhado, "set",
+        lambda chave, valor, ttl=3600: chaves.setdefault(chave, valor)
+    )
+
+    for pergunta in RESPOSTAS_CALCULO:
+        _responder(worker, pergunta)
+
+    assert len(chaves) == len(RESPOSTAS_CALCULO)
+    assert sorted(resposta for resposta, _ in chaves.values()) == sorted(RESPOSTAS_CALCULO.values())
+
+
+def test_contexto_e_separado_por_usuario(worker):
+    _responder(worker, "quanto é 2+2", user_id=1)
+    _responder(worker, "quanto é 2*2", user_id=2)
+
+    assert [c["pergunta"] for c in worker._contexto[1]] == ["quanto e 2+2"]
+    assert [c["pergunta"] for c in worker._contexto[2]] == ["quanto e 2*2"]
+
+
+def test_perguntas_anonimas_nao_compartilham_contexto(worker):
+    _responder(worker, "quanto é 2+2")
+    _responder(worker, "quanto é 2*2")
+
+    assert None not in worker._contexto
+    assert len(worker._contexto) == 0
@@ -0,0 +1,79 @@
+"""
+Testes do BotWorkerV2: cache e perguntas idênticas em andamento não traduzem a pergunta.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+
+from bot.bot_worker_v2 import BotWorkerV2
+from bot.utils.text_utils import normalizar_texto
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    """BotWorkerV2 sem __init__ (que conecta em APIs e carrega modelos), com tradução e busca simuladas."""
+    w = BotWorkerV2.__new__(BotWorkerV2)
+    w._rng = random.Random(0)
+    w._cache = {}
+    w._cache_lock = threading.Lock()
+    w._em_andamento = {}
+    w._executor = ThreadPoolExecutor(max_workers=4)
+    w._contador_lock = threading.Lock()
+    w.contador_conversas = 0
+
+    w.sistema_ml = MagicMock()
+    w.sistema_ml.buscar_resposta_aprendida.return_value = (None, 0.0)
+    w.sistema_ml.prever_intencao_ensemble.return_value = ("conhecimento", 0.9)
+    # Tópico com algum custo: dá tempo de o pool começar uma tradução já submetida
+    w.sistema_ml.detectar_topico.side_effect = lambda pergunta: time.sleep(0.02) or 0
+
+    w.traducoes = []
+
+    def traduzir_pergunta(pergunta):
+        w.traducoes.append(pergunta)
+        return "pt", pergunta
+
+    def responder(pergunta, pergunta_norm, topico, traducao, logs, start_time):
+        traducao.result()
+        time.sleep(0.1)
+        return f"resposta para {pergunta}", "google"
+
+    monkeypatch.setattr(w, "_traduzir_pergunta", traduzir_pergunta)
+    monkeypatch.setattr(w, "_responder_conhecimento", responder)
+
+    yield w
+    w._executor.shutdown(wait=False)
+
+
+def test_cache_hit_nao_traduz_a_pergunta(worker):
+    pergunta = "qual a capital da frança"
+    worker._cache[normalizar_texto(pergunta)] = ("Paris", "wikipedia")
+
+    resposta, fonte, _ = worker._get_bot_response_v2(pergunta, time.perf_counter())
+
+    assert (resposta, fonte) == ("Paris", "wikipedia")
+    assert worker.traducoes == []
+    worker.sistema_ml.detectar_topico.assert_not_called()
+
+
+def test_perguntas_identicas_simultaneas_traduzem_uma_vez(worker):
+    pergunta = "qual a capital da frança"
+    respostas = []
+
+    def perguntar():
+        resposta, _, _ = worker._get_bot_response_v2(pergunta, time.perf_counter())
+        respostas.append(resposta)
+
+    threads = [threading.Thread(target=perguntar) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert respostas == [f"resposta para {pergunta}"] * 5
+    assert worker.traducoes == [pergunta]
@@ -0,0 +1,84 @@
+"""
+Testes do BuscadorAPI: pré-conexão às APIs e leitura limitada do DBpedia.
+"""
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from bot.api.search import LIMITE_BYTES_JSON, BuscadorAPI
+
+
+@pytest.fixture
+def sessao():
+    return MagicMock(spec=requests.Session)
+
+
+def test_construtor_nao_acessa_a_rede(sessao):
+    b = BuscadorAPI(wolfram_app_id="appid", google_cx="cx", google_api_key="key", sessao=sessao)
+    b._executor.shutdown(wait=True)
+
+    assert sessao.method_calls == []
+
+
+def test_aquecimento_so_acessa_apis_sem_chave(sessao):
+    b = BuscadorAPI(wolfram_app_id="appid", google_cx="cx", google_api_key="key", sessao=sessao)
+    b.aquecer_conexoes()
+    b._executor.shutdown(wait=True)
+
+    urls = sorted(c.args[0] for c in sessao.head.call_args_list)
+    assert urls == ["https://api.duckduckgo.com/", "https://en.wikipedia.org/w/api.php"]
+
+
+def test_falha_no_aquecimento_conta_no_disjuntor(sessao):
+    sessao.head.side_effect = requests.ConnectionError("sem rede")
+    b = BuscadorAPI(sessao=sessao)
+
+    for _ in range(b._disjuntor.limite_falhas):
+        b._aquecer_conexao("duckduckgo", BuscadorAPI.URLS_AQUECIMENTO["duckduckgo"])
+
+    assert b._disjuntor.aberto("duckduckgo")
+    assert not b._disjuntor.aberto("wikipedia")
+    b.close()
+
+
+def _resposta(corpo: bytes):
+    """Resposta 200 cujo corpo é lido em blocos (como com stream=True)."""
+    response = MagicMock()
+    response.__enter__.return_value = response
+    response.status_code = 200
+    response.iter_content.side_effect = lambda chunk_size: (
+        corpo[i:i + chunk_size] for i in range(0, len(corpo), chunk_size)
+    )
+    return response
+
+
+def _buscar_dbpedia(buscador, pergunta_en):
+    """Chama buscar_dbpedia sem o cache_por_consulta."""
+    return BuscadorAPI.buscar_dbpedia.__wrapped__(buscador, pergunta_en)
+
+
+def test_dbpedia_pede_so_o_abstract_em_streaming(sessao):
+    abstract = "Albert Einstein was a German-born theoretical physicist. " * 3
+    corpo = {"results": {"bindings": [{"abs": {"value": abstract}}]}}
+    sessao.get.return_value = _resposta(json.dumps(corpo).encode())
+    b = BuscadorAPI(sessao=sessao)
+
+    assert _buscar_dbpedia(b, "who was Albert Einstein?") == abstract
+
+    url = sessao.get.call_args.args[0]
+    kwargs = sessao.get.call_args.kwargs
+    assert url == "https://dbpedia.org/sparql"
+    assert kwargs["stream"] is True
+    assert "<http://dbpedia.org/resource/Albert_Einstein>" in kwargs["params"]["query"]
+    b.close()
+
+
+def test_dbpedia_descarta_resposta_grande_demais(sessao):
+    sessao.get.return_value = _resposta(b" " * (LIMITE_BYTES_JSON + 1))
+    b = BuscadorAPI(sessao=sessao)
+
+    assert _buscar_dbpedia(b, "who was Albert Einstein?") is None
+    b.close()
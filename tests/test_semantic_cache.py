@@ -0,0 +1,48 @@
+"""
+Testes do cache de respostas (bot/utils/semantic_cache.py).
+"""
+
+import pytest
+
+from bot.utils.semantic_cache import CacheSemantico, normalizar_chave
+
+# Pares que a normalização antiga juntava na mesma chave (ou em vetores quase iguais)
+PERGUNTAS_DISTINTAS = [
+    ("quanto é 2+2", "quanto é 2-2"),
+    ("quanto é 2+2", "quanto é 2*2"),
+    ("quanto é 2+2", "quanto é 2/2"),
+    ("what is -5 + 3", "what is 5 + 3"),
+    ("what is 12*4", "what is 12*5"),
+    ("what is 12*4", "what is 12/4"),
+    ("quanto é 2.5 vezes 3", "quanto é 25 vezes 3"),
+]
+
+
+@pytest.mark.parametrize("pergunta_a, pergunta_b", PERGUNTAS_DISTINTAS)
+def test_chaves_distintas_para_calculos_diferentes(pergunta_a, pergunta_b):
+    assert normalizar_chave(pergunta_a) != normalizar_chave(pergunta_b)
+
+
+@pytest.mark.parametrize("pergunta_a, pergunta_b", PERGUNTAS_DISTINTAS)
+def test_calculos_diferentes_nao_compartilham_resposta(pergunta_a, pergunta_b):
+    cache = CacheSemantico()
+    cache.set(pergunta_a, ("resposta a", "wolfram"))
+
+    assert cache.get(pergunta_b) is None
+    assert cache.get(pergunta_a) == ("resposta a", "wolfram")
+
+
+@pytest.mark.parametrize("pergunta_a, pergunta_b", [
+    ("Quanto é 2+2?", "quanto é 2 + 2"),
+    ("Qual é a capital da França?", "qual e a capital da franca"),
+    ("  qual   a capital do Brasil!! ", "Qual a capital do Brasil"),
+])
+def test_variacoes_de_escrita_usam_a_mesma_chave(pergunta_a, pergunta_b):
+    assert normalizar_chave(pergunta_a) == normalizar_chave(pergunta_b)
+
+
+def test_busca_semantica_continua_valendo_para_texto_sem_numeros():
+    cache = CacheSemantico(limiar=0.8)
+    cache.set("qual é a capital da frança", ("Paris", "wikipedia"))
+
+    assert cache.get("me diga qual é a capital da frança") == ("Paris", "wikipedia")
@@ -0,0 +1,251 @@
+"""
+Testes do BuscadorUnificado: cache das buscas orquestradas e perguntas em andamento.
+"""
+
+import threading
+import time
+
+import pytest
+
+from bot.api.unified_searcher import BuscadorUnificado
+
+
+@pytest.fixture
+def buscador(monkeypatch):
+    """Buscador com a busca nas fontes simulada (sem rede)."""
+    b = BuscadorUnificado()
+    b.buscas = []
+
+    def buscar(pergunta_en, fontes_priorizadas, max_fontes, timeout_total):
+        b.buscas.append(pergunta_en)
+        time.sleep(0.05)
+        return {"wolfram": f"resultado de {pergunta_en}"}
+
+    monkeypatch.setattr(b, "_buscar_inteligente_sem_cache", buscar)
+    yield b
+    b.close()
+
+
+def test_operadores_diferentes_nao_dividem_resultados(buscador):
+    r_mult = buscador.buscar_inteligente("what is 12*4", ["wolfram"])
+    r_div = buscador.buscar_inteligente("what is 12/4", ["wolfram"])
+
+    assert r_mult == {"wolfram": "resultado de what is 12*4"}
+    assert r_div == {"wolfram": "resultado de what is 12/4"}
+    assert buscador.buscas == ["what is 12*4", "what is 12/4"]
+
+
+def test_buscas_simultaneas_com_operadores_diferentes_nao_sao_agrupadas(buscador):
+    perguntas = ["what is 12*4", "what is 12/4", "what is -5 + 3", "what is 5 + 3"]
+    resultados = {}
+
+    def buscar(pergunta):
+        resultados[pergunta] = buscador.buscar_inteligente(pergunta, ["wolfram"])
+
+    threads = [threading.Thread(target=buscar, args=(p,)) for p in perguntas]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(buscador.buscas) == sorted(perguntas)
+    assert resultados == {p: {"wolfram": f"resultado de {p}"} for p in perguntas}
+
+
+def test_espera_por_busca_em_andamento_tem_limite(monkeypatch):
+    b = BuscadorUnificado()
+    liberar = threading.Event()
+
+    def buscar_travada(pergunta_en, fontes_priorizadas, max_fontes, timeout_total):
+        liberar.wait(5)
+        return {"wolfram": "resposta"}
+
+    monkeypatch.setattr(b, "_buscar_inteligente_sem_cache", buscar_travada)
+    monkeypatch.setattr(b, "MARGEM_ESPERA_EM_ANDAMENTO", 0.1)
+
+    dono = threading.Thread(
+        target=b.buscar_inteligente,
+        args=("what is gravity", ["wolfram"]),
+        kwargs={"timeout_total": 0}
+    )
+    dono.start()
+    try:
+        while not b._em_andamento:
+            time.sleep(0.01)
+
+        inicio = time.monotonic()
+        assert b.buscar_inteligente("what is gravity", ["wolfram"], timeout_total=0) == {}
+        assert time.monotonic() - inicio < 1
+    finally:
+        liberar.set()
+        dono.join()
+        b.close()
+
+
+def test_mesma_pergunta_usa_o_cache(buscador):
+    buscador.buscar_inteligente("What is 12*4?", ["wolfram"])
+    buscador.buscar_inteligente("what is 12 * 4", ["wolfram"])
+
+    assert buscador.buscas == ["What is 12*4?"]
+
+
+@pytest.fixture
+def youtube(monkeypatch):
+    """
+    YouTube simulado: cada vídeo da busca tem uma transcrição ou levanta um erro.
+    Retorna o dict {video_id: transcrição ou exceção} a preencher e a lista de chamadas.
+    """
+    yta = pytest.importorskip("youtube_transcript_api")
+    import bot.api.unified_searcher as modulo
+
+    videos = {}
+    chamadas = []
+
+    class BuscaFalsa:
+        def __init__(self, query, max_results):
+            pass
+
+        def to_dict(self):
+            return [{"id": video_id} for video_id in videos]
+
+    class TranscricaoFalsa:
+        @staticmethod
+        def get_transcript(video_id, languages):
+            chamadas.append(video_id)
+            resultado = videos[video_id]
+            if isinstance(resultado, Exception):
+                raise resultado
+            return [{"text": resultado}]
+
+    monkeypatch.setattr(modulo, "YOUTUBE_AVAILABLE", True)
+    monkeypatch.setattr(modulo, "YoutubeSearch", BuscaFalsa, raising=False)
+    monkeypatch.setattr(modulo, "YouTubeTranscriptApi", TranscricaoFalsa, raising=False)
+    monkeypatch.setattr(modulo, "CouldNotRetrieveTranscript", yta.CouldNotRetrieveTranscript, raising=False)
+    monkeypatch.setattr(
+        modulo, "_ERROS_YOUTUBE_GERAIS",
+        (yta.TooManyRequests, yta.YouTubeRequestFailed, yta.FailedToCreateConsentCookie),
+        raising=False
+    )
+    return yta, videos, chamadas
+
+
+def _buscar_youtube(buscador, pergunta_en):
+    """Chama buscar_youtube_transcript sem o cache_por_consulta (memória e disco)."""
+    return BuscadorUnificado.buscar_youtube_transcript.__wrapped__(buscador, pergunta_en)
+
+
+def test_youtube_pula_videos_sem_transcricao(buscador, youtube):
+    yta, videos, chamadas = youtube
+    texto = "a transcription long enough to be used as an answer " * 3
+
+    videos["sem_transcricao"] = yta.NoTranscriptAvailable("sem_transcricao")
+    videos["desativada"] = yta.TranscriptsDisabled("desativada")
+    videos["indisponivel"] = yta.VideoUnavailable("indisponivel")
+    videos["ok"] = texto
+
+    assert _buscar_youtube(buscador, "what is gravity") == texto
+    assert chamadas == ["sem_transcricao", "desativada", "indisponivel", "ok"]
+
+
+def test_youtube_para_no_limite_de_requisicoes(buscador, youtube):
+    yta, videos, chamadas = youtube
+
+    videos["limitado"] = yta.TooManyRequests("limitado")
+    videos["ok"] = "a transcription long enough to be used as an answer " * 3
+
+    assert _buscar_youtube(buscador, "what is gravity") is None
+    assert chamadas == ["limitado"]
+
+
+def test_busca_web_nao_passa_do_ttl_e_nao_vai_para_o_disco(monkeypatch):
+    import bot.api.source_cache as source_cache
+
+    gravados_disco = []
+
+    class DiscoFalso:
+        def get(self, chave):
+            return None
+
+        def set(self, chave, valor, expire=None):
+            gravados_disco.append(chave)
+
+    monkeypatch.setattr(source_cache, "obter_cache_disco", lambda: DiscoFalso())
+
+    b = BuscadorUnificado(google_cx="cx", google_api_key="key")
+    snippets = iter(["resposta antiga", "resposta nova"])
+    monkeypatch.setattr(b, "_get_json", lambda fonte, url, params=None: {"items": [{"snippet": next(snippets)}]})
+
+    pergunta = "who is the current president of the test suite"
+    try:
+        assert b.buscar_google(pergunta) == "resposta antiga"
+        assert b.buscar_google(pergunta) == "resposta antiga"
+
+        # Envelhece a entrada além de 30 min: não pode mais ser servida, nem como stale
+        cache = BuscadorUnificado.buscar_google.cache
+        chave = (pergunta, ())
+        valor, instante = cache[chave]
+        cache[chave] = (valor, instante - 1801)
+
+        assert b.buscar_google(pergunta) == "resposta nova"
+        assert gravados_disco == []
+    finally:
+        BuscadorUnificado.buscar_google.cache.pop((pergunta, ()), None)
+        b.close()
+
+
+@pytest.fixture
+def wolfram(monkeypatch):
+    """
+    Buscador com os endpoints do Wolfram simulados.
+    Retorna o buscador, o dict {endpoint: (atraso, resposta)} a preencher e a lista de chamadas.
+    """
+    b = BuscadorUnificado(wolfram_app_id="appid")
+    respostas = {}
+    chamadas = []
+
+    def consultar(endpoint, params):
+        chamadas.append(endpoint)
+        atraso, resposta = respostas[endpoint]
+        time.sleep(atraso)
+        return resposta
+
+    monkeypatch.setattr(b, "_consultar_wolfram", consultar)
+    monkeypatch.setattr(b, "ATRASO_SPOKEN_WOLFRAM", 0.1)
+    yield b, respostas, chamadas
+    b.close()
+
+
+def _buscar_wolfram(buscador, pergunta_en):
+    """Chama buscar_wolfram sem o cache_por_consulta (memória e disco)."""
+    return BuscadorUnificado.buscar_wolfram.__wrapped__(buscador, pergunta_en)
+
+
+def test_wolfram_nao_consulta_spoken_quando_simples_responde(wolfram):
+    b, respostas, chamadas = wolfram
+    respostas["simple"] = (0, "resposta do simples")
+    respostas["spoken"] = (0, "resposta do spoken")
+
+    assert _buscar_wolfram(b, "what is 12*4") == "resposta do simples"
+
+    b._executor_wolfram.shutdown(wait=True)
+    assert chamadas == ["simple"]
+
+
+def test_wolfram_consulta_spoken_quando_simples_falha(wolfram):
+    b, respostas, chamadas = wolfram
+    respostas["simple"] = (0, None)
+    respostas["spoken"] = (0, "resposta do spoken")
+
+    assert _buscar_wolfram(b, "what is 12*4") == "resposta do spoken"
+    assert chamadas == ["simple", "spoken"]
+
+
+def test_wolfram_consulta_spoken_em_paralelo_quando_simples_demora(wolfram):
+    b, respostas, chamadas = wolfram
+    respostas["simple"] = (1, "resposta do simples")
+    respostas["spoken"] = (0, "resposta do spoken")
+
+    inicio = time.monotonic()
+    assert _buscar_wolfram(b, "what is 12*4") == "resposta do spoken"
+    assert time.monotonic() - inicio < 1
+    assert chamadas == ["simple", "spoken"]
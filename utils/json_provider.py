@@ -0,0 +1,43 @@
+"""
+Serialização JSON das respostas da API com orjson.
+"""
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    JSONProvider do Flask que usa orjson (bem mais rápido que o json da stdlib
+    para respostas grandes como logs_processo).
+
+    Mantém o comportamento do provider padrão: chaves ordenadas, indentação em
+    modo debug e datas/Decimal/dataclasses tratados pelo `default` do Flask.
+    """
+
+    def dumps(self, obj, **kwargs) -> str:
+        option = (
+            orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_SERIALIZE_NUMPY
+            # datetime vai para o default do Flask (formato HTTP date, como antes)
+            | orjson.OPT_PASSTHROUGH_DATETIME
+        )
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+
+        return orjson.dumps(obj, default=kwargs.get("default", self.default), option=option).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+def configurar_json(app):
+    """Troca o provider JSON do app pelo OrjsonProvider, se orjson estiver instalado."""
+    if orjson is not None:
+        app.json = OrjsonProvider(app)